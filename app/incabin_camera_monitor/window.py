@@ -26,11 +26,20 @@ import numpy as np
 from datetime import datetime
 
 from vision.camera.uvc import Controller as IncabinCameraController
+from vision.camera.frame_buffer import FrameRingBuffer
+from vision.camera.source import create_source
+from vision.camera.device_manager import DeviceManager
+from vision.camera.pixel import PIXEL_BGR8
+from util.gui.compositor import DisplayCompositor
 from util.logger.video import VideoRecorder
-from util.monitor.system import SystemStatusMonitor
+from util.logger.keypoint import KeypointLogger
+from util.monitor.system import ResourceMonitor
 from util.monitor.gpu import GPUStatusMonitor
+from util.monitor.metrics import MetricsRegistry, MetricsHTTPServer
+from util.monitor.publisher import MetricsPublisher
 from util.logger.console import ConsoleLogger
-from vision.HPE.YOLOv8 import PoseModel
+from util.monitor.startup import StartupProfiler
+# pose estimation stack (ultralytics, torch) is imported when HPE is enabled
 
 '''
 Main window
@@ -41,6 +50,11 @@ class AppWindow(QMainWindow):
         
         self.__console = ConsoleLogger.get_logger()
 
+        # metrics must be enabled before components are created
+        self.__metrics_publisher = None
+        self.__metrics_server = None
+        MetricsRegistry.get_registry().set_enabled(bool(config.get("metrics_enable", False)))
+
         try:            
             if "gui" in config:
                 
@@ -66,9 +80,14 @@ class AppWindow(QMainWindow):
                 self.__frame_window_map = {}
                 for idx, id in enumerate(config["camera_id"]):
                     self.__frame_window_map[id] = config["camera_window"][idx]
+
+                # latest frame per camera window, painted at the display refresh rate
+                self.__compositor = DisplayCompositor(self, self.__frame_window_map, refresh_rate=float(config.get("display_refresh_rate", 30)))
+                self.__compositor.start()
                     
                 # apply monitoring
-                self.__sys_monitor = SystemStatusMonitor(interval_ms=1000)
+                self.__sys_monitor = ResourceMonitor(intervals=config.get("monitor_intervals_ms", None),
+                                                     emit_interval_ms=int(config.get("monitor_emit_interval_ms", 1000)))
                 self.__sys_monitor.usage_update_signal.connect(self.update_system_status)
                 self.__sys_monitor.start()
                 
@@ -80,6 +99,15 @@ class AppWindow(QMainWindow):
                 except Exception as e:
                     self.__console.critical("GPU may not be available")
                     pass
+
+                # apply metrics publishing
+                if MetricsRegistry.get_registry().is_enabled():
+                    self.__metrics_publisher = MetricsPublisher(interval_ms=int(config.get("metrics_interval_ms", 1000)))
+                    self.__metrics_publisher.snapshot_signal.connect(self.update_metrics)
+                    self.__metrics_publisher.start()
+                    if config.get("metrics_http_port", 0):
+                        self.__metrics_server = MetricsHTTPServer(port=int(config["metrics_http_port"]))
+                        self.__metrics_server.start()
             else:
                 raise Exception("GUI definition must be contained in the configuration file.")
 
@@ -90,7 +118,16 @@ class AppWindow(QMainWindow):
         self.__configure = config   # configure parameters
         self.__camera_container = {}    # connected camera
         self.__recorder_container = {}    # video recorders
-        self.__hpe_container = {}   # human pose estimation container
+        self.__pose_service = None  # human pose estimation service shared by all cameras
+        self.__pose_overlay = None  # skeleton overlay renderer for display
+        self.__keypoint_logger = None   # pose result logger (recorded with videos)
+        if "keypoint_out_path" in config:
+            self.__keypoint_logger = KeypointLogger(dirpath=(pathlib.Path(config["app_path"]) / config["keypoint_out_path"]),
+                                                    chunk_rows=int(config.get("keypoint_chunk_rows", 4096)),
+                                                    flush_interval_s=float(config.get("keypoint_flush_interval_s", 5)),
+                                                    segment_time_s=float(config.get("keypoint_segment_time_s", 0)),
+                                                    segment_size_mb=float(config.get("keypoint_segment_size_mb", 0)))
+        self.__frame_buffer_container = {}  # preallocated frame buffer per camera
 
     # menu event callback : all camera connection
     def on_select_connect_all(self):
@@ -98,12 +135,17 @@ class AppWindow(QMainWindow):
             QMessageBox.warning(self, "Warning", "All camera is already working..")
             return
         
-        # create camera instance
+        # create camera instance and open all concurrently
+        cameras = {}
         for id in self.__configure["camera_id"]:
-            camera = IncabinCameraController(id)
-            if camera.open():
+            source = create_source(id, self.__configure.get("camera_source", {"type":"device"}))
+            cameras[id] = IncabinCameraController(id, source=source)
+        device_manager = DeviceManager(max_workers=int(self.__configure.get("camera_open_workers", 8)))
+        opened = device_manager.run_all({id:camera.open for id, camera in cameras.items()})
+        
+        for id, camera in cameras.items():
+            if opened[id]:
                 self.__camera_container[id] = camera
-                self.__camera_container[id].frame_update_signal.connect(self.show_updated_frame)    # connect to frame grab signal callback function
                 
                 resol = self.__camera_container[id].get_pixel_resolution()
                 # create video recorder
@@ -111,88 +153,110 @@ class AppWindow(QMainWindow):
                                                               filename=f"camera_{id}",
                                                               ext=self.__configure["video_extension"],
                                                               resolution=(int(self.__configure["camera_width"]), int(self.__configure["camera_height"])),
-                                                              fps=float(self.__configure["camera_fps"]))
-                self.__camera_container[id].frame_update_signal.connect(self.__recorder_container[id].write_frame)
+                                                              fps=float(self.__configure["camera_fps"]),
+                                                              codec=self.__configure.get("video_codec", "MJPG"),
+                                                              queue_size=int(self.__configure.get("video_queue_size", 64)),
+                                                              segment_time_s=float(self.__configure.get("video_segment_time_s", 0)),
+                                                              segment_size_mb=float(self.__configure.get("video_segment_size_mb", 0)))
                 
-                # create human pose estimator
-                self.__hpe_container[id] = PoseModel(modelname=self.__configure["hpe_model"], id=id)
-                self.__camera_container[id].frame_update_signal.connect(self.__hpe_container[id].predict)
-                # self.__hpe_container[id].estimated_result_image.connect(self.show_estimated_frame) # draw key points
+                if "frame_buffer_slots" in self.__configure:
+                    # grabbed frames are shared with all consumers through the frame buffer
+                    self.__frame_buffer_container[id] = FrameRingBuffer(num_slots=int(self.__configure["frame_buffer_slots"]), shape=(resol[1], resol[0], 3))
+                    self.__camera_container[id].set_frame_buffer(self.__frame_buffer_container[id])
+                    self.__camera_container[id].frame_slot_signal.connect(self.dispatch_frame_slot)
+                else:
+                    self.__camera_container[id].frame_update_signal.connect(self.show_updated_frame)    # connect to frame grab signal callback function
+                    self.__camera_container[id].frame_update_signal.connect(self.__recorder_container[id].write_frame)
+                    self.__camera_container[id].frame_update_signal.connect(self.submit_pose_frame)
                 
                 # start grab thread
                 self.__camera_container[id].begin()
             else:
-                QMessageBox.warning(self, "Camera connection fail", f"Failed to connect to camera {camera.uvc_camera.get_camera_id()}")
+                QMessageBox.warning(self, "Camera connection fail", f"Failed to connect to camera {id}")
 
     # enable/disable hpe
     def on_select_enable_hpe(self):
         if self.sender().isChecked(): # enable hpe
-            for model in self.__hpe_container.values():
-                model.start()
+            self.__create_pose_service()
+            if self.__pose_service:
+                self.__pose_service.start_estimation()
         else:   # disable hpe
-            for model in self.__hpe_container.values():
-                model.stop()
+            if self.__pose_service:
+                self.__pose_service.stop_estimation()
+            for id in self.__camera_container.keys():
+                self.__compositor.submit_overlay(id, None)
         
+    # create human pose estimation service shared by all cameras (on first use)
+    def __create_pose_service(self):
+        if self.__pose_service:
+            return
+        from vision.HPE.service import PoseService
+        from vision.HPE.overlay import PoseOverlayRenderer
+
+        try:
+            with StartupProfiler.get_profiler().phase("pose model"):
+                self.__pose_service = PoseService(modelname=self.__configure["hpe_model"],
+                                                  max_batch=int(self.__configure.get("hpe_max_batch", 8)),
+                                                  latency_budget_ms=float(self.__configure.get("hpe_latency_budget_ms", 0)),
+                                                  max_rate_hz=float(self.__configure.get("hpe_max_rate_hz", self.__configure.get("camera_fps", 30))),
+                                                  detect_interval=int(self.__configure.get("hpe_detect_interval", 1)),
+                                                  min_track_quality=float(self.__configure.get("hpe_min_track_quality", 0.5)))
+        except Exception as e:
+            self.__console.critical(f"{e}")
+            return
+        self.__pose_overlay = PoseOverlayRenderer()
+        self.__pose_service.estimated_result.connect(self.show_estimated_result) # draw key points
+        if self.__keypoint_logger:
+            self.__pose_service.estimated_result.connect(self.__keypoint_logger.log)
+        self.__pose_service.start()
+
+    # submit grabbed frame to the pose estimation service (without frame buffer)
+    def submit_pose_frame(self, image:np.ndarray, fps:float):
+        if self.__pose_service:
+            self.__pose_service.submit(self.sender().get_camera_id(), image)
+
     # start/stop video recording
     def on_select_start_stop_data_recording(self):
         if self.sender().isChecked(): #start recording
             for recorder in self.__recorder_container.values():
                 recorder.start()
+            if self.__keypoint_logger:
+                self.__keypoint_logger.start()
         else:   # stop recording
             for recorder in self.__recorder_container.values():
                 recorder.stop()
+            if self.__keypoint_logger:
+                self.__keypoint_logger.stop()
     
     # load video directory
     def on_select_load_video_directory(self):
         pass
 
-    # show updated image frame on GUI window
-    def show_updated_frame(self, image:np.ndarray, fps:float):
-        # converting color format
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # draw information
-        t_start = datetime.now()
+    # dispatch a frame in the frame buffer to display, recorder and pose estimator
+    def dispatch_frame_slot(self, slot:int, seq:int, fps:float):
         id = self.sender().get_camera_id()
+        frame_buffer = self.__frame_buffer_container[id]
         
-        cv2.putText(rgb_image, f"Camera #{id}(fps:{int(fps)})", (10,50), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0,255,0), 2, cv2.LINE_AA)
-        cv2.putText(rgb_image, t_start.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3], (10, 1070), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0,255,0), 2, cv2.LINE_AA)
-        
-        #converting ndarray to qt image
-        _h, _w, _ch = rgb_image.shape
-        _bpl = _ch*_w # bytes per line
-        qt_image = QImage(rgb_image.data, _w, _h, _bpl, QImage.Format.Format_RGB888)
-
-        # converting qt image to QPixmap
-        pixmap = QPixmap.fromImage(qt_image)
-
-        # draw on window
+        frame = frame_buffer.acquire(slot, seq)
+        if frame is None: # already overwritten by newer frame
+            return
         try:
-            window = self.findChild(QLabel, self.__frame_window_map[id])
-            window.setPixmap(pixmap.scaled(window.size(), Qt.AspectRatioMode.KeepAspectRatio))
-        except Exception as e:
-            self.__console.critical(f"{e}")
-            
-    # show estimated result
-    def show_estimated_frame(self, image:np.ndarray):
-        # converting color format
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        #converting ndarray to qt image
-        _h, _w, _ch = rgb_image.shape
-        _bpl = _ch*_w # bytes per line
-        qt_image = QImage(rgb_image.data, _w, _h, _bpl, QImage.Format.Format_RGB888)
+            self.__compositor.submit_slot(id, frame_buffer, slot, seq, PIXEL_BGR8, (f"Camera #{id}(fps:{int(fps)})",))
+            self.__recorder_container[id].write_frame(frame, fps)
+            if self.__pose_service:
+                self.__pose_service.submit_slot(id, frame_buffer, slot, seq)
+        finally:
+            frame_buffer.release(slot)
 
-        # converting qt image to QPixmap
-        pixmap = QPixmap.fromImage(qt_image)
-        id = self.sender().get_id()
-
-        # draw on window
-        try:
-            window = self.findChild(QLabel, self.__frame_window_map[id])
-            window.setPixmap(pixmap.scaled(window.size(), Qt.AspectRatioMode.KeepAspectRatio))
-        except Exception as e:
-            self.__console.critical(f"{e}")
+    # show updated image frame on GUI window
+    def show_updated_frame(self, image:np.ndarray, fps:float):
+        id = self.sender().get_camera_id()
+        self.__compositor.submit(id, image, PIXEL_BGR8, (f"Camera #{id}(fps:{int(fps)})",))
+            
+    # show estimated result as overlay on the camera view (drawn on the display copy, not on the frame)
+    def show_estimated_result(self, id:int, result:object):
+        if self.__pose_service and self.__pose_service.is_processing():
+            self.__compositor.submit_overlay(id, result, self.__pose_overlay)
         
             
     # show update system monitoring on GUI window
@@ -204,6 +268,20 @@ class AppWindow(QMainWindow):
         mem_usage_window.setValue(int(status["memory"]))
         storage_usage_window.setValue(int(status["storage"]))
         
+    # show metrics summary on status bar
+    def update_metrics(self, snapshot:dict):
+        texts = []
+        for key, metric in snapshot.items():
+            if key.startswith("pose_inference_seconds") and metric["count"]>0:
+                texts.append(f"pose p50/p99 : {metric['p50']*1000:.1f}/{metric['p99']*1000:.1f}ms")
+        if self.__pose_service and self.__pose_service.is_processing():
+            stats = self.__pose_service.get_stats()
+            texts.append(f"pose rate : {stats['rate_hz']:.1f}Hz, dropped : {stats['dropped']}, detected/tracked : {stats['detected']}/{stats['tracked']}")
+        if "display_paint_seconds" in snapshot and snapshot["display_paint_seconds"]["count"]>0:
+            texts.append(f"paint p50/p99 : {snapshot['display_paint_seconds']['p50']*1000:.1f}/{snapshot['display_paint_seconds']['p99']*1000:.1f}ms")
+        if len(texts)>0:
+            self.show_on_statusbar(", ".join(texts))
+
     # show update gpu monitoring on GUI window
     def update_gpu_status(self, status:dict):
         if "gpu_count" in status:
@@ -220,11 +298,30 @@ class AppWindow(QMainWindow):
         # if recording.. stop working
         for recorder in self.__recorder_container.values():
             recorder.stop()
+        if self.__keypoint_logger:
+            self.__keypoint_logger.stop()
             
         # close camera
         for camera in self.__camera_container.values():
             camera.close()
         
+        # close pose estimation service (releases the frame buffer slot in prediction)
+        if self.__pose_service:
+            self.__pose_service.close()
+        
+        # display compositor stop (holds no frame after stop)
+        self.__compositor.stop()
+
+        # release frame buffers
+        for frame_buffer in self.__frame_buffer_container.values():
+            frame_buffer.close()
+        
+        # close metrics publisher & endpoint
+        if self.__metrics_publisher:
+            self.__metrics_publisher.close()
+        if self.__metrics_server:
+            self.__metrics_server.close()
+
         # close monitoring thread
         try:
             self.__sys_monitor.close()
@@ -20,7 +20,15 @@ import time
 ROOT_PATH = pathlib.Path(__file__).parent.parent
 sys.path.append(ROOT_PATH.as_posix())
 
-from series_analyzer.window import AppWindow
+# startup profiling must begin before the window (and its modules) is imported
+from util.monitor.startup import StartupProfiler
+_pre_parser = argparse.ArgumentParser(add_help=False)
+_pre_parser.add_argument('--profile-startup', action='store_true')
+if _pre_parser.parse_known_args()[0].profile_startup:
+    StartupProfiler.get_profiler().start()
+
+with StartupProfiler.get_profiler().phase("window import"):
+    from series_analyzer.window import AppWindow
 from util.logger.console import ConsoleLogger
 
 
@@ -31,6 +39,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--config', nargs='?', required=True, help="Configuration File(*.cfg)", default="mro.cfg")
     parser.add_argument('--verbose', nargs='?', required=False, help="Enable/Disable verbose", default=True)
+    parser.add_argument('--profile-startup', action='store_true', help="Report import and init time per module")
     args = parser.parse_args()
     
     # get filename
@@ -48,13 +57,24 @@ if __name__ == "__main__":
             if not all(key in configure for key in ["model"]):
                 raise Exception(f"some parameters does not set in the {args.config} configuration file")
             
-            app = QApplication(sys.argv)
-            app_window = AppWindow(config=configure)
+            profiler = StartupProfiler.get_profiler()
+            with profiler.phase("QApplication"):
+                app = QApplication(sys.argv)
+            with profiler.phase("AppWindow.__init__"):
+                app_window = AppWindow(config=configure)
             
             if "app_window_title" in configure:
                 app_window.setWindowTitle(configure["app_window_title"])
-            app_window.show()
-            sys.exit(app.exec())
+            with profiler.phase("AppWindow.show"):
+                app_window.show()
+
+            if args.profile_startup: # report when the event loop starts (first frame is reported when it is shown)
+                QTimer.singleShot(0, lambda: profiler.mark("event loop started"))
+                QTimer.singleShot(0, profiler.report)
+            ret = app.exec()
+            if args.profile_startup:
+                profiler.report()
+            sys.exit(ret)
             
             
     except json.JSONDecodeError as e:
@@ -22,6 +22,7 @@ from typing import Union
 import argparse
 
 from util.logger.console import ConsoleLogger
+from vision.checkpoint import load_into
 
 # global functions
 # transfer data into the selected device
@@ -114,7 +115,8 @@ class PurgeFanFaultClassification_Resnet:
         
         if os.path.isfile(self.__model_path.as_posix()):
             self.__model = ResNet(channels=3, n_classes=2)
-            self.__model.load_state_dict(torch.load(self.__model_path.as_posix(), map_location=self.get_device_use()))
+            # weights only, memory-mapped (training or slim checkpoint), inference runs on CPU
+            load_into(self.__model, self.__model_path.as_posix(), map_location="cpu")
             self.__model.eval() # evaluation mode
             self.__console.info("PurgeFan Fault Classification(Binary) model is successfully loaded")
         
@@ -19,21 +19,18 @@ except ImportError:
     from PyQt6.QtCore import QObject, Qt, QTimer, QThread, pyqtSignal
     
 from datetime import datetime
-import pandas as pd
 import numpy as np
 from PIL import ImageQt, Image
 from sys import platform
-import paho.mqtt.client as mqtt
 import pyqtgraph as graph
-import librosa
-from joblib import Parallel, delayed, parallel_backend
 from typing import Union
-from matplotlib import pyplot as plt
 import cv2
 
 from util.logger.console import ConsoleLogger
-from analysis.series.spectogram import Spectogram
-from app.series_analyzer.model import PurgeFanFaultClassification_Resnet
+from util.monitor.startup import StartupProfiler
+
+# analysis (pandas, librosa, joblib) and model (torch) stacks are imported when they are used
+MODEL_NAME = "resnet9_pfc.pth"
 
 '''
 Main Window
@@ -52,9 +49,9 @@ class AppWindow(QMainWindow):
         self.__frame_win_spectorgram_layout = QVBoxLayout()
         self.__frame_win_spectogram_plot = graph.PlotWidget()
         
-        # model load
-        self.__model = PurgeFanFaultClassification_Resnet("resnet9_pfc.pth")
-        if not self.__model.exist():
+        # model is loaded on the first inference
+        self.__model = None
+        if not (pathlib.Path(__file__).parent / "model" / MODEL_NAME).is_file():
             QMessageBox.critical(self, "Error", f"Model does not exist")
         
         # local variables
@@ -147,6 +144,8 @@ class AppWindow(QMainWindow):
             self.__spectogram_channels.currentIndexChanged.connect(self.on_changed_spectogram_channel_index)
         
             # read csv file
+            import pandas as pd
+            import librosa
             __csv_raw = pd.read_csv(self.__current_csv_file)
             
             # read parameters
@@ -253,6 +252,9 @@ class AppWindow(QMainWindow):
         
         _opt_resize = self.findChild(QCheckBox, name="chk_output_resize").isChecked()
     
+        from joblib import Parallel, delayed
+        from analysis.series.spectogram import Spectogram
+
         _spectogram = Spectogram()
         if _working_path and _output_path:
             
@@ -295,6 +297,14 @@ class AppWindow(QMainWindow):
             _edit_output = self.findChild(QLineEdit, name="edit_batch_output_dir")
             _edit_output.setText(directory)
     
+    # purge fan fault classification model (loaded on first use)
+    def __get_model(self):
+        if self.__model is None:
+            from app.series_analyzer.model import PurgeFanFaultClassification_Resnet
+            with StartupProfiler.get_profiler().phase("model load"):
+                self.__model = PurgeFanFaultClassification_Resnet(MODEL_NAME)
+        return self.__model
+
     # model run
     def on_click_run_model_inference(self):
         selected_model = self.__model_selection.currentText()
@@ -309,7 +319,7 @@ class AppWindow(QMainWindow):
             
             try:
                 if os.path.isfile(_target_image):
-                    result = self.__model.inference(_target_image)
+                    result = self.__get_model().inference(_target_image)
                     if result.lower() == "fault":
                         _label_result.setStyleSheet("color: red;")
                         _result = "Abnormal\n(Fault)"
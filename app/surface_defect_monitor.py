@@ -9,8 +9,10 @@ import json
 
 try:
     from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
 except ImportError:
     from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QTimer
 
 import argparse
 
@@ -19,7 +21,21 @@ ROOT_PATH = pathlib.Path(__file__).parent.parent
 APP_NAME = pathlib.Path(__file__).stem
 sys.path.append(ROOT_PATH.as_posix())
 
-from surface_defect_monitor.window import AppWindow
+# startup profiling and pylon camera emulation must be enabled before other modules are loaded
+from util.monitor.startup import StartupProfiler
+_pre_parser = argparse.ArgumentParser(add_help=False)
+_pre_parser.add_argument('--pylon-emulation', type=int, default=0)
+_pre_parser.add_argument('--profile-startup', action='store_true')
+_pre_args = _pre_parser.parse_known_args()[0]
+if _pre_args.profile_startup:
+    StartupProfiler.get_profiler().start()
+
+from vision.camera.source import enable_pylon_emulation
+if _pre_args.pylon_emulation>0:
+    enable_pylon_emulation(_pre_args.pylon_emulation)
+
+with StartupProfiler.get_profiler().phase("window import"):
+    from surface_defect_monitor.window import AppWindow
 from util.logger.console import ConsoleLogger
 
 
@@ -30,6 +46,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--config', nargs='?', required=True, help="Configuration File(*.cfg)", default="default.cfg")
     parser.add_argument('--verbose', nargs='?', required=False, help="Enable/Disable verbose", default=True)
+    parser.add_argument('--pylon-emulation', type=int, required=False, help="Number of emulated pylon cameras (no device needed)", default=0)
+    parser.add_argument('--profile-startup', action='store_true', help="Report import and init time per module")
     args = parser.parse_args()
 
     app = None
@@ -51,13 +69,24 @@ if __name__ == "__main__":
             if not all(key in configure for key in ["sdd_model", "sdd_model_name", "camera_id", "camera_fps", "camera_width", "camera_height", "video_extension", "image_extension"]):
                 raise Exception(f"some parameters does not set in the {args.config}configuration file")
 
-            app = QApplication(sys.argv)
-            app_window = AppWindow(config=configure)
+            profiler = StartupProfiler.get_profiler()
+            with profiler.phase("QApplication"):
+                app = QApplication(sys.argv)
+            with profiler.phase("AppWindow.__init__"):
+                app_window = AppWindow(config=configure)
             
             if "app_window_title" in configure:
                 app_window.setWindowTitle(configure["app_window_title"])
-            app_window.show()
-            sys.exit(app.exec())
+            with profiler.phase("AppWindow.show"):
+                app_window.show()
+
+            if args.profile_startup: # report when the event loop starts (first frame is reported when it is shown)
+                QTimer.singleShot(0, lambda: profiler.mark("event loop started"))
+                QTimer.singleShot(0, profiler.report)
+            ret = app.exec()
+            if args.profile_startup:
+                profiler.report()
+            sys.exit(ret)
 
     except json.JSONDecodeError as e:
         console.critical(f"Configuration File Load Error : {e}")
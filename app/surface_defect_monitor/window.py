@@ -23,57 +23,57 @@ except ImportError:
 import numpy as np
 from datetime import datetime
 
-from vision.camera.multi_gige import Controller as GigEMultiCameraController
-from vision.camera.multi_gige import gige_camera_discovery
+from vision.camera.frame_buffer import FrameRingBuffer
+from vision.camera.discovery import DiscoveryWorker
+from vision.camera.device_manager import DeviceManager
+from vision.camera.pixel import to_rgb_resized, PIXEL_BGR8, PIXEL_RGB8
+from vision import mask_codec
+from util.gui.compositor import DisplayCompositor
 from util.logger.video import VideoRecorder
-from util.monitor.system import SystemStatusMonitor
+from util.logger.image import ImageWriterPool
+from util.monitor.system import ResourceMonitor
 from util.monitor.gpu import GPUStatusMonitor
+from util.monitor.metrics import MetricsRegistry, MetricsHTTPServer
+from util.monitor.publisher import MetricsPublisher
 from util.logger.console import ConsoleLogger
-from vision.SDD.ResNet import ResNet9 as SDDModel
-
-# for TransUNET Segmentaiton
-import torch
-from vision.SDD.TransUNET_Seg.inference import SegInference
+from util.monitor.startup import StartupProfiler
 
+# device (pypylon, serial) and inference (torch, TransUNET Segmentation) stacks are imported when they are used
 
 import threading
-import queue
 import time
-import serial
+
+
+# find GigE cameras (pypylon is loaded on first call), known devices are reattached from the inventory
+def discover_gige_cameras(device_manager:DeviceManager, use_inventory:bool=True) -> list:
+    from vision.camera.multi_gige import gige_camera_discovery, get_gige_inventory
+    cameras = gige_camera_discovery(inventory=device_manager.load_inventory() if use_inventory else None)
+    if len(cameras)>0:
+        device_manager.save_inventory(get_gige_inventory())
+    return cameras
 
 '''
 Main window
 '''
 
-class image_writer(threading.Thread):
-    def __init__(self, prefix:str, save_path:pathlib.Path):
-        super().__init__()
-
+class image_writer:
+    def __init__(self, prefix:str, save_path:pathlib.Path, pool:ImageWriterPool, ext:str="jpg"):
         self.initial_save_path = save_path
-        self.current_save_path = save_path
         self.prefix = prefix
-        self.queue = queue.Queue()
-        self.stop_event = threading.Event()
+        self.ext = ext
+        self.pool = pool    # shared encoding worker pool
 
         self.__is_running = False
     
-    def save(self, class_name:str, image:np.ndarray):
+    # queue image to save (frame buffer slot view is copied, other images must not be modified afterward)
+    def save(self, class_name:str, image:np.ndarray) -> bool:
         if self.__is_running:
             postfix = datetime.now().strftime('%Y-%m-%d-%H-%M-%S-%f')[:23]
 
-            self.image_out_path_current = self.image_out_path / self.prefix / pathlib.Path(f"{class_name}")
-            self.image_out_path_current.mkdir(parents=True, exist_ok=True)
-
-            self.current_save_path = pathlib.Path(f"{self.image_out_path_current}") / pathlib.Path(f"{postfix}.jpg")
-            self.queue.put(image)
-
-
-    def run(self):
-        while not self.stop_event.is_set():
-            if not self.queue.empty():
-                image_data = self.queue.get()
-                cv2.imwrite(self.current_save_path.as_posix(), image_data)
-            time.sleep(0.001)
+            # each queued image carries its own file path
+            save_path = self.image_out_path / self.prefix / class_name / f"{postfix}.{self.ext}"
+            return self.pool.submit(save_path, image)
+        return False
 
     def begin(self):
         # create directory
@@ -86,8 +86,73 @@ class image_writer(threading.Thread):
     def stop(self):
         self.__is_running = False
 
-    def terminate(self):
-        self.stop_event.set()
+
+'''
+Batched inference worker for multi camera frame set
+'''
+class SegInferenceWorker(QThread):
+
+    inference_result_signal = pyqtSignal(dict, dict, float) # (images, encoded masks, fps) by camera id
+
+    def __init__(self, mask_size:tuple=None):
+        super().__init__()
+
+        self.__mask_size = mask_size # (w, h) of returned masks
+
+        self.__console = ConsoleLogger.get_logger()
+        self.__model = None # SegInference
+        self.__pending = None # latest frame set only (older one is dropped)
+        self.__condition = threading.Condition()
+        self.__n_dropped = 0
+
+    # set inference model
+    def set_model(self, model:"SegInference"):
+        with self.__condition:
+            self.__model = model
+
+    # number of dropped frame set
+    def get_num_dropped(self) -> int:
+        return self.__n_dropped
+
+    # request inference for the frame set (not blocking)
+    def submit(self, images:dict, fps:float):
+        with self.__condition:
+            if self.__pending is not None:
+                self.__n_dropped += 1
+            self.__pending = (images, fps)
+            self.__condition.notify()
+
+    def run(self):
+        while True:
+            with self.__condition:
+                while self.__pending is None and not self.isInterruptionRequested():
+                    self.__condition.wait(0.1)
+                if self.isInterruptionRequested():
+                    break
+                images, fps = self.__pending
+                self.__pending = None
+                model = self.__model
+
+            if model is None:
+                continue
+
+            try:
+                # single forward pass for all cameras
+                camera_ids = list(images.keys())
+                pred_masks = model.infer_batch([images[id] for id in camera_ids], out_size=self.__mask_size)
+                # mostly empty masks are passed bbox+RLE encoded, the overlay decodes only the defect region
+                masks = {id:mask_codec.encode(pred_masks[idx], mask_codec.MASK_BBOX_RLE) for idx, id in enumerate(camera_ids)}
+                self.inference_result_signal.emit(images, masks, fps)
+            except Exception as e:
+                self.__console.critical(f"Inference error : {e}")
+
+    # close thread
+    def close(self) -> None:
+        self.requestInterruption()
+        with self.__condition:
+            self.__condition.notify()
+        self.quit()
+        self.wait(1000)
 
 
 class AppWindow(QMainWindow):
@@ -95,6 +160,15 @@ class AppWindow(QMainWindow):
         super().__init__()
         
         self.__console = ConsoleLogger.get_logger()
+
+        # metrics must be enabled before components are created
+        self.__metrics_publisher = None
+        self.__metrics_server = None
+        MetricsRegistry.get_registry().set_enabled(bool(config.get("metrics_enable", False)))
+        registry = MetricsRegistry.get_registry()
+        self.__metric_convert = registry.histogram("display_convert_seconds")
+        self.__metric_overlay = registry.histogram("display_overlay_seconds")
+
         self.__image_recorder = {}
         self.__light_controller = None # light controller
         self.__camera_controller = None # camera array controller
@@ -102,11 +176,15 @@ class AppWindow(QMainWindow):
         self.__sdd_model_container = {}   # SDD classification model container
         self.__camera_container = {}
         self.__recorder_container = {}
+        self.__frame_buffer:FrameRingBuffer = None # preallocated frame buffer shared by all cameras
         self.__table_camlist_model = None # camera table model
 
         self.__model_dir = pathlib.Path(__file__).parent / "model"
-        self.__sdd_model:SegInference = None
+        self.__sdd_model = None # SegInference (loaded by user)
         self.__do_inference = False
+        self.__inference_worker = SegInferenceWorker(mask_size=(480, 300)) # batched inference out of the GUI thread
+        self.__inference_worker.inference_result_signal.connect(self.show_inference_result_multi)
+        self.__inference_worker.start()
 
         try:            
             if "gui" in config:
@@ -170,27 +248,41 @@ class AppWindow(QMainWindow):
                 ui_model_dropdown = self.findChild(QComboBox, name="cmbbox_inference_model")
                 if len(config["sdd_model_name"]) == len(config["sdd_model"]) and len(config["sdd_model_name"])>0 and len(config["sdd_model"]):
                     for idx, modelname in enumerate(config["sdd_model_name"]):
-                        ui_model_dropdown.addItems(config["sdd_model_name"])
+                        ui_model_dropdown.addItem(modelname)
                         self.__sdd_model_container[modelname] = config["sdd_model"][idx]
                 
+                # image writer pool shared by all cameras
+                self.__image_writer_pool = ImageWriterPool(num_workers=int(config.get("image_writer_workers", 4)),
+                                                           queue_size=int(config.get("image_writer_queue_size", 128)),
+                                                           policy=config.get("image_writer_policy", "drop_newest"))
+                self.__image_writer_pool.start()
+
                 # frame window mapping
                 self.__frame_window_map = {}
                 for idx, id in enumerate(config["camera_id"]):
                     self.__frame_window_map[id] = config["camera_window"][idx]
-                    self.__image_recorder[id] = image_writer(prefix=str(f"camera_{id}"), save_path=(config["app_path"] / config["image_out_path"]))
-                    self.__image_recorder[id].start()
-
-                # for inference with SDD Model
-                self.__accel_device = 'cpu:0'
-                if torch.cuda.is_available():
-                    self.__accel_device = 'cuda:0'
-                print(f"Selected inference Acceleration : {self.__accel_device}")
-                
+                    self.__image_recorder[id] = image_writer(prefix=str(f"camera_{id}"), save_path=(config["app_path"] / config["image_out_path"]), 
+                                                             pool=self.__image_writer_pool, ext=config["image_extension"])
+
+                # latest frame per camera window, painted at the display refresh rate
+                self.__compositor = DisplayCompositor(self, self.__frame_window_map, refresh_rate=float(config.get("display_refresh_rate", 30)))
+                self.__compositor.start()
+
+                # for inference with SDD Model (selected when a model is loaded)
+                self.__accel_device = None
                 
+                # apply metrics publishing
+                if registry.is_enabled():
+                    self.__metrics_publisher = MetricsPublisher(interval_ms=int(config.get("metrics_interval_ms", 1000)))
+                    self.__metrics_publisher.snapshot_signal.connect(self.update_metrics)
+                    self.__metrics_publisher.start()
+                    if config.get("metrics_http_port", 0):
+                        self.__metrics_server = MetricsHTTPServer(port=int(config["metrics_http_port"]))
+                        self.__metrics_server.start()
+
                 # apply monitoring
-                # bad performance!!
-                '''
-                self.__sys_monitor = SystemStatusMonitor(interval_ms=1000)
+                self.__sys_monitor = ResourceMonitor(intervals=config.get("monitor_intervals_ms", None),
+                                                     emit_interval_ms=int(config.get("monitor_emit_interval_ms", 1000)))
                 self.__sys_monitor.usage_update_signal.connect(self.update_system_status)
                 self.__sys_monitor.start()
                 
@@ -202,7 +294,6 @@ class AppWindow(QMainWindow):
                 except Exception as e:
                     self.__console.critical("GPU may not be available")
                     pass
-                '''
                 
             else:
                 raise Exception("GUI definition must be contained in the configuration file.")
@@ -211,12 +302,9 @@ class AppWindow(QMainWindow):
             self.__console.critical(f"Load config error : {e}")
 
         
-        self.__camera:GigEMultiCameraController = None # camera device controller (remove)
-        self.__camera_controller:GigEMultiCameraController = None # camera device controller
+        self.__camera = None # camera device controller (remove)
+        self.__camera_controller = None # camera device controller (GigE multi camera)
         self.__recorder:VideoRecorder = None # video recorder
-        
-        # find GigE Cameras & update camera list
-        __cam_found = gige_camera_discovery()
 
         # update camera list 
         _table_camera_columns = ["ID", "Camera Name", "Address"]
@@ -226,7 +314,25 @@ class AppWindow(QMainWindow):
         self.table_camera_list.setModel(self.__table_camlist_model)
         self.table_camera_list.resizeColumnsToContents()
 
-        self.__update_camera_list(__cam_found)
+        # find GigE Cameras in background & update camera list
+        inventory_path = config.get("camera_inventory_path", None)
+        self.__device_manager = DeviceManager(inventory_path=(pathlib.Path(config["app_path"]) / inventory_path) if inventory_path else None,
+                                              max_workers=int(config.get("camera_open_workers", 8)))
+        self.__discovery_worker = None
+        self.__start_camera_discovery(use_inventory=True)
+
+    # discover cameras without blocking GUI (result is shown when it is done)
+    def __start_camera_discovery(self, use_inventory:bool=False):
+        if self.__discovery_worker is not None and self.__discovery_worker.isRunning():
+            return
+        self.__discovery_worker = DiscoveryWorker(lambda: discover_gige_cameras(self.__device_manager, use_inventory))
+        self.__discovery_worker.discovered_signal.connect(self.__update_camera_list)
+        self.__discovery_worker.start()
+
+    # wait for the discovery in progress (camera array is created by the discovery)
+    def __wait_camera_discovery(self):
+        if self.__discovery_worker is not None:
+            self.__discovery_worker.wait()
 
     '''
     slider changed event
@@ -290,6 +396,7 @@ class AppWindow(QMainWindow):
         edit_baud = self.findChild(QLineEdit, "edit_light_baudrate")
         
         if self.__light_controller == None:
+            import serial
             self.__light_controller = serial.Serial(port=edit_port.text(), baudrate=int(edit_baud.text()))
             if self.__light_controller.is_open:
                 self.btn_light_connect.setEnabled(False)
@@ -325,9 +432,28 @@ class AppWindow(QMainWindow):
         # create camera instance
         try:
             if self.__camera_controller is None:
-                self.__camera_controller = GigEMultiCameraController()
+                from vision.camera.multi_gige import Controller as GigEMultiCameraController
+                self.__wait_camera_discovery()
+                pixel_output = self.__configure.get("camera_pixel_output", "bgr")
+                if "frame_buffer_slots" in self.__configure:
+                    # native (Mono8/Bayer) frames are stored as single channel
+                    frame_shape = (int(self.__configure["camera_height"]), int(self.__configure["camera_width"]))
+                    self.__frame_buffer = FrameRingBuffer(num_slots=int(self.__configure["frame_buffer_slots"]), 
+                                                          shape=frame_shape+(3,) if pixel_output=="bgr" else frame_shape)
+                self.__camera_controller = GigEMultiCameraController(frame_buffer=self.__frame_buffer, 
+                                                                     sync_tolerance_ms=float(self.__configure.get("sync_tolerance_ms", 5.0)),
+                                                                     sync_by=self.__configure.get("sync_by", "frame_id"), # "timestamp" requires PTP synchronized or triggered cameras
+                                                                     emit_incomplete=bool(self.__configure.get("sync_emit_incomplete", True)),
+                                                                     acquisition=self.__configure.get("camera_acquisition", "callback"),
+                                                                     grab_strategy=self.__configure.get("camera_grab_strategy", "latest_images"),
+                                                                     max_num_buffer=int(self.__configure.get("camera_max_num_buffer", 10)),
+                                                                     output_queue_size=int(self.__configure.get("camera_output_queue_size", 2)),
+                                                                     grab_timeout_ms=int(self.__configure.get("camera_grab_timeout_ms", 5000)),
+                                                                     pixel_output=pixel_output,
+                                                                     device_manager=self.__device_manager)
                 self.__camera_controller.frame_update_signal.connect(self.show_updated_frame) # connect to frame grab signal
                 self.__camera_controller.frame_update_signal_multi.connect(self.show_updated_frame_multi) # connect to multi frame
+                self.__camera_controller.frame_slot_signal_multi.connect(self.dispatch_frame_slots) # connect to multi frame in frame buffer
                 self.__camera_controller.start_grab()
         except Exception as e:
             self.__console.critical(f"Camera controller cannot be open. It may already be opened.")
@@ -366,13 +492,22 @@ class AppWindow(QMainWindow):
         abs_path = self.__model_dir / self.__sdd_model_container[selected]
         print(f"load model path : {abs_path.as_posix()}")
 
-        self.__sdd_model = SegInference(model_path=abs_path.as_posix() ,device=self.__accel_device)
+        import torch
+        from vision.SDD.TransUNET_Seg.inference import SegInference
+        if self.__accel_device is None:
+            self.__accel_device = 'cuda:0' if torch.cuda.is_available() else 'cpu:0'
+            print(f"Selected inference Acceleration : {self.__accel_device}")
+
+        # runtime (eager/torchscript/onnxruntime) is selected by the model file extension
+        self.__sdd_model = SegInference(model_path=abs_path.as_posix(), device=self.__accel_device,
+                                        num_threads=int(self.__configure.get("sdd_runtime_threads", 0)))
+        print(f"Inference runtime : {self.__sdd_model.runtime.name} ({self.__sdd_model.device})")
+        self.__inference_worker.set_model(self.__sdd_model)
         
     
     # re-discover all gige network camera
     def on_select_camera_discovery(self):
-        __cam_found = gige_camera_discovery()
-        self.__update_camera_list(__cam_found)
+        self.__start_camera_discovery()
     
     # data recording
     def on_select_start_stop_data_recording(self):
@@ -401,8 +536,7 @@ class AppWindow(QMainWindow):
         self.__table_camlist_model.setRowCount(0)
         
         # find & update
-        __cam_found = gige_camera_discovery()
-        self.__update_camera_list(__cam_found)
+        self.__start_camera_discovery()
             
 
     # show message on status bar
@@ -415,116 +549,74 @@ class AppWindow(QMainWindow):
 
         self.__recorder_container[id].write_frame(image, fps)
     
-    # show updated multi image frame on GIO window
-    def show_updated_frame_multi(self, id:int, images:dict, fps:float):
-        t_start = datetime.now()
-
-        perf_count = 0
-        for idx, key in enumerate(images):
-            perf_count = perf_count+1
-            rgb_image = cv2.cvtColor(images[key], cv2.COLOR_BGR2RGB)
-            rgb_image = cv2.resize(rgb_image, dsize=(480, 300), interpolation=cv2.INTER_AREA)
-
-            ## SDD inference
-            if self.__do_inference and self.__sdd_model!=None:
-                pred_mask = self.__sdd_model.infer_image(rgb_image)
-                pred_mask = pred_mask * 255
-                pred_mask = pred_mask.astype(np.uint8)
-                #pred_mask_squeezed = np.squeeze(pred_mask).reshape(640,640,1) # check dimension
-                pred_mask_squeezed = pred_mask.reshape(640,640,1) # check dimension
-                pred_mask_color = cv2.cvtColor(pred_mask_squeezed, cv2.COLOR_GRAY2RGB)
-                mask_rgb_image = cv2.resize(pred_mask_color, dsize=(480, 300), interpolation=cv2.INTER_AREA)
-
-                # mask
-                lower_white = np.array([10, 10, 10], dtype=np.uint8)
-                upper_white = np.array([250, 250, 250], dtype=np.uint8)
-                mask = cv2.inRange(mask_rgb_image, lower_white, upper_white)
-                mask_rgb_image[mask!=0] = [255, 0, 0]
-
-                rgb_image = cv2.addWeighted(rgb_image, 0.5, mask_rgb_image, 0.5, 0)
+    # acquire multi image frame from the frame buffer and show
+    def dispatch_frame_slots(self, slots:dict, fps:float):
+        # display only : compositor acquires the latest slot when it paints
+        if not (self.__do_inference and self.__sdd_model!=None):
+            for camera_id, (slot, seq) in slots.items():
+                self.__compositor.submit_slot(camera_id, self.__frame_buffer, slot, seq, self.__get_pixel_format(camera_id), self.__get_texts(camera_id, fps))
+            return
+
+        images = {}
+        for camera_id, (slot, seq) in slots.items():
+            frame = self.__frame_buffer.acquire(slot, seq)
+            if frame is not None: # skip the frame already overwritten
+                images[camera_id] = frame
         
-            cv2.putText(rgb_image, f"Camera #{id}(fps:{int(fps)})", (10,50), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,0), 1, cv2.LINE_AA)
-            cv2.putText(rgb_image, t_start.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3], (10, 290), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,0), 1, cv2.LINE_AA)
-
-            #converting ndarray to qt image
-            _h, _w, _ch = rgb_image.shape
-            # print("Output image shape : {_h},{_w},{_ch}")
-            _bpl = _ch*_w # bytes per line
-            #qt_image = QImage(rgb_cam_image.data, _w, _h, _bpl, QImage.Format.Format_RGB888) # CAM image
-            qt_image = QImage(rgb_image.data, _w, _h, _bpl, QImage.Format.Format_RGB888)  # original image
-
-            # converting qt image to QPixmap
-            pixmap = QPixmap.fromImage(qt_image)
-
-            # draw on window
-            try:
-                window = self.findChild(QLabel, self.__frame_window_map[key])
-                window.setPixmap(pixmap.scaled(window.size(), Qt.AspectRatioMode.KeepAspectRatio))
-                window.repaint()
-            except Exception as e:
-                self.__console.critical(f"camera {e}")
+        try:
+            if len(images)>0:
+                self.show_updated_frame_multi(list(images.keys())[-1], images, fps)
+        finally:
+            for camera_id in images:
+                self.__frame_buffer.release(slots[camera_id][0])
     
-        self.__console.info("processed")
-        #self.__do_inference = False
-        
+    # show updated multi image frame on GIO window
+    def show_updated_frame_multi(self, id:int, images:dict, fps:float):
+        if not (self.__do_inference and self.__sdd_model!=None):
+            for key, image in images.items():
+                self.__compositor.submit(key, image, self.__get_pixel_format(key), self.__get_texts(key, fps))
+            return
+
+        ## SDD inference (shown when the result is ready)
+        rgb_images = {}
+        with self.__metric_convert.time():
+            for key in images:
+                rgb_images[key] = to_rgb_resized(images[key], self.__get_pixel_format(key), (480, 300))
+        self.__inference_worker.submit(rgb_images, fps)
+
+    # show multi image frame with inference result
+    def show_inference_result_multi(self, images:dict, masks:dict, fps:float):
+        from vision.SDD.TransUNET_Seg.utils import overlay_mask
+        for key, rgb_image in images.items():
+            with self.__metric_overlay.time():
+                overlay_mask(rgb_image, masks[key])
+            self.__compositor.submit(key, rgb_image, PIXEL_RGB8, self.__get_texts(key, fps))
+
+    # pixel format of frames from the camera
+    def __get_pixel_format(self, camera_id:int) -> str:
+        if self.__camera_controller is None:
+            return PIXEL_BGR8
+        return self.__camera_controller.get_pixel_format(camera_id)
+
+    # information texts on the camera window
+    def __get_texts(self, camera_id:int, fps:float) -> tuple:
+        return (f"Camera #{camera_id}(fps:{int(fps)})",)
 
     # show updated image frame on GUI window
     def show_updated_frame(self, id:int, image:np.ndarray, fps:float):
 
-        t_start = datetime.now()
-        start_time = time.perf_counter()
-
-        # converting color format
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        rgb_image = cv2.resize(rgb_image, dsize=(480, 300), interpolation=cv2.INTER_AREA)
-        
-
         ## SDD inference
         if self.__do_inference and self.__sdd_model!=None:
-            pred_mask = self.__sdd_model.infer_image(rgb_image)
-            pred_mask = pred_mask * 255
-            pred_mask = pred_mask.astype(np.uint8)
-            #pred_mask_squeezed = np.squeeze(pred_mask).reshape(640,640,1) # check dimension
-            pred_mask_squeezed = pred_mask.reshape(640,640,1) # check dimension
-            pred_mask_color = cv2.cvtColor(pred_mask_squeezed, cv2.COLOR_GRAY2RGB)
-            mask_rgb_image = cv2.resize(pred_mask_color, dsize=(480, 300), interpolation=cv2.INTER_AREA)
-
-            # mask
-            lower_white = np.array([10, 10, 10], dtype=np.uint8)
-            upper_white = np.array([250, 250, 250], dtype=np.uint8)
-            mask = cv2.inRange(mask_rgb_image, lower_white, upper_white)
-            mask_rgb_image[mask!=0] = [255, 0, 0]
-
-            rgb_image = cv2.addWeighted(rgb_image, 0.5, mask_rgb_image, 0.5, 0)
-
-
-        cv2.putText(rgb_image, f"Camera #{id}(fps:{int(fps)})", (10,50), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,0), 1, cv2.LINE_AA)
-        cv2.putText(rgb_image, t_start.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3], (10, 290), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,0), 1, cv2.LINE_AA)
-        
-        #converting ndarray to qt image
-        _h, _w, _ch = rgb_image.shape
-        # print("Output image shape : {_h},{_w},{_ch}")
-        _bpl = _ch*_w # bytes per line
-        #qt_image = QImage(rgb_cam_image.data, _w, _h, _bpl, QImage.Format.Format_RGB888) # CAM image
-        qt_image = QImage(rgb_image.data, _w, _h, _bpl, QImage.Format.Format_RGB888)  # original image
-
-        # converting qt image to QPixmap
-        pixmap = QPixmap.fromImage(qt_image)
-
-        # check performance
-        end_time = time.perf_counter()
-        elapsed_time = (end_time - start_time) * 1000
-        formatted_time = "{:.2f}".format(elapsed_time)
-        print(f"Process took {formatted_time} milliseconds")
-
-        self.__do_inference = False
-
-        # draw on window
-        try:
-            window = self.findChild(QLabel, self.__frame_window_map[id])
-            window.setPixmap(pixmap.scaled(window.size(), Qt.AspectRatioMode.KeepAspectRatio))
-        except Exception as e:
-            self.__console.critical(f"camera {e}")
+            from vision.SDD.TransUNET_Seg.utils import overlay_mask
+            with self.__metric_convert.time():
+                rgb_image = to_rgb_resized(image, self.__get_pixel_format(id), (480, 300))
+            pred_mask = self.__sdd_model.infer_batch([rgb_image], out_size=(480, 300))[0]
+            with self.__metric_overlay.time():
+                overlay_mask(rgb_image, pred_mask)
+            self.__do_inference = False
+            self.__compositor.submit(id, rgb_image, PIXEL_RGB8, self.__get_texts(id, fps))
+        else:
+            self.__compositor.submit(id, image, self.__get_pixel_format(id), self.__get_texts(id, fps))
         
         
     # close event callback function by user
@@ -538,16 +630,36 @@ class AppWindow(QMainWindow):
         if self.__camera_controller:
             if self.__camera_controller.get_num_camera()>0:
                 self.__camera_controller.close()
+        
+        # display compositor stop (holds no frame after stop)
+        self.__compositor.stop()
+
+        # release frame buffer
+        if self.__frame_buffer:
+            self.__frame_buffer.close()
+
+        # inference worker stop
+        self.__inference_worker.close()
 
-        # image recoder stop
+        # camera discovery stop
+        self.__wait_camera_discovery()
+
+        # image recoder stop (write all queued images)
         for idx in self.__image_recorder:
-            self.__image_recorder[idx].terminate()
+            self.__image_recorder[idx].stop()
+        self.__image_writer_pool.stop()
+        self.__console.info(f"Image writer : {self.__image_writer_pool.get_stats()}")
         
+        # close metrics publisher & endpoint
+        if self.__metrics_publisher:
+            self.__metrics_publisher.close()
+        if self.__metrics_server:
+            self.__metrics_server.close()
+
         # close monitoring thread
         try:
-            pass
-            #self.__sys_monitor.close()
-            #self.__gpu_monitor.close()
+            self.__sys_monitor.close()
+            self.__gpu_monitor.close()
         except AttributeError as e:
             self.__console.critical(f"{e}")
             
@@ -564,6 +676,15 @@ class AppWindow(QMainWindow):
         mem_usage_window.setValue(int(status["memory"]))
         storage_usage_window.setValue(int(status["storage"]))
         
+    # show metrics summary on status bar
+    def update_metrics(self, snapshot:dict):
+        texts = []
+        for key in ("sdd_inference_seconds", "display_convert_seconds", "display_paint_seconds"):
+            if key in snapshot and snapshot[key]["count"]>0:
+                texts.append(f"{key.replace('_seconds', '')} p50/p99 : {snapshot[key]['p50']*1000:.1f}/{snapshot[key]['p99']*1000:.1f}ms")
+        if len(texts)>0:
+            self.show_on_statusbar(", ".join(texts))
+
     # show update gpu monitoring on GUI window
     def update_gpu_status(self, status:dict):
         if "gpu_count" in status:
@@ -0,0 +1,96 @@
+'''
+Inference Server Load Test (concurrent keep-alive clients, latency percentiles and throughput)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import sys
+import pathlib
+import json
+import time
+import argparse
+import threading
+import numpy as np
+
+# root directory registration on system environment
+ROOT_PATH = pathlib.Path(__file__).parent.parent
+sys.path.append(ROOT_PATH.as_posix())
+
+from vision.SDD.TransUNET_Seg.client import SegClient
+
+
+# one client connection sending requests with the given number in flight
+def run_client(args, image:np.ndarray, latencies:list, errors:list, lock:threading.Lock):
+    try:
+        with SegClient(args.host, args.port, timeout=args.timeout, encoding=args.encoding) as client:
+            sent_at = {}
+            samples = []
+            for _ in range(min(args.in_flight, args.requests)):
+                sent_at[client.send(image)] = time.perf_counter()
+            num_sent = len(sent_at)
+
+            for _ in range(args.requests):
+                request_id, mask = client.receive()
+                samples.append((time.perf_counter() - sent_at.pop(request_id))*1000.)
+                if mask.shape != image.shape[:2]:
+                    raise RuntimeError(f"Unexpected mask shape {mask.shape}")
+                if num_sent < args.requests:
+                    sent_at[client.send(image)] = time.perf_counter()
+                    num_sent += 1
+        with lock:
+            latencies.extend(samples)
+    except Exception as e:
+        with lock:
+            errors.append(str(e))
+
+def run_load_test(args) -> dict:
+    shape = (args.height, args.width) if args.channels == 1 else (args.height, args.width, args.channels)
+    image = np.random.randint(0, 256, size=shape, dtype=np.uint8)
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+    clients = [threading.Thread(target=run_client, args=(args, image, latencies, errors, lock)) for _ in range(args.clients)]
+
+    t_start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - t_start
+
+    samples = np.array(latencies) if latencies else np.zeros(1)
+    return {"clients":args.clients,
+            "encoding":args.encoding,
+            "requests_per_client":args.requests,
+            "in_flight":args.in_flight,
+            "image_shape":list(shape),
+            "completed":len(latencies),
+            "errors":errors,
+            "elapsed_s":elapsed,
+            "throughput_rps":len(latencies)/elapsed if elapsed>0 else 0.,
+            "latency_ms":{"p50":float(np.percentile(samples, 50)),
+                          "p90":float(np.percentile(samples, 90)),
+                          "p99":float(np.percentile(samples, 99)),
+                          "max":float(samples.max())}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for the SDD inference server")
+    parser.add_argument('--host', type=str, default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=52525)
+    parser.add_argument('--clients', type=int, default=4, help="Number of concurrent connections")
+    parser.add_argument('--requests', type=int, default=100, help="Requests per client")
+    parser.add_argument('--in-flight', type=int, default=1, help="Requests in flight per client")
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--channels', type=int, default=1, choices=[1, 3])
+    parser.add_argument('--timeout', type=float, default=30.)
+    parser.add_argument('--encoding', type=str, default="raw", choices=["raw", "bitpack", "rle", "bbox_rle"], help="Response mask encoding")
+    parser.add_argument('--json', type=str, default=None, help="Save result as json file")
+    args = parser.parse_args()
+
+    result = run_load_test(args)
+    print(json.dumps(result, indent=2))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
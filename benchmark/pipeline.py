@@ -0,0 +1,279 @@
+'''
+End-to-End Pipeline Benchmark (grab -> convert -> infer -> overlay -> record) with synthetic camera input
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import sys, os
+import pathlib
+import json
+import time
+import queue
+import argparse
+import tempfile
+import threading
+import subprocess
+import resource
+import numpy as np
+import cv2
+
+# root directory registration on system environment
+ROOT_PATH = pathlib.Path(__file__).parent.parent
+sys.path.append(ROOT_PATH.as_posix())
+
+from util.logger.console import ConsoleLogger
+from vision.camera.source import SyntheticSource, FramePacer
+
+
+# latency samples per stage
+class StageLatency:
+    def __init__(self):
+        self.__samples = {}
+        self.__lock = threading.Lock()
+
+    def add(self, stage:str, elapsed_s:float):
+        with self.__lock:
+            self.__samples.setdefault(stage, []).append(elapsed_s*1000.)
+
+    def summary(self) -> dict:
+        result = {}
+        with self.__lock:
+            for stage, samples in self.__samples.items():
+                values = np.asarray(samples)
+                result[stage] = {"count":int(values.size),
+                                 "mean_ms":float(values.mean()),
+                                 "p50_ms":float(np.percentile(values, 50)),
+                                 "p90_ms":float(np.percentile(values, 90)),
+                                 "p99_ms":float(np.percentile(values, 99)),
+                                 "max_ms":float(values.max())}
+        return result
+
+
+# measure a stage
+class measure:
+    def __init__(self, latency:StageLatency, stage:str):
+        self.__latency = latency
+        self.__stage = stage
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.__latency.add(self.__stage, time.perf_counter()-self.__start)
+
+
+# memory usage of this process (MB)
+def get_memory_mb() -> dict:
+    try:
+        import psutil
+        rss = psutil.Process().memory_info().rss/1024/1024
+    except ImportError:
+        rss = None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024 # KB on linux
+    return {"rss_mb":rss, "peak_rss_mb":peak}
+
+
+# current git commit
+def get_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_PATH, capture_output=True, text=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+# camera grab thread (latest frames only, older frames are dropped like the camera driver does)
+class CameraFeeder(threading.Thread):
+    def __init__(self, source:SyntheticSource, latency:StageLatency, fps:float, queue_size:int=2):
+        super().__init__(daemon=True)
+        self.source = source
+        self.pacer = FramePacer(fps)
+        self.latency = latency
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.n_grabbed = 0
+        self.n_dropped = 0
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.pacer.wait()
+            with measure(self.latency, "grab"):
+                ret, frame = self.source.grab()
+            if not ret:
+                continue
+            self.n_grabbed += 1
+            item = (time.perf_counter(), frame)
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.n_dropped += 1
+                except queue.Empty:
+                    pass
+                self.queue.put_nowait(item)
+
+
+def run_benchmark(args) -> dict:
+    console = ConsoleLogger.get_logger()
+    latency = StageLatency()
+    out_dir = pathlib.Path(args.out_dir if args.out_dir else tempfile.mkdtemp(prefix="flame_bench_"))
+
+    # optional stages (heavy dependencies are loaded only when used)
+    sdd_model = None
+    if args.sdd_model:
+        import torch
+        from vision.SDD.TransUNET_Seg.inference import SegInference
+        from vision.SDD.TransUNET_Seg.utils import overlay_mask
+        device = 'cuda:0' if torch.cuda.is_available() and not args.cpu else 'cpu:0'
+        with measure(latency, "sdd_model_load"):
+            sdd_model = SegInference(model_path=args.sdd_model, device=device)
+
+    pose_model = None
+    if args.hpe_model:
+        from vision.HPE.YOLOv8 import PoseModel
+        with measure(latency, "hpe_model_load"):
+            pose_model = PoseModel(modelname=args.hpe_model, id=0)
+        pose_model.start()
+
+    recorders = {}
+    if args.record:
+        from util.logger.video import VideoRecorder
+        for id in range(args.cameras):
+            recorders[id] = VideoRecorder(dirpath=out_dir/"video", filename=f"camera_{id}", resolution=(args.width, args.height), fps=args.fps, codec=args.codec)
+            recorders[id].start()
+
+    image_pool = None
+    if args.write_images:
+        from util.logger.image import ImageWriterPool
+        image_pool = ImageWriterPool(num_workers=args.image_workers, queue_size=args.image_queue_size)
+        image_pool.start()
+
+    # synthetic cameras
+    feeders = []
+    for id in range(args.cameras):
+        source = SyntheticSource(id, width=args.width, height=args.height, fps=0) # paced by feeder (pacing excluded from grab latency)
+        source.open()
+        feeders.append(CameraFeeder(source, latency, fps=args.fps))
+
+    memory_before = get_memory_mb()
+    for feeder in feeders:
+        feeder.start()
+
+    n_sets = 0
+    n_frames = 0
+    t_begin = time.perf_counter()
+    while time.perf_counter()-t_begin < args.duration:
+        # collect one frame per camera
+        frames = {}
+        for id, feeder in enumerate(feeders):
+            try:
+                frames[id] = feeder.queue.get(timeout=1.0)
+            except queue.Empty:
+                pass
+        if len(frames)==0:
+            continue
+
+        display = {}
+        for id, (t_grab, frame) in frames.items():
+            with measure(latency, "convert"):
+                rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                display[id] = cv2.resize(rgb_image, dsize=(480, 300), interpolation=cv2.INTER_AREA)
+
+        if sdd_model is not None:
+            with measure(latency, "sdd_inference"):
+                masks = sdd_model.infer_batch(list(display.values()), out_size=(480, 300))
+            with measure(latency, "overlay"):
+                for idx, id in enumerate(display):
+                    overlay_mask(display[id], masks[idx])
+
+        for id, (t_grab, frame) in frames.items():
+            if pose_model is not None:
+                with measure(latency, "hpe_predict"):
+                    pose_model.predict(frame, args.fps)
+            if id in recorders:
+                with measure(latency, "record"):
+                    recorders[id].write_frame(frame, args.fps)
+            if image_pool is not None:
+                with measure(latency, "image_write"):
+                    image_pool.submit(out_dir/"image"/f"camera_{id}"/f"{n_sets:08d}.{args.image_ext}", frame)
+            latency.add("end_to_end", time.perf_counter()-t_grab)
+
+        n_sets += 1
+        n_frames += len(frames)
+    elapsed = time.perf_counter()-t_begin
+
+    for feeder in feeders:
+        feeder.stop_event.set()
+    for feeder in feeders:
+        feeder.join()
+
+    memory_after = get_memory_mb()
+    n_grabbed = sum(feeder.n_grabbed for feeder in feeders)
+    n_dropped = sum(feeder.n_dropped for feeder in feeders)
+
+    result = {"commit":get_commit(),
+              "timestamp":time.strftime("%Y-%m-%d %H:%M:%S"),
+              "config":vars(args),
+              "elapsed_s":elapsed,
+              "frames_processed":n_frames,
+              "frames_grabbed":n_grabbed,
+              "frames_dropped":n_dropped,
+              "drop_rate":(n_dropped/n_grabbed) if n_grabbed>0 else 0.,
+              "throughput_fps":n_frames/elapsed,
+              "set_rate_fps":n_sets/elapsed,
+              "memory":{"before":memory_before, "after":memory_after}}
+
+    if len(recorders)>0:
+        for recorder in recorders.values():
+            recorder.stop()
+        result["record"] = {id:recorder.get_stats() for id, recorder in recorders.items()}
+    if image_pool is not None:
+        image_pool.stop()
+        result["image_write"] = image_pool.get_stats()
+
+    result["stages"] = latency.summary()
+    console.info(f"Benchmark output directory : {out_dir.as_posix()}")
+    return result
+
+
+# compare with previous result
+def compare(current:dict, baseline:dict):
+    print(f"{'stage':<16}{'p50(ms)':>20}{'p99(ms)':>20}")
+    for stage, stats in current["stages"].items():
+        if stage in baseline.get("stages", {}):
+            base = baseline["stages"][stage]
+            print(f"{stage:<16}{base['p50_ms']:>9.2f} -> {stats['p50_ms']:<8.2f}{base['p99_ms']:>9.2f} -> {stats['p99_ms']:<8.2f}")
+    print(f"throughput : {baseline['throughput_fps']:.1f} -> {current['throughput_fps']:.1f} fps, drop rate : {baseline['drop_rate']:.3f} -> {current['drop_rate']:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline benchmark with synthetic cameras")
+    parser.add_argument('--cameras', type=int, default=4, help="Number of synthetic cameras")
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1200)
+    parser.add_argument('--fps', type=float, default=30., help="Target fps per camera (0 = unthrottled)")
+    parser.add_argument('--duration', type=float, default=10., help="Benchmark duration (seconds)")
+    parser.add_argument('--sdd-model', type=str, default=None, help="SegInference model path (enable inference stage)")
+    parser.add_argument('--cpu', action='store_true', help="Run inference on cpu")
+    parser.add_argument('--hpe-model', type=str, default=None, help="PoseModel name (enable pose estimation stage)")
+    parser.add_argument('--record', action='store_true', help="Enable video recording stage")
+    parser.add_argument('--codec', type=str, default="MJPG")
+    parser.add_argument('--write-images', action='store_true', help="Enable image writing stage")
+    parser.add_argument('--image-ext', type=str, default="jpg")
+    parser.add_argument('--image-workers', type=int, default=4)
+    parser.add_argument('--image-queue-size', type=int, default=128)
+    parser.add_argument('--out-dir', type=str, default=None, help="Output directory for video/image")
+    parser.add_argument('--json', type=str, default=None, help="Save result as json file")
+    parser.add_argument('--compare', type=str, default=None, help="Compare with previous json result")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    print(json.dumps(result, indent=2, default=str))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(result, json.load(f))
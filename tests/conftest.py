@@ -0,0 +1,5 @@
+import pathlib
+import sys
+
+# repository root on the import path (modules are imported as vision.*, util.*)
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
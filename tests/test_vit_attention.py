@@ -0,0 +1,69 @@
+'''
+Attention implementations of TransUNET ViT give the same output with the same parameters
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("einops")
+
+from vision.SDD.TransUNET_Seg import vit
+from vision.SDD.TransUNET_Seg.vit import MultiHeadAttention, ATTENTION_EINSUM, ATTENTION_SDPA, ATTENTION_CHUNKED
+
+EMBEDDING_DIM = 64
+HEAD_NUM = 4
+TOKENS = 65     # patches + class token (not a multiple of the chunk size)
+
+IMPLS = [(ATTENTION_CHUNKED, 16), (ATTENTION_CHUNKED, 1), (ATTENTION_CHUNKED, 256),
+         pytest.param(ATTENTION_SDPA, None, marks=pytest.mark.skipif(not vit._HAS_SDPA, reason="requires torch>=2.1"))]
+
+
+def make_masks():
+    generator = torch.Generator().manual_seed(1)
+    shared = torch.rand(1, 1, TOKENS, TOKENS, generator=generator) > 0.8    # same mask for all queries of all batches
+    shared[..., 0] = False  # no row has all keys masked
+    keys = torch.rand(2, 1, 1, TOKENS, generator=generator) > 0.8           # key padding mask per batch
+    keys[..., 0] = False
+    return {"none":None, "shared":shared, "keys":keys}
+
+
+@pytest.fixture(scope="module")
+def reference():
+    torch.manual_seed(0)
+    return MultiHeadAttention(EMBEDDING_DIM, HEAD_NUM, impl=ATTENTION_EINSUM).eval()
+
+
+@pytest.mark.parametrize("mask_name", ["none", "shared", "keys"])
+@pytest.mark.parametrize("impl,chunk_size", IMPLS)
+def test_attention_matches_einsum(reference, impl, chunk_size, mask_name):
+    attention = MultiHeadAttention(EMBEDDING_DIM, HEAD_NUM, impl=impl, chunk_size=chunk_size).eval()
+    attention.load_state_dict(reference.state_dict())
+    x = torch.rand(2, TOKENS, EMBEDDING_DIM, generator=torch.Generator().manual_seed(2))
+    mask = make_masks()[mask_name]
+
+    with torch.no_grad():
+        expected = reference(x, mask)
+        output = attention(x, mask)
+
+    assert output.shape == expected.shape
+    torch.testing.assert_close(output, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_set_attention_applies_to_default_modules(reference):
+    attention = MultiHeadAttention(EMBEDDING_DIM, HEAD_NUM).eval()
+    attention.load_state_dict(reference.state_dict())
+    x = torch.rand(1, TOKENS, EMBEDDING_DIM, generator=torch.Generator().manual_seed(3))
+
+    impl, chunk_size = vit._attention_impl, vit._attention_chunk_size
+    try:
+        vit.set_attention(ATTENTION_CHUNKED, chunk_size=8)
+        with torch.no_grad():
+            torch.testing.assert_close(attention(x), reference(x), rtol=1e-4, atol=1e-4)
+    finally:
+        vit.set_attention(impl, chunk_size)
+
+
+def test_set_attention_rejects_unknown():
+    with pytest.raises(ValueError):
+        vit.set_attention("flash")
@@ -0,0 +1,179 @@
+'''
+Display Compositor (latest frame per view, painted on a single timer)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import cv2
+import numpy as np
+from datetime import datetime
+try:
+    from PyQt6.QtGui import QImage, QPixmap
+    from PyQt6.QtWidgets import QLabel, QWidget
+    from PyQt6.QtCore import QObject, QTimer
+except ImportError:
+    from PyQt5.QtGui import QImage, QPixmap
+    from PyQt5.QtWidgets import QLabel, QWidget
+    from PyQt5.QtCore import QObject, QTimer
+
+from util.logger.console import ConsoleLogger
+from util.monitor.metrics import MetricsRegistry
+from util.monitor.startup import StartupProfiler
+from vision.camera.frame_buffer import FrameRingBuffer
+from vision.camera.pixel import PIXEL_BGR8, PIXEL_RGB8, PIXEL_MONO8, to_bgr
+
+# QImage format by pixel format (other formats like Bayer are converted into BGR before scaling)
+_QIMAGE_FORMAT = {PIXEL_BGR8:QImage.Format.Format_BGR888,
+                  PIXEL_RGB8:QImage.Format.Format_RGB888,
+                  PIXEL_MONO8:QImage.Format.Format_Grayscale8}
+
+
+# latest frame of a view (image or frame buffer slot)
+class _PendingFrame:
+    __slots__ = ("image", "frame_buffer", "slot", "seq", "pixel_format", "texts", "timestamp")
+
+    def __init__(self, image, frame_buffer, slot, seq, pixel_format, texts):
+        self.image = image
+        self.frame_buffer = frame_buffer
+        self.slot = slot
+        self.seq = seq
+        self.pixel_format = pixel_format
+        self.texts = texts
+        self.timestamp = datetime.now()
+
+
+'''
+Frames are only stored on submit; scaling, color handling and painting run once per refresh for each updated view.
+GUI cost depends on the refresh rate and widget size, not on the camera frame rate.
+'''
+class DisplayCompositor(QObject):
+    def __init__(self, parent:QWidget, view_map:dict, refresh_rate:float=30., show_timestamp:bool=True):
+        super().__init__(parent)
+
+        self.__console = ConsoleLogger.get_logger()
+        self.__parent = parent
+        self.__view_map = view_map       # label object name by view id
+        self.__widgets = {}              # cached label widget by view id
+        self.__pending = {}              # latest frame by view id
+        self.__overlays = {}             # (renderer, result) drawn on every painted frame by view id
+        self.__show_timestamp = show_timestamp
+        self.__stats = {"submitted":0, "painted":0, "replaced":0, "expired":0}
+
+        self.__timer = QTimer(self)
+        self.__timer.timeout.connect(self.__paint)
+        self.set_refresh_rate(refresh_rate)
+
+        self.__metric_paint = MetricsRegistry.get_registry().histogram("display_paint_seconds")
+
+    def set_refresh_rate(self, refresh_rate:float):
+        self.__timer.setInterval(max(1, int(1000./max(refresh_rate, 1.))))
+
+    def start(self):
+        self.__timer.start()
+
+    def stop(self):
+        self.__timer.stop()
+        self.__pending.clear()
+        self.__overlays.clear()
+
+    # submit image to the view (the image must not be modified by the caller afterward)
+    def submit(self, view_id:int, image:np.ndarray, pixel_format:str=PIXEL_BGR8, texts:tuple=()):
+        self.__put(view_id, _PendingFrame(image, None, -1, -1, pixel_format, texts))
+
+    # submit frame buffer slot to the view (acquired only when painted, skipped if overwritten)
+    def submit_slot(self, view_id:int, frame_buffer:FrameRingBuffer, slot:int, seq:int, pixel_format:str=PIXEL_BGR8, texts:tuple=()):
+        self.__put(view_id, _PendingFrame(None, frame_buffer, slot, seq, pixel_format, texts))
+
+    # set overlay of the view, drawn on the scaled copy with renderer.draw(image, result, scale) until replaced (None to clear)
+    def submit_overlay(self, view_id:int, result, renderer=None):
+        if result is None or renderer is None:
+            self.__overlays.pop(view_id, None)
+        else:
+            self.__overlays[view_id] = (renderer, result)
+
+    # counters (submitted/painted/replaced before painting/expired in frame buffer)
+    def get_stats(self) -> dict:
+        return self.__stats.copy()
+
+    def __put(self, view_id:int, frame:_PendingFrame):
+        if view_id in self.__pending:
+            self.__stats["replaced"] += 1
+        self.__pending[view_id] = frame
+        self.__stats["submitted"] += 1
+
+    def __paint(self):
+        if len(self.__pending)==0:
+            return
+
+        pending = self.__pending
+        self.__pending = {}
+        with self.__metric_paint.time():
+            for view_id, frame in pending.items():
+                try:
+                    self.__paint_view(view_id, frame)
+                except Exception as e:
+                    self.__console.critical(f"View {view_id} : {e}")
+
+    def __paint_view(self, view_id:int, frame:_PendingFrame):
+        widget = self.__get_widget(view_id)
+        if widget is None:
+            return
+
+        if frame.frame_buffer is not None:
+            image = frame.frame_buffer.acquire(frame.slot, frame.seq)
+            if image is None: # overwritten by newer frames
+                self.__stats["expired"] += 1
+                return
+            try:
+                width = image.shape[1]
+                scaled, pixel_format = self.__scale(image, frame.pixel_format, widget)
+            finally:
+                frame.frame_buffer.release(frame.slot)
+        else:
+            width = frame.image.shape[1]
+            scaled, pixel_format = self.__scale(frame.image, frame.pixel_format, widget)
+        if scaled is None:
+            return
+        if view_id in self.__overlays:
+            renderer, result = self.__overlays[view_id]
+            renderer.draw(scaled, result, scaled.shape[1]/width)
+        self.__draw_texts(scaled, frame)
+
+        _h, _w = scaled.shape[:2]
+        _bpl = scaled.strides[0] # bytes per line
+        qt_image = QImage(scaled.data, _w, _h, _bpl, _QIMAGE_FORMAT[pixel_format])
+        widget.setPixmap(QPixmap.fromImage(qt_image)) # schedules update (no forced repaint)
+        self.__stats["painted"] += 1
+        if self.__stats["painted"]==1:
+            StartupProfiler.get_profiler().mark("first frame shown")
+
+    # downscale straight to the widget size (keep aspect ratio), return scaled image (always a new array, texts are drawn on it) and its pixel format
+    def __scale(self, image:np.ndarray, pixel_format:str, widget:QLabel) -> tuple:
+        owned = False
+        if pixel_format not in _QIMAGE_FORMAT: # mosaic must be interpolated before scaling
+            image = to_bgr(image, pixel_format)
+            pixel_format = PIXEL_BGR8
+            owned = True
+
+        _h, _w = image.shape[:2]
+        scale = min(widget.width()/_w, widget.height()/_h)
+        if scale<=0:
+            return (None, pixel_format)
+        dsize = (max(1, int(_w*scale)), max(1, int(_h*scale)))
+        if dsize == (_w, _h):
+            return (image if owned else image.copy(), pixel_format) # submitted frame may be shared with the recorder
+        return (cv2.resize(image, dsize=dsize, interpolation=cv2.INTER_AREA if scale<1. else cv2.INTER_LINEAR), pixel_format)
+
+    def __draw_texts(self, image:np.ndarray, frame:_PendingFrame):
+        color = (0,255,0) if image.ndim==3 else 255
+        for idx, text in enumerate(frame.texts):
+            cv2.putText(image, text, (10, 20+idx*20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
+        if self.__show_timestamp:
+            cv2.putText(image, frame.timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3], (10, image.shape[0]-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
+
+    def __get_widget(self, view_id:int) -> QLabel:
+        widget = self.__widgets.get(view_id)
+        if widget is None and view_id in self.__view_map:
+            widget = self.__parent.findChild(QLabel, self.__view_map[view_id])
+            if widget is not None:
+                self.__widgets[view_id] = widget
+        return widget
@@ -0,0 +1,210 @@
+'''
+Columnar Result Logger (fixed-schema records buffered in preallocated numpy chunks, written as compressed npz on a background thread)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+try:
+    from PyQt6.QtCore import QObject
+except ImportError:
+    from PyQt5.QtCore import QObject
+
+import pathlib
+import queue
+import threading
+import time
+import zipfile
+import numpy as np
+from datetime import datetime
+from util.logger.console import ConsoleLogger
+from util.monitor.metrics import MetricsRegistry
+
+
+'''
+Schema is a dict of column name -> (shape of one record, dtype), e.g. {"timestamp":((), np.float64), "keypoints":((17, 3), np.float32)}.
+Appending only copies the records into the current chunk; full chunks (or partial ones after flush_interval_s) are handed to
+the writer thread, which appends each column as a member "<column>/<part>.npy" to the segment npz file.
+Segments are rotated by time or size, and every part is complete on disk once written (readable by load_columns()).
+'''
+class ColumnarLogger(QObject):
+    def __init__(self, dirpath:pathlib.Path, filename:str, schema:dict, chunk_rows:int=4096, flush_interval_s:float=5.,
+                 segment_time_s:float=0, segment_size_mb:float=0, queue_size:int=64, compress:bool=True):
+        super().__init__()
+
+        self.__console = ConsoleLogger.get_logger()
+        self.__dirpath = dirpath
+        self.__filename = filename
+        self.__schema = {name:(tuple(shape), np.dtype(dtype)) for name, (shape, dtype) in schema.items()}
+        self.__chunk_rows = max(1, int(chunk_rows))
+        self.__flush_interval_s = flush_interval_s
+        self.__compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        self.__is_working = False
+
+        # chunks (filled in caller thread, written in writer thread, then reused)
+        self.__chunk = None
+        self.__rows = 0
+        self.__chunk_start = 0
+        self.__free = queue.SimpleQueue()
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.__writer_thread = None
+        self.__n_rows = 0
+        self.__n_written = 0
+        self.__n_dropped = 0
+
+        # segment rotation (0 = disabled)
+        self.__segment_time_s = segment_time_s
+        self.__segment_size_bytes = int(segment_size_mb*1024*1024)
+        self.__segment_index = 0
+        self.__segment_start = 0
+        self.__part_index = 0
+        self.__out_path = None
+        self.__outfile = None
+
+        # metrics
+        registry = MetricsRegistry.get_registry()
+        self.__metric_write = registry.histogram("result_write_seconds", {"stream":filename})
+        self.__metric_dropped = registry.counter("result_rows_dropped_total", {"stream":filename})
+
+    def start(self):
+        if self.__is_working:
+            self.__console.warning("Result logging is now in progress...")
+            return
+
+        # create directory named from date
+        self.__out_path = self.__dirpath / datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+        self.__out_path.mkdir(parents=True, exist_ok=True)
+        self.__segment_index = 0
+        self.__open_segment()
+
+        self.__chunk = self.__get_chunk()
+        self.__rows = 0
+        self.__chunk_start = time.monotonic()
+        self.__n_rows = 0
+        self.__n_written = 0
+        self.__n_dropped = 0
+        self.__writer_thread = threading.Thread(target=self.__run, daemon=True)
+        self.__writer_thread.start()
+        self.__is_working = True
+
+    # stop logging (buffered records are written before return)
+    def stop(self):
+        if self.__is_working:
+            self.__is_working = False
+            self.__handoff()
+            self.__queue.put(None)
+            self.__writer_thread.join()
+            self.__writer_thread = None
+            self.__console.info(f"{self.__filename} : {self.__n_written} records written, {self.__n_dropped} records dropped")
+
+    def is_working(self) -> bool:
+        return self.__is_working
+
+    # append records, columns : dict of column name -> array of (rows,)+shape (scalar is broadcast to all rows)
+    def append(self, columns:dict, rows:int):
+        if not self.__is_working or rows<=0:
+            return
+
+        offset = 0
+        while offset < rows:
+            take = min(rows - offset, self.__chunk_rows - self.__rows)
+            for name, value in columns.items():
+                self.__chunk[name][self.__rows:self.__rows+take] = value if np.ndim(value)==0 else value[offset:offset+take]
+            self.__rows += take
+            offset += take
+            if self.__rows == self.__chunk_rows:
+                self.__handoff()
+        self.__n_rows += rows
+
+        if self.__flush_interval_s>0 and self.__rows>0 and (time.monotonic()-self.__chunk_start)>=self.__flush_interval_s:
+            self.__handoff()
+
+    # logging statistics
+    def get_stats(self) -> dict:
+        return {"appended":self.__n_rows, "written":self.__n_written, "dropped":self.__n_dropped,
+                "pending":self.__queue.qsize(), "segment":self.__segment_index}
+
+    # hand the current chunk to the writer thread (dropped if the queue is full)
+    def __handoff(self):
+        if self.__rows>0:
+            try:
+                self.__queue.put_nowait((self.__chunk, self.__rows))
+                self.__chunk = self.__get_chunk()
+            except queue.Full:
+                self.__n_dropped += self.__rows
+                self.__metric_dropped.inc(self.__rows)
+        self.__rows = 0
+        self.__chunk_start = time.monotonic()
+
+    # reuse chunk written by the writer thread, or allocate new one
+    def __get_chunk(self) -> dict:
+        try:
+            return self.__free.get_nowait()
+        except queue.Empty:
+            return {name:np.zeros((self.__chunk_rows,)+shape, dtype=dtype) for name, (shape, dtype) in self.__schema.items()}
+
+    # open new segment file
+    def __open_segment(self):
+        if self.__segment_time_s>0 or self.__segment_size_bytes>0:
+            self.__outfile = self.__out_path / f"{self.__filename}_{self.__segment_index:04d}.npz"
+        else:
+            self.__outfile = self.__out_path / f"{self.__filename}.npz"
+        self.__console.info(f"Logging in {self.__outfile.as_posix()}")
+        self.__segment_start = time.monotonic()
+        self.__part_index = 0
+
+    # check segment rotation condition
+    def __need_rotation(self) -> bool:
+        if self.__segment_time_s>0 and (time.monotonic()-self.__segment_start)>=self.__segment_time_s:
+            return True
+        if self.__segment_size_bytes>0 and self.__outfile.exists():
+            return self.__outfile.stat().st_size>=self.__segment_size_bytes
+        return False
+
+    # append a part (rows of all columns) to the segment file
+    def __write_part(self, chunk:dict, rows:int):
+        with zipfile.ZipFile(self.__outfile.as_posix(), mode="a", compression=self.__compression, compresslevel=1 if self.__compression==zipfile.ZIP_DEFLATED else None) as archive:
+            for name, array in chunk.items():
+                with archive.open(f"{name}/{self.__part_index:06d}.npy", mode="w", force_zip64=True) as member:
+                    np.lib.format.write_array(member, array[:rows], allow_pickle=False)
+        self.__part_index += 1
+
+    # writer thread loop
+    def __run(self):
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                break
+
+            chunk, rows = item
+            try:
+                with self.__metric_write.time():
+                    self.__write_part(chunk, rows)
+                self.__n_written += rows
+                if self.__need_rotation():
+                    self.__segment_index += 1
+                    self.__open_segment()
+            except Exception as e:
+                self.__console.critical(f"Result write error : {e}")
+                self.__n_dropped += rows
+            self.__free.put(chunk)
+
+
+# load columns of a logged file or all files in the directory (recursively, in name order), filtered by column value
+def load_columns(path:pathlib.Path, columns:list=None, where:dict=None) -> dict:
+    path = pathlib.Path(path)
+    files = sorted(path.rglob("*.npz")) if path.is_dir() else [path]
+
+    parts = {}
+    for file in files:
+        with np.load(file.as_posix(), allow_pickle=False) as archive:
+            for key in sorted(archive.files): # "<column>/<part>"
+                name = key.rsplit("/", 1)[0]
+                if columns is None or name in columns or (where and name in where):
+                    parts.setdefault(name, []).append(archive[key])
+    result = {name:np.concatenate(arrays) for name, arrays in parts.items()}
+
+    if where and result: # nothing to filter if no record is found
+        selected = np.ones(len(next(iter(result.values()))), dtype=bool)
+        for name, value in where.items():
+            selected &= np.isin(result[name], value)
+        result = {name:array[selected] for name, array in result.items() if columns is None or name in columns}
+    return result
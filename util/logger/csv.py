@@ -6,30 +6,56 @@ CSV(Comma Separated Value) Recorder Class
 import csv
 import typing
 import pathlib
-from PyQt6.QtCore import QObject
+try:
+    from PyQt6.QtCore import QObject
+except ImportError:
+    from PyQt5.QtCore import QObject
 from util.logger.console import ConsoleLogger
 
 class CSVRecorder(QObject):
-    def __init__(self, dirpath:pathlib.Path, filename:str) -> None:
+    def __init__(self, dirpath:pathlib.Path, filename:str, buffer_rows:int=256) -> None:
         super().__init__()
-        
+
         self.__console = ConsoleLogger.get_logger()
         self.__save_path = dirpath / f"{filename}.csv"
         self.__writer = None
         self.__csv_file = None
         self.__is_working = False
-        
+        self.__buffer = []  # rows written at once with writerows
+        self.__buffer_rows = max(1, int(buffer_rows))
+
     # start write
     def start(self):
+        if self.__is_working:
+            return
         self.__csv_file = open(self.__save_path.as_posix(), mode="a+", newline='')
         self.__writer = csv.writer(self.__csv_file)
         self.__is_working = True
-    
-    # stop write
+
+    # stop write (buffered rows are written and the file is closed)
     def stop(self):
         self.__is_working = False
-    
-    # write row in csv file
+        self.close()
+
+    # write row in csv file (buffered)
     def write_row(self, data:list):
         if self.__is_working:
-            self.__writer.writerow(data)
\ No newline at end of file
+            self.__buffer.append(data)
+            if len(self.__buffer)>=self.__buffer_rows:
+                self.flush()
+
+    # write buffered rows and flush file
+    def flush(self):
+        if self.__writer and len(self.__buffer)>0:
+            self.__writer.writerows(self.__buffer)
+            self.__buffer.clear()
+        if self.__csv_file:
+            self.__csv_file.flush()
+
+    # close file
+    def close(self):
+        if self.__csv_file:
+            self.flush()
+            self.__csv_file.close()
+            self.__csv_file = None
+            self.__writer = None
@@ -0,0 +1,127 @@
+'''
+Image Writer Pool Class (bounded queue, multiple encoding threads)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import cv2
+import queue
+import pathlib
+import threading
+import numpy as np
+from typing import Union
+
+from util.logger.console import ConsoleLogger
+from util.monitor.metrics import MetricsRegistry
+
+# policy when the queue is full
+DROP_NEWEST = "drop_newest"   # reject the image to be submitted
+DROP_OLDEST = "drop_oldest"   # discard the oldest queued image
+BLOCK = "block"               # block the caller until the queue has room (backpressure)
+
+
+class ImageWriterPool:
+    def __init__(self, num_workers:int=2, queue_size:int=64, policy:str=DROP_NEWEST, block_timeout:float=None):
+        self.__console = ConsoleLogger.get_logger()
+
+        if policy not in (DROP_NEWEST, DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unsupported drop policy : {policy}")
+
+        self.__num_workers = max(1, int(num_workers))
+        self.__policy = policy
+        self.__block_timeout = block_timeout
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.__workers = []
+        self.__lock = threading.Lock()
+        self.__created_dirs = set()
+        self.__stats = {"queued":0, "written":0, "dropped":0, "failed":0}
+
+        # metrics
+        registry = MetricsRegistry.get_registry()
+        self.__metric_write = registry.histogram("image_write_seconds")
+        self.__metric_dropped = registry.counter("image_dropped_total")
+
+    # start worker threads
+    def start(self):
+        if len(self.__workers)>0:
+            self.__console.warning("Image writer pool is already running")
+            return
+
+        for idx in range(self.__num_workers):
+            worker = threading.Thread(target=self.__run, name=f"image_writer_{idx}", daemon=True)
+            worker.start()
+            self.__workers.append(worker)
+
+    # stop worker threads after writing all queued images
+    def stop(self):
+        for _ in self.__workers:
+            self.__queue.put(None) # termination job per worker
+        for worker in self.__workers:
+            worker.join()
+        self.__workers.clear()
+
+    # submit image to write (encoding parameters are cv2.IMWRITE_* pairs), return False if dropped
+    # (writeable image is queued by reference and must not be modified by the caller afterward)
+    def submit(self, path:Union[pathlib.Path, str], image:np.ndarray, params:list=None) -> bool:
+        if not image.flags.writeable: # borrowed view (e.g. frame buffer slot) is released after this call
+            image = image.copy()
+        job = (str(path), image, params if params is not None else [])
+
+        try:
+            if self.__policy == BLOCK:
+                self.__queue.put(job, block=True, timeout=self.__block_timeout)
+            elif self.__policy == DROP_OLDEST:
+                while True:
+                    try:
+                        self.__queue.put_nowait(job)
+                        break
+                    except queue.Full:
+                        try:
+                            self.__queue.get_nowait()
+                            self.__count("dropped")
+                        except queue.Empty:
+                            pass
+            else:
+                self.__queue.put_nowait(job)
+        except queue.Full:
+            self.__count("dropped")
+            return False
+
+        self.__count("queued")
+        return True
+
+    # counters (queued/written/dropped/failed) and current queue length
+    def get_stats(self) -> dict:
+        with self.__lock:
+            stats = self.__stats.copy()
+        stats["pending"] = self.__queue.qsize()
+        return stats
+
+    def __count(self, key:str):
+        with self.__lock:
+            self.__stats[key] += 1
+        if key == "dropped":
+            self.__metric_dropped.inc()
+
+    # worker loop (cv2 releases GIL while encoding)
+    def __run(self):
+        while True:
+            job = self.__queue.get()
+            if job is None:
+                break
+
+            path, image, params = job
+            try:
+                parent = pathlib.Path(path).parent
+                if parent not in self.__created_dirs:
+                    parent.mkdir(parents=True, exist_ok=True)
+                    self.__created_dirs.add(parent)
+
+                with self.__metric_write.time():
+                    written = cv2.imwrite(path, image, params)
+                if written:
+                    self.__count("written")
+                else:
+                    self.__count("failed")
+            except Exception as e:
+                self.__count("failed")
+                self.__console.critical(f"Image write error({path}) : {e}")
@@ -0,0 +1,40 @@
+'''
+Keypoint Result Logger (one record per person : timestamp, camera, person, keypoints, score)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import pathlib
+import time
+import numpy as np
+from util.logger.columnar import ColumnarLogger, load_columns
+
+# number of keypoints (COCO)
+NUM_KEYPOINTS = 17
+
+
+'''
+Pose results are appended as arrays without per-person python work; files are loaded back with load_keypoints().
+'''
+class KeypointLogger(ColumnarLogger):
+    def __init__(self, dirpath:pathlib.Path, filename:str="keypoints", num_keypoints:int=NUM_KEYPOINTS, **kwargs):
+        super().__init__(dirpath, filename,
+                         schema={"timestamp":((), np.float64),           # epoch seconds
+                                 "camera":((), np.int16),
+                                 "person":((), np.int32),                # track id
+                                 "keypoints":((num_keypoints, 3), np.float32), # x, y, confidence
+                                 "score":((), np.float32)},
+                         **kwargs)
+
+    # log pose result (PoseResult) of the camera
+    def log(self, camera_id:int, result:object, timestamp:float=None):
+        if self.is_working() and len(result)>0:
+            self.append({"timestamp":time.time() if timestamp is None else timestamp,
+                         "camera":camera_id,
+                         "person":result.ids,
+                         "keypoints":result.keypoints,
+                         "score":result.scores}, rows=len(result))
+
+
+# load logged keypoints as columns (timestamp, camera, person, keypoints, score), optionally of the cameras
+def load_keypoints(path:pathlib.Path, camera=None) -> dict:
+    return load_columns(path, where=None if camera is None else {"camera":camera})
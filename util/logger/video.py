@@ -10,61 +10,287 @@ try:
 except ImportError:
     from PyQt5.QtCore import QObject, pyqtSignal
     from PyQt5.QtGui import QImage
-    
+
 import pathlib
+import queue
+import shutil
+import subprocess
+import threading
+import time
 from abc import *
 from util.logger.console import ConsoleLogger
+from util.monitor.metrics import MetricsRegistry
 from datetime import datetime
 import numpy as np
 
 
+'''
+Video encoding backend interface
+'''
+class IVideoBackend(ABC):
+    def __init__(self, ext:str=None) -> None:
+        super().__init__()
+        self.ext = ext # forced file extension (None = use recorder's)
+
+    @abstractmethod
+    def open(self, path:pathlib.Path, resolution:tuple, fps:float) -> bool:
+        pass
+
+    @abstractmethod
+    def write(self, image:np.ndarray) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+# encoding with opencv video writer (MJPG, FFV1, ...)
+class OpenCVBackend(IVideoBackend):
+    def __init__(self, fourcc:str="MJPG") -> None:
+        super().__init__()
+        self.__fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.__writer = None
+
+    def open(self, path:pathlib.Path, resolution:tuple, fps:float) -> bool:
+        self.__writer = cv2.VideoWriter(path.as_posix(), self.__fourcc, fps, resolution)
+        return self.__writer.isOpened()
+
+    def write(self, image:np.ndarray) -> None:
+        self.__writer.write(image)
+
+    def close(self) -> None:
+        if self.__writer:
+            self.__writer.release()
+            self.__writer = None
+
+
+# uncompressed YUV4MPEG2 (4:2:0) stream, no encoding cost
+class Y4MBackend(IVideoBackend):
+    def __init__(self) -> None:
+        super().__init__(ext="y4m")
+        self.__file = None
+
+    def open(self, path:pathlib.Path, resolution:tuple, fps:float) -> bool:
+        self.__file = open(path.as_posix(), mode="wb")
+        self.__file.write(f"YUV4MPEG2 W{resolution[0]} H{resolution[1]} F{int(round(fps*1000))}:1000 Ip A1:1 C420jpeg\n".encode())
+        return True
+
+    def write(self, image:np.ndarray) -> None:
+        self.__file.write(b"FRAME\n")
+        self.__file.write(cv2.cvtColor(image, cv2.COLOR_BGR2YUV_I420).data)
+
+    def close(self) -> None:
+        if self.__file:
+            self.__file.close()
+            self.__file = None
+
+
+# encoding with local ffmpeg process through pipe (libx264, h264_nvenc, ...)
+class FFmpegBackend(IVideoBackend):
+    def __init__(self, codec:str="libx264", preset:str="ultrafast") -> None:
+        super().__init__()
+        self.__console = ConsoleLogger.get_logger()
+        self.__codec = codec
+        self.__preset = preset
+        self.__process = None
+
+    def open(self, path:pathlib.Path, resolution:tuple, fps:float) -> bool:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            self.__console.critical("ffmpeg is not found")
+            return False
+
+        command = [ffmpeg, "-y", "-loglevel", "error",
+                   "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{resolution[0]}x{resolution[1]}", "-r", str(fps), "-i", "-",
+                   "-c:v", self.__codec, "-preset", self.__preset, "-pix_fmt", "yuv420p", path.as_posix()]
+        self.__process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        return True
+
+    def write(self, image:np.ndarray) -> None:
+        self.__process.stdin.write(np.ascontiguousarray(image).data)
+
+    def close(self) -> None:
+        if self.__process:
+            self.__process.stdin.close()
+            self.__process.wait()
+            self.__process = None
+
+
+# create backend from codec name
+def create_video_backend(codec:str) -> IVideoBackend:
+    codec = codec.upper()
+    if codec in ("MJPG", "FFV1", "XVID", "MP4V"):
+        return OpenCVBackend(fourcc=codec)
+    elif codec in ("RAW", "Y4M"):
+        return Y4MBackend()
+    elif codec == "H264":
+        return FFmpegBackend(codec="libx264")
+    elif codec == "H264_NVENC":
+        return FFmpegBackend(codec="h264_nvenc", preset="p1")
+    else:
+        raise ValueError(f"Unsupported video codec : {codec}")
+
+
 class VideoRecorder(QObject):
-    def __init__(self, dirpath:pathlib.Path, filename:str, resolution:(int,int), fps:float, ext:str="avi"):
+    def __init__(self, dirpath:pathlib.Path, filename:str, resolution:(int,int), fps:float, ext:str="avi",
+                 codec:str="MJPG", queue_size:int=64, segment_time_s:float=0, segment_size_mb:float=0):
         super().__init__()
-        
+
         self.__console = ConsoleLogger.get_logger()
-        
-        self.__writer = None
+
+        self.__backend:IVideoBackend = None
         self.__is_recording = False
         self.__dirpath = dirpath
         self.__filename = filename
         self.__resolution = resolution
         self.__fps = fps
         self.__ext = ext
-        self.__fourcc = cv2.VideoWriter_fourcc('M','J','P','G')
+        self.__codec = codec
         self.__video_outfile_absolute = None
 
+        # asynchronous writing
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.__writer_thread = None
+        self.__n_written = 0
+        self.__n_dropped = 0
+        self.__error = None # error which stopped the writer thread
+
+        # metrics
+        registry = MetricsRegistry.get_registry()
+        self.__metric_write = registry.histogram("video_write_seconds", {"stream":filename})
+        self.__metric_dropped = registry.counter("video_frames_dropped_total", {"stream":filename})
+
+        # segment rotation (0 = disabled)
+        self.__segment_time_s = segment_time_s
+        self.__segment_size_bytes = int(segment_size_mb*1024*1024)
+        self.__segment_index = 0
+        self.__segment_start = 0
+        self.__video_out_path = None
+
     def start(self):
         if self.__is_recording:
             self.__console.warning("Video recording is now in progress...")
             return
-        
+
         # create directory named from date
         record_start_datetime = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
-        video_out_path = self.__dirpath / record_start_datetime
-        video_out_path.mkdir(parents=True, exist_ok=True)
-        
-        self.__video_outfile_absolute = (video_out_path / f"{self.__filename}.{self.__ext}")
-        self.__console.info(f"Recording in {self.__video_outfile_absolute.as_posix()}")
-        
+        self.__video_out_path = self.__dirpath / record_start_datetime
+        self.__video_out_path.mkdir(parents=True, exist_ok=True)
+
         # create video writer
-        self.__writer = cv2.VideoWriter(self.__video_outfile_absolute.as_posix(), 
-                                        self.__fourcc,
-                                        self.__fps,
-                                        self.__resolution)
-        
+        self.__segment_index = 0
+        if not self.__open_segment():
+            return
+
+        self.__n_written = 0
+        self.__n_dropped = 0
+        self.__error = None
+        self.__drain_queue() # frames queued while the previous writer was failing
+        self.__writer_thread = threading.Thread(target=self.__run, daemon=True)
+        self.__writer_thread.start()
+
         self.__is_recording = True
-    
+
     def pause(self):
         self.__console.warning("Not support yet.")
-    
+
     def stop(self):
         print("recoring stop")
-        if self.__writer:
-            self.__writer.release()
-        self.__is_recording = False
-    
-    # write a frame
+        if self.__writer_thread is not None: # also after the writer stopped on error
+            self.__is_recording = False
+            if self.__writer_thread.is_alive():
+                self.__queue.put(None) # write remaining frames, then terminate
+            self.__writer_thread.join()
+            self.__drain_queue() # frames left by failed writer
+            self.__writer_thread = None
+            self.__console.info(f"{self.__filename} : {self.__n_written} frames written, {self.__n_dropped} frames dropped")
+
+    # write a frame (not blocking, dropped if the queue is full)
     def write_frame(self, image:np.ndarray, fps:float):
         if self.__is_recording:
-            self.__writer.write(image)
\ No newline at end of file
+            if not image.flags.writeable: # borrowed view (e.g. frame buffer slot) is released after this call
+                image = image.copy()
+            try:
+                self.__queue.put_nowait(image)
+            except queue.Full:
+                self.__n_dropped += 1
+                self.__metric_dropped.inc()
+
+    # recording (False after the writer stopped on error)
+    def is_recording(self) -> bool:
+        return self.__is_recording
+
+    # recording statistics (error is the message which stopped recording, or None)
+    def get_stats(self) -> dict:
+        return {"written":self.__n_written, "dropped":self.__n_dropped, "pending":self.__queue.qsize(), "segment":self.__segment_index,
+                "error":self.__error}
+
+    # discard queued frames (counted as dropped)
+    def __drain_queue(self):
+        while True:
+            try:
+                image = self.__queue.get_nowait()
+            except queue.Empty:
+                break
+            if image is not None:
+                self.__n_dropped += 1
+                self.__metric_dropped.inc()
+
+    # open new segment file
+    def __open_segment(self) -> bool:
+        self.__backend = create_video_backend(self.__codec)
+        ext = self.__backend.ext if self.__backend.ext else self.__ext
+        if self.__segment_time_s>0 or self.__segment_size_bytes>0:
+            self.__video_outfile_absolute = (self.__video_out_path / f"{self.__filename}_{self.__segment_index:04d}.{ext}")
+        else:
+            self.__video_outfile_absolute = (self.__video_out_path / f"{self.__filename}.{ext}")
+        self.__console.info(f"Recording in {self.__video_outfile_absolute.as_posix()}")
+
+        self.__segment_start = time.monotonic()
+        if not self.__backend.open(self.__video_outfile_absolute, self.__resolution, self.__fps):
+            self.__console.critical(f"Cannot open video writer ({self.__codec})")
+            return False
+        return True
+
+    # check segment rotation condition
+    def __need_rotation(self) -> bool:
+        if self.__segment_time_s>0 and (time.monotonic()-self.__segment_start)>=self.__segment_time_s:
+            return True
+        if self.__segment_size_bytes>0 and self.__n_written%int(max(self.__fps, 1))==0:
+            try:
+                return self.__video_outfile_absolute.stat().st_size>=self.__segment_size_bytes
+            except FileNotFoundError:
+                pass
+        return False
+
+    # writer thread loop
+    def __run(self):
+        while True:
+            image = self.__queue.get()
+            if image is None:
+                break
+
+            try:
+                with self.__metric_write.time():
+                    self.__backend.write(image)
+                self.__n_written += 1
+
+                if self.__need_rotation():
+                    self.__backend.close()
+                    self.__segment_index += 1
+                    if not self.__open_segment():
+                        self.__fail("Cannot open next segment")
+                        break
+            except Exception as e:
+                self.__fail(f"Video write error : {e}")
+                break
+
+        self.__backend.close()
+
+    # writer stopped on error, frames are no longer accepted (write_frame does not queue them silently)
+    def __fail(self, message:str):
+        self.__is_recording = False
+        self.__error = message
+        self.__console.critical(f"{self.__filename} : {message}, recording is stopped ({self.__n_written} frames written)")
+        self.__drain_queue()
@@ -0,0 +1,262 @@
+'''
+Lightweight Metrics Registry (counter, gauge, latency histogram) with Prometheus text endpoint
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from util.logger.console import ConsoleLogger
+
+# histogram resolution : 8 sub-buckets per power of two (max 12.5% relative error), microsecond unit
+_SUB_BUCKET_BITS = 3
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_NUM_BUCKETS = 256
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, n:int=1):
+        self.value += n
+
+
+class Gauge:
+    def __init__(self):
+        self.value = 0.
+
+    def set(self, value:float):
+        self.value = value
+
+
+'''
+HDR-style log-linear latency histogram (values in seconds)
+ - updates are not locked; a rare lost update under contention is tolerated
+'''
+class Histogram:
+    def __init__(self):
+        self.counts = [0]*_NUM_BUCKETS
+        self.count = 0
+        self.sum = 0.
+        self.max = 0.
+
+    def record(self, value_s:float):
+        us = int(value_s*1e6)
+        if us < _SUB_BUCKETS*2:
+            index = max(us, 0)
+        else:
+            exponent = us.bit_length()-1
+            index = (exponent-_SUB_BUCKET_BITS+1)*_SUB_BUCKETS + ((us >> (exponent-_SUB_BUCKET_BITS)) - _SUB_BUCKETS)
+            index = min(index, _NUM_BUCKETS-1)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value_s
+        if value_s > self.max:
+            self.max = value_s
+
+    # measure elapsed time of with-block
+    def time(self):
+        return _Timer(self)
+
+    # upper bound (seconds) of the bucket
+    @staticmethod
+    def bucket_upper(index:int) -> float:
+        if index < _SUB_BUCKETS*2:
+            return (index+1)/1e6
+        exponent = index//_SUB_BUCKETS + _SUB_BUCKET_BITS - 1
+        mantissa = index%_SUB_BUCKETS + _SUB_BUCKETS
+        return ((mantissa+1) << (exponent-_SUB_BUCKET_BITS))/1e6
+
+    # value (seconds) at the percentile (0~100)
+    def percentile(self, q:float) -> float:
+        if self.count == 0:
+            return 0.
+        target = self.count*q/100.
+        accumulated = 0
+        for index, n in enumerate(self.counts):
+            accumulated += n
+            if n > 0 and accumulated >= target:
+                return min(self.bucket_upper(index), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {"count":self.count, "mean":(self.sum/self.count) if self.count>0 else 0., "max":self.max,
+                "p50":self.percentile(50), "p90":self.percentile(90), "p99":self.percentile(99)}
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram:Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.histogram.record(time.perf_counter()-self.start)
+
+
+# metric returned when the registry is disabled (every call is no-op)
+class _NullMetric:
+    value = 0
+
+    def inc(self, n:int=1):
+        pass
+
+    def set(self, value:float):
+        pass
+
+    def record(self, value_s:float):
+        pass
+
+    def time(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_METRIC = _NullMetric()
+
+
+'''
+Metrics registry with singleton
+ - metrics should be enabled at startup before components get their metric instances
+'''
+class MetricsRegistry:
+    _registry = None
+
+    @classmethod
+    def get_registry(cls):
+        if cls._registry is None:
+            cls._registry = MetricsRegistry()
+        return cls._registry
+
+    def __init__(self):
+        self.__enabled = False
+        self.__lock = threading.Lock()
+        self.__metrics = {}
+
+    def set_enabled(self, enabled:bool):
+        self.__enabled = enabled
+
+    def is_enabled(self) -> bool:
+        return self.__enabled
+
+    def counter(self, name:str, labels:dict=None) -> Counter:
+        return self.__get(Counter, name, labels)
+
+    def gauge(self, name:str, labels:dict=None) -> Gauge:
+        return self.__get(Gauge, name, labels)
+
+    def histogram(self, name:str, labels:dict=None) -> Histogram:
+        return self.__get(Histogram, name, labels)
+
+    # snapshot of all metrics
+    def snapshot(self) -> dict:
+        with self.__lock:
+            metrics = list(self.__metrics.items())
+
+        result = {}
+        for key, metric in metrics:
+            if isinstance(metric, Histogram):
+                result[key] = metric.summary()
+            else:
+                result[key] = metric.value
+        return result
+
+    # prometheus text exposition format
+    def to_prometheus(self) -> str:
+        with self.__lock:
+            metrics = list(self.__metrics.items())
+
+        lines = []
+        for (name, label), metric in sorted(((self.__split(key), metric) for key, metric in metrics), key=lambda x:x[0]):
+            if isinstance(metric, Histogram):
+                accumulated = 0
+                for index, n in enumerate(metric.counts):
+                    if n > 0:
+                        accumulated += n
+                        le = 'le="%.6f"' % Histogram.bucket_upper(index)
+                        lines.append(f"{self.__labelled(name+'_bucket', self.__join(label, le))} {accumulated}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.__labelled(name+'_bucket', self.__join(label, le))} {metric.count}")
+                lines.append(f"{self.__labelled(name+'_sum', label)} {metric.sum}")
+                lines.append(f"{self.__labelled(name+'_count', label)} {metric.count}")
+            else:
+                lines.append(f"{self.__labelled(name, label)} {metric.value}")
+        return "\n".join(lines)+"\n"
+
+    def __get(self, cls, name:str, labels:dict):
+        if not self.__enabled:
+            return _NULL_METRIC
+
+        key = name if not labels else name+"{"+",".join(f'{k}="{v}"' for k, v in labels.items())+"}"
+        with self.__lock:
+            metric = self.__metrics.get(key)
+            if metric is None:
+                metric = cls()
+                self.__metrics[key] = metric
+        return metric
+
+    @staticmethod
+    def __split(key:str) -> tuple:
+        if "{" in key:
+            name, label = key.split("{", 1)
+            return (name, label[:-1])
+        return (key, "")
+
+    @staticmethod
+    def __join(label:str, extra:str) -> str:
+        return f"{label},{extra}" if label else extra
+
+    @staticmethod
+    def __labelled(name:str, label:str) -> str:
+        return f"{name}{{{label}}}" if label else name
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        registry = MetricsRegistry.get_registry()
+        if self.path == "/metrics":
+            body = registry.to_prometheus().encode()
+            content_type = "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body = json.dumps(registry.snapshot()).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args): # no access log
+        pass
+
+
+# local http endpoint (/metrics : prometheus text, /metrics.json : snapshot)
+class MetricsHTTPServer:
+    def __init__(self, port:int, host:str="127.0.0.1"):
+        self.__console = ConsoleLogger.get_logger()
+        self.__server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+
+    def start(self):
+        self.__thread.start()
+        self.__console.info(f"Metrics endpoint : http://{self.__server.server_address[0]}:{self.__server.server_address[1]}/metrics")
+
+    def close(self):
+        self.__server.shutdown()
+        self.__server.server_close()
@@ -0,0 +1,35 @@
+'''
+Metrics Snapshot Publisher for GUI
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+try:
+    from PyQt6.QtCore import QThread, pyqtSignal
+except ImportError:
+    from PyQt5.QtCore import QThread, pyqtSignal
+
+from util.monitor.metrics import MetricsRegistry
+
+
+# periodic snapshot publisher for GUI
+class MetricsPublisher(QThread):
+
+    snapshot_signal = pyqtSignal(dict)
+
+    def __init__(self, interval_ms:int=1000):
+        super().__init__()
+        self.interval = interval_ms
+
+    def run(self):
+        registry = MetricsRegistry.get_registry()
+        while True:
+            if self.isInterruptionRequested():
+                break
+            self.snapshot_signal.emit(registry.snapshot())
+            QThread.msleep(self.interval)
+
+    # close thread
+    def close(self) -> None:
+        self.requestInterruption()
+        self.quit()
+        self.wait(1000)
@@ -0,0 +1,123 @@
+'''
+Startup Time Profiler (module import time, init phases, time to first frame)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import sys
+import time
+import builtins
+import threading
+
+from util.logger.console import ConsoleLogger
+
+
+'''
+Startup profiler with singleton
+ - import time is measured per module on its first import (cumulative includes nested imports)
+ - every call is no-op until the profiler is started
+'''
+class StartupProfiler:
+    _profiler = None
+
+    @classmethod
+    def get_profiler(cls):
+        if cls._profiler is None:
+            cls._profiler = StartupProfiler()
+        return cls._profiler
+
+    def __init__(self):
+        self.__console = ConsoleLogger.get_logger()
+        self.__enabled = False
+        self.__t_start = 0.
+        self.__imports = {}     # module name -> [cumulative(s), self(s)]
+        self.__phases = []      # (name, elapsed(s))
+        self.__marks = {}       # name -> time since start(s)
+        self.__stack = []       # child time of imports in progress
+        self.__lock = threading.Lock()
+        self.__original_import = None
+
+    def is_enabled(self) -> bool:
+        return self.__enabled
+
+    # start measuring (install import hook)
+    def start(self):
+        if self.__enabled:
+            return
+        self.__enabled = True
+        self.__t_start = time.perf_counter()
+        self.__original_import = builtins.__import__
+        builtins.__import__ = self.__import
+
+    # stop measuring imports
+    def stop_imports(self):
+        if self.__original_import is not None:
+            builtins.__import__ = self.__original_import
+            self.__original_import = None
+
+    # measure a named init phase (with-block)
+    def phase(self, name:str):
+        return _Phase(self, name) if self.__enabled else _NULL_PHASE
+
+    def add_phase(self, name:str, elapsed_s:float):
+        self.__phases.append((name, elapsed_s))
+
+    # record the first occurrence of an event (ex. first frame shown)
+    def mark(self, name:str):
+        if self.__enabled and name not in self.__marks:
+            self.__marks[name] = time.perf_counter() - self.__t_start
+            self.__console.info(f"[startup] {name} at {self.__marks[name]*1000:.1f} ms")
+
+    def report(self, top:int=25) -> dict:
+        imports = sorted(self.__imports.items(), key=lambda x:x[1][1], reverse=True)
+        result = {"elapsed_s":time.perf_counter()-self.__t_start,
+                  "phases":dict(self.__phases),
+                  "marks":dict(self.__marks),
+                  "imports":{name:{"cumulative_s":t[0], "self_s":t[1]} for name, t in imports[:top]}}
+
+        self.__console.info(f"[startup] {result['elapsed_s']*1000:.1f} ms since start")
+        for name, elapsed in self.__phases:
+            self.__console.info(f"[startup] phase {name:<32} {elapsed*1000:9.1f} ms")
+        for name, (cumulative, self_time) in imports[:top]:
+            self.__console.info(f"[startup] import {name:<31} {self_time*1000:9.1f} ms (cumulative {cumulative*1000:.1f} ms)")
+        return result
+
+    def __import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # already loaded or relative import (measured by its absolute name) are not measured
+        if level!=0 or name in sys.modules or threading.current_thread() is not threading.main_thread():
+            return self.__original_import(name, globals, locals, fromlist, level)
+
+        self.__stack.append(0.)
+        t_begin = time.perf_counter()
+        try:
+            return self.__original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - t_begin
+            children = self.__stack.pop()
+            if self.__stack:
+                self.__stack[-1] += cumulative
+            with self.__lock:
+                self.__imports.setdefault(name, [cumulative, cumulative-children])
+
+
+class _Phase:
+    def __init__(self, profiler:StartupProfiler, name:str):
+        self.__profiler = profiler
+        self.__name = name
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.__profiler.add_phase(self.__name, time.perf_counter()-self.__start)
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
@@ -11,36 +11,143 @@ except ImportError:
     from PyQt5.QtCore import QObject, QThread, pyqtSignal
 import time
 
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
+from util.logger.console import ConsoleLogger
+from util.monitor.metrics import MetricsRegistry
+
+# default sampling interval(ms) per resource
+DEFAULT_INTERVALS = {"cpu":1000, "memory":2000, "storage":30000, "net":2000, "gpu":1000}
+
+
+'''
+Resource sampler with per-resource cadence
+ - cpu (total & per core), memory, storage, network rate (bytes/s), gpu (NVML, optional)
+ - usage is emitted as a new dict only when changed, at most once per emit interval
+'''
+class ResourceMonitor(QThread):
 
-# System Status Monitoring with QThread
-class SystemStatusMonitor(QThread):
-    
     usage_update_signal = pyqtSignal(dict)
-    
-    def __init__(self, interval_ms:int=1000):
+
+    def __init__(self, intervals:dict=None, emit_interval_ms:int=1000, storage_path:str="/", use_gpu:bool=False):
         super().__init__()
-        
-        self.interval = interval_ms
-        self.usage = {}
-    
+
+        self.__console = ConsoleLogger.get_logger()
+        self.__intervals = DEFAULT_INTERVALS.copy()
+        if intervals:
+            self.__intervals.update(intervals)
+        self.__emit_interval = emit_interval_ms/1000.
+        self.__storage_path = storage_path
+        self.__usage = {}
+        self.__last_net = None   # (time, bytes sent, bytes received)
+        self.__gpu_handle = []
+
+        # optional gpu sampling
+        if use_gpu and pynvml is not None:
+            try:
+                pynvml.nvmlInit()
+                self.__gpu_handle = [pynvml.nvmlDeviceGetHandleByIndex(id) for id in range(pynvml.nvmlDeviceGetCount())]
+                self.__usage["gpu_count"] = len(self.__gpu_handle)
+            except pynvml.NVMLError:
+                self.__console.warning("pynvml does not support for this device")
+        if not self.__gpu_handle:
+            self.__intervals.pop("gpu", None)
+
+        self.__samplers = {"cpu":self.__sample_cpu, "memory":self.__sample_memory, "storage":self.__sample_storage,
+                           "net":self.__sample_net, "gpu":self.__sample_gpu}
+
+        # metrics
+        registry = MetricsRegistry.get_registry()
+        self.__metric_cpu = registry.gauge("system_cpu_percent")
+        self.__metric_memory = registry.gauge("system_memory_percent")
+        self.__metric_sample = registry.histogram("system_monitor_sample_seconds")
+
     def run(self):
+        psutil.cpu_percent(percpu=True) # first call only sets the reference point
+        next_sample = {name:0. for name in self.__intervals}
+        next_emit = 0.
+        changed = False
+
         while True:
             if self.isInterruptionRequested():
                 break
-            
-            self.usage["cpu"] = psutil.cpu_percent()
-            self.usage["memory"] = psutil.virtual_memory().percent
-            self.usage["storage"] = psutil.disk_usage('/').percent
-            self.usage["net_send"] = psutil.net_io_counters().bytes_sent
-            self.usage["net_recv"] = psutil.net_io_counters().bytes_recv
-            
-            # emit signal
-            self.usage_update_signal.emit(self.usage)
-            
-            QThread.msleep(self.interval)
+
+            now = time.monotonic()
+            with self.__metric_sample.time():
+                for name, due in next_sample.items():
+                    if now >= due:
+                        changed |= self.__samplers[name]()
+                        next_sample[name] = now + self.__intervals[name]/1000.
+
+            if changed and now >= next_emit:
+                self.usage_update_signal.emit(self.__usage.copy()) # receivers get their own copy
+                next_emit = now + self.__emit_interval
+                changed = False
+
+            # sleep until the next sample (short enough to respond to interruption)
+            wake = min(min(next_sample.values()), next_emit if changed else float("inf"))
+            QThread.msleep(int(min(max(wake - time.monotonic(), 0.01), 0.2)*1000))
 
     # close thread
     def close(self) -> None:
         self.requestInterruption()
         self.quit()
-        self.wait(1000)
\ No newline at end of file
+        self.wait(1000)
+
+        if self.__gpu_handle:
+            pynvml.nvmlShutdown()
+            self.__gpu_handle = []
+
+    # update a value, return True if changed
+    def __update(self, key:str, value) -> bool:
+        if self.__usage.get(key) == value:
+            return False
+        self.__usage[key] = value
+        return True
+
+    def __sample_cpu(self) -> bool:
+        per_core = psutil.cpu_percent(percpu=True) # non-blocking, since the last call
+        total = round(sum(per_core)/len(per_core), 1) if per_core else 0.
+        self.__metric_cpu.set(total)
+        return self.__update("cpu_per_core", per_core) | self.__update("cpu", total)
+
+    def __sample_memory(self) -> bool:
+        memory = psutil.virtual_memory().percent
+        self.__metric_memory.set(memory)
+        return self.__update("memory", memory)
+
+    def __sample_storage(self) -> bool:
+        return self.__update("storage", psutil.disk_usage(self.__storage_path).percent)
+
+    def __sample_net(self) -> bool:
+        counters = psutil.net_io_counters()
+        now = time.monotonic()
+        changed = False
+        if self.__last_net is not None:
+            elapsed = now - self.__last_net[0]
+            if elapsed > 0:
+                changed |= self.__update("net_send", int((counters.bytes_sent - self.__last_net[1])/elapsed))
+                changed |= self.__update("net_recv", int((counters.bytes_recv - self.__last_net[2])/elapsed))
+        self.__last_net = (now, counters.bytes_sent, counters.bytes_recv)
+        return changed
+
+    def __sample_gpu(self) -> bool:
+        changed = False
+        try:
+            for id, handle in enumerate(self.__gpu_handle):
+                info = pynvml.nvmlDeviceGetUtilizationRates(handle)
+                changed |= self.__update(f"gpu_{id}", int(info.gpu))
+                changed |= self.__update(f"memory_{id}", int(info.memory))
+        except pynvml.NVMLError as e:
+            self.__console.warning(f"GPU sampling is stopped : {e}")
+            self.__intervals["gpu"] = float("inf")
+        return changed
+
+
+# System Status Monitoring with QThread (cpu, memory, storage, network rate)
+class SystemStatusMonitor(ResourceMonitor):
+    def __init__(self, interval_ms:int=1000):
+        super().__init__(intervals={"cpu":interval_ms, "memory":interval_ms*2, "net":interval_ms*2}, emit_interval_ms=interval_ms)
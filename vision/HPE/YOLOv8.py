@@ -8,15 +8,29 @@ from ultralytics import YOLO
 import pathlib
 import numpy as np
 from PyQt6.QtCore import QObject, pyqtSignal
-import cv2
 
 from util.logger.console import ConsoleLogger
 from vision.iestimator import IVisionEstimator
+from util.monitor.metrics import MetricsRegistry
+from vision.HPE.result import PoseResult
+from vision.HPE.overlay import PoseOverlayRenderer
+
+# pretrained pose model directory
+PRETRAINED_PATH = pathlib.Path(__file__).parent / "pretrained"
+
+# supported pretrained pose models
+POSE_MODELS = ("yolov8n-pose.pt", "yolov8s-pose.pt", "yolov8m-pose.pt", "yolov8l-pose.pt", "yolov8x-pose.pt", "yolov8x-pose-p6.pt")
+
+# load pretrained pose model (None for unsupported model name)
+def load_pose_model(modelname:str) -> YOLO:
+    if modelname.lower() not in POSE_MODELS:
+        return None
+    return YOLO(model=(PRETRAINED_PATH / modelname.lower()).as_posix())
 
 class PoseModel(QObject):
     
     estimated_result_image = pyqtSignal(np.ndarray)
-    estimated_result_kpt = pyqtSignal(list)
+    estimated_result = pyqtSignal(object) # PoseResult
     
     def __init__(self, modelname:str, id:int) -> None:
         super().__init__()
@@ -25,25 +39,15 @@ class PoseModel(QObject):
         
         self.__id = id
         
-        pretrained_path = pathlib.Path(__file__).parent / "pretrained"
-        self.__console.info(f"Load model in {pretrained_path.as_posix()}")
+        self.__console.info(f"Load model in {PRETRAINED_PATH.as_posix()}")
         self.__is_processing = False
         self.__pose_model = None
+        self.__renderer = PoseOverlayRenderer()
+        self.__metric_predict = MetricsRegistry.get_registry().histogram("pose_inference_seconds", {"camera":str(id)})
         
         try:
-            if modelname.lower() == "yolov8n-pose.pt":
-                self.__pose_model = YOLO(model=(pretrained_path / "yolov8n-pose.pt").as_posix())
-            elif modelname.lower() == "yolov8s-pose.pt":
-                self.__pose_model = YOLO(model=(pretrained_path / "yolov8s-pose.pt").as_posix())
-            elif modelname.lower() == "yolov8m-pose.pt":
-                self.__pose_model = YOLO(model=(pretrained_path / "yolov8m-pose.pt").as_posix())
-            elif modelname.lower() == "yolov8l-pose.pt":
-                self.__pose_model = YOLO(model=(pretrained_path / "yolov8l-pose.pt").as_posix())
-            elif modelname.lower() == "yolov8x-pose.pt":
-                self.__pose_model = YOLO(model=(pretrained_path / "yolov8x-pose.pt").as_posix())
-            elif modelname.lower() == "yolov8x-pose-p6.pt":
-                self.__pose_model = YOLO(model=(pretrained_path / "yolov8x-pose-p6.pt").as_posix())
-            else:
+            self.__pose_model = load_pose_model(modelname)
+            if self.__pose_model is None:
                 self.__console.warning("Unsupported HPE Model")
         except Exception as e:
             self.__console.critical(f"{e}")
@@ -55,18 +59,14 @@ class PoseModel(QObject):
     # hpe prediction    
     def predict(self, image:np.ndarray, fps:float):
         if self.__is_processing:
-            results = self.__pose_model.predict(image, iou=0.7, conf=0.7, verbose=False)
-            
-            # draw keypoints on image
-            if len(results[0].boxes)>0:
-                log_kps = []
-                for kps in results[0].keypoints.xy.tolist(): #for multi-person
-                    for kp in kps:
-                        cv2.circle(image, center=(int(kp[0]), int(kp[1])), radius=7, color=(255,0,0), thickness=-1)
-                        log_kps = log_kps + kp
+            with self.__metric_predict.time():
+                results = self.__pose_model.predict(image, iou=0.7, conf=0.7, verbose=False)
             
-                self.estimated_result_image.emit(image)
-                self.estimated_result_kpt.emit(log_kps)
+            # draw keypoints on a new image (the frame is shared with display and recorder)
+            result = PoseResult.from_yolo(results[0])
+            if len(result)>0:
+                self.estimated_result_image.emit(self.__renderer.compose(image, result))
+                self.estimated_result.emit(result)
             
     
     # start pose estimating
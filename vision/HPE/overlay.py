@@ -0,0 +1,95 @@
+'''
+Pose Overlay Renderer (skeletons of all persons drawn on a separate overlay buffer in one pass)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import cv2
+import numpy as np
+
+from vision.HPE.result import PoseResult
+
+# COCO skeleton (pairs of keypoint index)
+SKELETON = np.array([[15,13], [13,11], [16,14], [14,12], [11,12], [5,11], [6,12], [5,6], [5,7], [6,8],
+                     [7,9], [8,10], [1,2], [0,1], [0,2], [1,3], [2,4], [3,5], [4,6]], dtype=np.int64)
+
+# keypoint color by track id (BGR)
+PALETTE = np.array([[255,0,0], [0,255,0], [0,0,255], [255,255,0], [255,0,255], [0,255,255], [255,128,0], [128,0,255]], dtype=np.uint8)
+
+
+'''
+The frame is never drawn on. Limbs of all persons are drawn with a single polylines call and keypoints are stamped
+with precomputed disk offsets, both into an overlay buffer reused for the same size. Only the region covering the
+persons is cleared, masked and copied onto the target image.
+'''
+class PoseOverlayRenderer:
+    def __init__(self, kpt_conf:float=0.5, radius:int=4, thickness:int=2, limb_color:tuple=(255,255,255)):
+        self.__kpt_conf = kpt_conf
+        self.__thickness = thickness
+        self.__limb_color = limb_color
+        self.__margin = max(radius, thickness) + 2
+
+        offsets = np.mgrid[-radius:radius+1, -radius:radius+1].reshape(2, -1).T
+        self.__disk = offsets[(offsets**2).sum(axis=1) <= radius*radius]    # (pixels, 2) [dy, dx]
+
+        self.__overlay = None   # overlay buffer (reused while the size is the same)
+        self.__mask = None      # pixels drawn on the overlay (255), valid in the region
+        self.__region = None    # (top, bottom, left, right) drawn on the overlay
+
+    # render result into the overlay buffer of the shape (height, width), coordinates are multiplied by scale
+    # returns (overlay, mask, region), region is None if nothing is drawn
+    def render(self, result:PoseResult, shape:tuple, scale:float=1.) -> tuple:
+        shape = (int(shape[0]), int(shape[1]))
+        if self.__overlay is None or self.__overlay.shape[:2] != shape:
+            self.__overlay = np.zeros(shape + (3,), dtype=np.uint8)
+            self.__mask = np.zeros(shape, dtype=np.uint8)
+        elif self.__region is not None:
+            top, bottom, left, right = self.__region
+            self.__overlay[top:bottom, left:right] = 0
+        self.__region = None
+
+        xy = result.xy*scale
+        visible = result.conf >= self.__kpt_conf
+        if not visible.any():
+            return (self.__overlay, self.__mask, None)
+
+        # limbs : (persons*limbs, 2 points, 2) segments with both ends visible, one call (COCO keypoints only)
+        if xy.shape[1] > SKELETON.max():
+            limb_visible = visible[:, SKELETON[:, 0]] & visible[:, SKELETON[:, 1]]
+            segments = np.round(xy[:, SKELETON][limb_visible]).astype(np.int32)
+            if len(segments)>0:
+                cv2.polylines(self.__overlay, list(segments), isClosed=False, color=self.__limb_color, thickness=self.__thickness, lineType=cv2.LINE_AA)
+
+        # keypoints : disk stamped around all visible keypoints by fancy indexing, colored by track id
+        points = np.round(xy[visible][:, ::-1]).astype(np.int64)   # (points, 2) [y, x]
+        colors = PALETTE[np.broadcast_to(result.ids[:, None], visible.shape)[visible] % len(PALETTE)]
+        pixels = (points[:, None, :] + self.__disk[None, :, :]).reshape(-1, 2)
+        colors = np.repeat(colors, len(self.__disk), axis=0)
+        inside = (pixels[:, 0]>=0) & (pixels[:, 0]<shape[0]) & (pixels[:, 1]>=0) & (pixels[:, 1]<shape[1])
+        self.__overlay[pixels[inside, 0], pixels[inside, 1]] = colors[inside]
+
+        # region covering all visible keypoints (limbs connect visible keypoints only)
+        lower = np.maximum(points.min(axis=0) - self.__margin, 0)
+        upper = np.minimum(points.max(axis=0) + self.__margin + 1, shape)
+        if (lower >= upper).any():
+            return (self.__overlay, self.__mask, None)
+        top, bottom, left, right = int(lower[0]), int(upper[0]), int(lower[1]), int(upper[1])
+        self.__region = (top, bottom, left, right)
+        gray = cv2.cvtColor(self.__overlay[top:bottom, left:right], cv2.COLOR_BGR2GRAY)
+        cv2.compare(gray, 0, cv2.CMP_GT, dst=self.__mask[top:bottom, left:right])
+        return (self.__overlay, self.__mask, self.__region)
+
+    # draw result on the image owned by the caller (e.g. scaled copy for display), coordinates are multiplied by scale
+    def draw(self, image:np.ndarray, result:PoseResult, scale:float=1.) -> np.ndarray:
+        overlay, mask, region = self.render(result, image.shape[:2], scale)
+        if region is None:
+            return image
+        top, bottom, left, right = region
+        source = overlay[top:bottom, left:right]
+        if image.ndim==2:
+            source = cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
+        cv2.copyTo(source, mask[top:bottom, left:right], image[top:bottom, left:right]) # in place on the image region
+        return image
+
+    # new image of the frame with result (the frame is not modified)
+    def compose(self, frame:np.ndarray, result:PoseResult) -> np.ndarray:
+        return self.draw(frame.copy(), result)
@@ -0,0 +1,70 @@
+'''
+Pose Estimation Result (array-native keypoints, boxes, scores and track ids of persons in a frame)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import numpy as np
+
+# number of keypoints (COCO)
+NUM_KEYPOINTS = 17
+
+
+'''
+keypoints : (persons, keypoints, 3) float32, [x, y, confidence] in image coordinates (undetected keypoint has confidence 0)
+boxes : (persons, 4) float32, [x1, y1, x2, y2]
+scores : (persons,) float32, person confidence
+ids : (persons,) int64, track id (index of the person if not tracked)
+'''
+class PoseResult:
+    __slots__ = ("keypoints", "boxes", "scores", "ids")
+
+    def __init__(self, keypoints:np.ndarray, boxes:np.ndarray=None, scores:np.ndarray=None, ids:np.ndarray=None):
+        keypoints = np.asarray(keypoints, dtype=np.float32)
+        self.keypoints = keypoints.reshape(len(keypoints), -1, 3) if keypoints.size>0 else np.zeros((0, NUM_KEYPOINTS, 3), dtype=np.float32)
+        persons = len(self.keypoints)
+        self.boxes = self.__keypoint_boxes(self.keypoints) if boxes is None else np.asarray(boxes, dtype=np.float32).reshape(persons, 4)
+        self.scores = np.ones(persons, dtype=np.float32) if scores is None else np.asarray(scores, dtype=np.float32).reshape(persons)
+        self.ids = np.arange(persons, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64).reshape(persons)
+
+    def __len__(self) -> int:
+        return len(self.keypoints)
+
+    # result without person
+    @classmethod
+    def empty(cls, num_keypoints:int=NUM_KEYPOINTS):
+        return cls(np.zeros((0, num_keypoints, 3), dtype=np.float32))
+
+    # convert ultralytics result (one image) without python loop over persons
+    @classmethod
+    def from_yolo(cls, result):
+        if result.keypoints is None or len(result.boxes)==0:
+            return cls.empty()
+        xy = result.keypoints.xy.cpu().numpy()
+        conf = result.keypoints.conf.cpu().numpy() if result.keypoints.conf is not None else np.ones(xy.shape[:2], dtype=np.float32)
+        keypoints = np.concatenate((xy, conf[..., None]), axis=2)
+        return cls(keypoints, boxes=result.boxes.xyxy.cpu().numpy(), scores=result.boxes.conf.cpu().numpy())
+
+    # (persons, keypoints, 2) coordinates
+    @property
+    def xy(self) -> np.ndarray:
+        return self.keypoints[..., :2]
+
+    # (persons, keypoints) confidences
+    @property
+    def conf(self) -> np.ndarray:
+        return self.keypoints[..., 2]
+
+    # copy with track ids
+    def with_ids(self, ids:np.ndarray):
+        return PoseResult(self.keypoints, self.boxes, self.scores, ids)
+
+    @staticmethod
+    def __keypoint_boxes(keypoints:np.ndarray) -> np.ndarray:
+        if len(keypoints)==0:
+            return np.zeros((0, 4), dtype=np.float32)
+        # keypoints not detected (confidence 0) are excluded from the extent
+        visible = (keypoints[..., 2]>0)[..., None]
+        lower = np.where(visible, keypoints[..., :2], np.inf).min(axis=1)
+        upper = np.where(visible, keypoints[..., :2], -np.inf).max(axis=1)
+        boxes = np.concatenate((lower, upper), axis=1)
+        return np.where(np.isfinite(boxes), boxes, 0.).astype(np.float32)
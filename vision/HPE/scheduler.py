@@ -0,0 +1,62 @@
+'''
+Adaptive Inference Rate Scheduler (keeps end-to-end latency within the budget)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import time
+
+
+'''
+Inference rate is controlled by AIMD on the measured end-to-end latency (frame submitted -> result emitted)
+ - latency over budget : rate is divided by backoff (back off quickly, leaves resources to capture/display)
+ - latency under budget margin : rate is increased by a step (recover gradually up to the max rate)
+Frames arriving while waiting replace older ones, so the waiting adds no backlog.
+'''
+class AdaptiveRateScheduler:
+    def __init__(self, latency_budget_s:float, max_rate_hz:float=30., min_rate_hz:float=1., backoff:float=1.5, step_hz:float=1., margin:float=0.8):
+        self.__budget = float(latency_budget_s)
+        self.__min_interval = 1./max(max_rate_hz, 1e-3)
+        self.__max_interval = 1./max(min_rate_hz, 1e-3)
+        self.__backoff = backoff
+        self.__step = step_hz
+        self.__margin = margin
+
+        self.__interval = self.__min_interval
+        self.__next_time = 0.
+        self.__rate = 0.        # achieved inference rate (EMA, frames/sec)
+        self.__last_time = None
+
+    # seconds to wait before next inference (0 if it can run now)
+    def wait_time(self) -> float:
+        return max(0., self.__next_time - time.perf_counter())
+
+    # update interval with the end-to-end latency of the oldest frame in the batch and the number of frames done
+    def update(self, latency_s:float, frames:int=1):
+        now = time.perf_counter()
+        if self.__budget > 0:
+            if latency_s > self.__budget:
+                self.__interval = min(self.__max_interval, self.__interval*self.__backoff)
+            elif latency_s < self.__budget*self.__margin:
+                self.__interval = max(self.__min_interval, 1./(1./self.__interval + self.__step))
+        # interval is the period between inferences (the inference time is included)
+        self.__next_time = max(self.__next_time + self.__interval, now)
+
+        if self.__last_time is not None and now > self.__last_time:
+            instant = frames/(now - self.__last_time)
+            self.__rate = instant if self.__rate == 0. else 0.9*self.__rate + 0.1*instant
+        self.__last_time = now
+
+    # restart rate measurement (after pause)
+    def reset(self):
+        self.__next_time = 0.
+        self.__rate = 0.
+        self.__last_time = None
+
+    def get_interval(self) -> float:
+        return self.__interval
+
+    def get_rate(self) -> float:
+        return self.__rate
+
+    def get_budget(self) -> float:
+        return self.__budget
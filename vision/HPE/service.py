@@ -0,0 +1,207 @@
+'''
+Shared Pose Estimation Service (one model for all cameras, latest frame per camera predicted in a single batch)
+ - inference rate adapts to the end-to-end latency budget, stale frames are dropped
+ - tracking mode runs the detector every N frames (or on tracking quality drop) and propagates keypoints in between
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import time
+import threading
+import numpy as np
+try:
+    from PyQt6.QtCore import QThread, pyqtSignal
+except ImportError:
+    from PyQt5.QtCore import QThread, pyqtSignal
+
+from util.logger.console import ConsoleLogger
+from util.monitor.metrics import MetricsRegistry
+from vision.camera.frame_buffer import FrameRingBuffer
+from vision.HPE.YOLOv8 import load_pose_model
+from vision.HPE.scheduler import AdaptiveRateScheduler
+from vision.HPE.tracker import KeypointTracker
+from vision.HPE.result import PoseResult
+
+
+'''
+Cameras submit frames without waiting; only the latest frame of each camera is kept.
+The worker predicts all pending cameras in one batched call and routes keypoints back by camera id.
+Frames are never queued, so the latency is bounded by the scheduling interval and one inference.
+With detect_interval > 1, only the cameras whose tracker requests detection go to the model, the others are tracked.
+'''
+class PoseService(QThread):
+
+    estimated_result = pyqtSignal(int, object) # (camera id, PoseResult), keypoints as arrays with track ids
+
+    def __init__(self, modelname:str, max_batch:int=8, iou:float=0.7, conf:float=0.7,
+                 latency_budget_ms:float=0., max_rate_hz:float=30., min_rate_hz:float=1.,
+                 detect_interval:int=1, min_track_quality:float=0.5):
+        super().__init__()
+
+        self.__console = ConsoleLogger.get_logger()
+        self.__model = load_pose_model(modelname)
+        if self.__model is None:
+            raise ValueError(f"Unsupported HPE Model : {modelname}")
+
+        self.__max_batch = max(1, int(max_batch))
+        self.__iou = iou
+        self.__conf = conf
+        self.__is_processing = False
+        self.__reset_tracks = False
+        self.__pending = {} # latest (image, frame buffer, slot, seq, submitted time) by camera id
+        self.__condition = threading.Condition()
+        self.__scheduler = AdaptiveRateScheduler(latency_budget_s=latency_budget_ms/1000., max_rate_hz=max_rate_hz, min_rate_hz=min_rate_hz)
+        self.__detect_interval = max(1, int(detect_interval))
+        self.__min_track_quality = min_track_quality
+        self.__trackers = {}    # keypoint tracker by camera id (tracking mode), used only in the worker thread
+        self.__stats = {"submitted":0, "predicted":0, "replaced":0, "expired":0, "batches":0, "detected":0, "tracked":0}
+
+        registry = MetricsRegistry.get_registry()
+        self.__metric_predict = registry.histogram("pose_inference_seconds")
+        self.__metric_batch = registry.gauge("pose_batch_size")
+        self.__metric_latency = registry.histogram("pose_latency_seconds")
+        self.__metric_rate = registry.gauge("pose_rate_hz")
+        self.__metric_dropped = registry.counter("pose_dropped_frames_total")
+        self.__metric_detected = registry.counter("pose_detected_frames_total")
+        self.__metric_tracked = registry.counter("pose_tracked_frames_total")
+
+    # start pose estimating
+    def start_estimation(self):
+        with self.__condition:
+            self.__scheduler.reset()
+            self.__reset_tracks = True  # tracks before pause are stale
+        self.__is_processing = True
+
+    # stop pose estimating (pending frames are dropped, frame buffer slots are not held until predicted)
+    def stop_estimation(self):
+        self.__is_processing = False
+        with self.__condition:
+            self.__pending.clear()
+
+    def is_processing(self) -> bool:
+        return self.__is_processing
+
+    # submit image of the camera (the image must not be modified by the caller afterward)
+    def submit(self, camera_id:int, image:np.ndarray):
+        if self.__is_processing:
+            self.__put(camera_id, (image, None, -1, -1, time.perf_counter()))
+
+    # submit frame buffer slot of the camera (acquired only when predicted, skipped if overwritten)
+    def submit_slot(self, camera_id:int, frame_buffer:FrameRingBuffer, slot:int, seq:int):
+        if self.__is_processing:
+            self.__put(camera_id, (None, frame_buffer, slot, seq, time.perf_counter()))
+
+    # counters (submitted/predicted/replaced before prediction/expired in frame buffer/batches/detected/tracked),
+    # dropped frames, achieved inference rate and current scheduling interval
+    def get_stats(self) -> dict:
+        with self.__condition:
+            stats = self.__stats.copy()
+            stats["dropped"] = stats["replaced"] + stats["expired"]
+            stats["rate_hz"] = self.__scheduler.get_rate()
+            stats["interval_s"] = self.__scheduler.get_interval()
+        return stats
+
+    def __put(self, camera_id:int, frame:tuple):
+        with self.__condition:
+            if camera_id in self.__pending: # stale frame is dropped
+                self.__stats["replaced"] += 1
+                self.__metric_dropped.inc()
+            self.__pending[camera_id] = frame
+            self.__stats["submitted"] += 1
+            self.__condition.notify()
+
+    def run(self):
+        while True:
+            with self.__condition:
+                while not self.isInterruptionRequested():
+                    # wait for a frame, then for the scheduled time (newer frames replace the pending ones meanwhile)
+                    delay = self.__scheduler.wait_time() if len(self.__pending)>0 else 0.1
+                    if len(self.__pending)>0 and delay==0:
+                        break
+                    self.__condition.wait(delay)
+                if self.isInterruptionRequested():
+                    break
+                camera_ids = list(self.__pending.keys())[:self.__max_batch]
+                frames = {id:self.__pending.pop(id) for id in camera_ids}
+                if self.__reset_tracks:
+                    self.__trackers.clear()
+                    self.__reset_tracks = False
+
+            images, held = self.__acquire(frames)
+            if len(images)==0:
+                continue
+            t_submitted = min(frame[4] for frame in frames.values())
+
+            try:
+                self.__estimate(images)
+            except Exception as e:
+                self.__console.critical(f"Pose estimation error : {e}")
+            finally:
+                for frame_buffer, slot in held:
+                    frame_buffer.release(slot)
+
+            latency = time.perf_counter() - t_submitted
+            self.__metric_latency.record(latency)
+            with self.__condition:
+                self.__scheduler.update(latency, len(images))
+                self.__stats["predicted"] += len(images)
+                self.__stats["batches"] += 1
+            self.__metric_rate.set(self.__scheduler.get_rate())
+
+    # images to predict [(camera id, image)] and held frame buffer slots
+    def __acquire(self, frames:dict) -> tuple:
+        images, held = [], []
+        for camera_id, (image, frame_buffer, slot, seq, _) in frames.items():
+            if frame_buffer is not None:
+                image = frame_buffer.acquire(slot, seq)
+                if image is None: # overwritten by newer frames
+                    with self.__condition:
+                        self.__stats["expired"] += 1
+                    self.__metric_dropped.inc()
+                    continue
+                held.append((frame_buffer, slot))
+            images.append((camera_id, image))
+        return (images, held)
+
+    # detect (batched) or track keypoints of the images, then emit the results by camera
+    def __estimate(self, images:list):
+        if self.__detect_interval > 1:
+            for camera_id, _ in images:
+                if camera_id not in self.__trackers:
+                    self.__trackers[camera_id] = KeypointTracker(detect_interval=self.__detect_interval, min_quality=self.__min_track_quality)
+            detect = [(camera_id, image) for camera_id, image in images if self.__trackers[camera_id].needs_detection()]
+        else:
+            detect = images
+
+        estimated = {}  # result by camera id
+        if len(detect)>0:
+            with self.__metric_predict.time():
+                results = self.__model.predict([image for _, image in detect], iou=self.__iou, conf=self.__conf, verbose=False)
+            self.__metric_batch.set(len(detect))
+            for (camera_id, image), result in zip(detect, results):
+                estimated[camera_id] = PoseResult.from_yolo(result)
+                if camera_id in self.__trackers:
+                    estimated[camera_id] = self.__trackers[camera_id].update_detection(image, estimated[camera_id])
+
+        for camera_id, image in images:
+            if camera_id not in estimated: # tracked without detection
+                estimated[camera_id] = self.__trackers[camera_id].propagate(image)
+
+        num_tracked = len(images) - len(detect)
+        self.__metric_detected.inc(len(detect))
+        self.__metric_tracked.inc(num_tracked)
+        with self.__condition:
+            self.__stats["detected"] += len(detect)
+            self.__stats["tracked"] += num_tracked
+
+        # result arrays are routed to each camera (also empty result, so that consumers can clear the previous one)
+        for camera_id, result in estimated.items():
+            self.estimated_result.emit(camera_id, result)
+
+    # close thread
+    def close(self) -> None:
+        self.stop_estimation()
+        self.requestInterruption()
+        with self.__condition:
+            self.__condition.notify()
+        self.quit()
+        self.wait()
@@ -0,0 +1,132 @@
+'''
+Keypoint Tracker (detect-then-track, keypoints propagated by sparse optical flow between detections)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import cv2
+import numpy as np
+
+from vision.HPE.result import PoseResult
+
+
+'''
+Tracks of one camera. Detection results (keypoints of persons) are associated to the existing tracks by box IoU,
+so each occupant keeps its track id. Between detections, all keypoints are propagated with pyramidal Lucas-Kanade flow.
+Detection is requested every detect_interval frames, or when the ratio of keypoints still tracked drops below min_quality.
+'''
+class KeypointTracker:
+    def __init__(self, detect_interval:int=5, min_quality:float=0.5, match_iou:float=0.3, kpt_conf:float=0.5, win_size:int=21, max_level:int=3):
+        self.__detect_interval = max(1, int(detect_interval))
+        self.__min_quality = min_quality
+        self.__match_iou = match_iou
+        self.__kpt_conf = kpt_conf  # keypoints over this confidence are tracked
+        self.__lk_params = dict(winSize=(win_size, win_size), maxLevel=max_level,
+                                criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+        self.__prev_gray = None
+        self.__ids = np.zeros((0,), dtype=np.int64)            # track id (persons)
+        self.__keypoints = np.zeros((0, 0, 2), dtype=np.float32)  # (persons, keypoints, 2)
+        self.__conf = np.zeros((0, 0), dtype=np.float32)         # (persons, keypoints)
+        self.__valid = np.zeros((0, 0), dtype=bool)              # (persons, keypoints) detected and still tracked
+        self.__num_detected = 0                                  # number of valid keypoints at detection
+        self.__boxes = np.zeros((0, 4), dtype=np.float32)        # (persons, xyxy)
+        self.__scores = np.zeros((0,), dtype=np.float32)         # (persons,) detection score
+        self.__next_id = 0
+        self.__since_detection = None   # frames since last detection (None before first detection)
+
+    # True if the next frame should be given to the detector
+    def needs_detection(self) -> bool:
+        if self.__since_detection is None or self.__since_detection+1 >= self.__detect_interval:
+            return True
+        return self.__num_detected>0 and self.get_quality() < self.__min_quality
+
+    # ratio of keypoints still tracked since the detection (0 if there is no track)
+    def get_quality(self) -> float:
+        return float(self.__valid.sum())/self.__num_detected if self.__num_detected>0 else 0.
+
+    # update tracks with detection, returns the detection with track ids
+    def update_detection(self, image:np.ndarray, detection:PoseResult) -> PoseResult:
+        self.__ids = self.__associate(detection.boxes)
+        self.__keypoints = detection.xy.copy()
+        self.__conf = detection.conf.copy()
+        self.__boxes = detection.boxes.copy()
+        self.__scores = detection.scores.copy()
+        self.__valid = self.__conf >= self.__kpt_conf
+        self.__num_detected = int(self.__valid.sum())
+        self.__prev_gray = self.__gray(image)
+        self.__since_detection = 0
+        return detection.with_ids(self.__ids)
+
+    # propagate keypoints of all tracks to the image
+    def propagate(self, image:np.ndarray) -> PoseResult:
+        gray = self.__gray(image)
+        if self.__since_detection is not None:
+            self.__since_detection += 1
+        if self.__prev_gray is None or self.__keypoints.size==0 or self.__prev_gray.shape!=gray.shape:
+            self.__prev_gray = gray
+            return self.get_tracks()
+
+        points = self.__keypoints.reshape(-1, 1, 2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self.__prev_gray, gray, points, None, **self.__lk_params)
+        tracked = status.reshape(self.__keypoints.shape[:2]).astype(bool)
+        moved = moved.reshape(self.__keypoints.shape)
+
+        # lost keypoints stay in place with no confidence, boxes follow the median motion of tracked keypoints
+        tracked &= self.__valid
+        for p in range(len(self.__ids)):
+            if tracked[p].any():
+                self.__boxes[p] += np.tile(np.median(moved[p][tracked[p]] - self.__keypoints[p][tracked[p]], axis=0), 2)
+        self.__keypoints = np.where(tracked[..., None], moved, self.__keypoints)
+        self.__valid = tracked
+        self.__prev_gray = gray
+        return self.get_tracks()
+
+    # current tracks (confidence of lost keypoints is 0)
+    def get_tracks(self) -> PoseResult:
+        if len(self.__ids)==0:
+            return PoseResult.empty()
+        conf = np.where(self.__valid, self.__conf, 0.)[..., None]
+        return PoseResult(np.concatenate((self.__keypoints, conf), axis=2), self.__boxes.copy(), self.__scores.copy(), self.__ids.copy())
+
+    # drop all tracks (detection is requested for the next frame)
+    def reset(self):
+        self.__prev_gray = None
+        self.__ids = np.zeros((0,), dtype=np.int64)
+        self.__keypoints = np.zeros((0, 0, 2), dtype=np.float32)
+        self.__conf = np.zeros((0, 0), dtype=np.float32)
+        self.__valid = np.zeros((0, 0), dtype=bool)
+        self.__num_detected = 0
+        self.__boxes = np.zeros((0, 4), dtype=np.float32)
+        self.__scores = np.zeros((0,), dtype=np.float32)
+        self.__since_detection = None
+
+    # ids for detected boxes (greedy matching on IoU with current track boxes, new id if unmatched)
+    def __associate(self, boxes:np.ndarray) -> np.ndarray:
+        ids = np.full(len(boxes), -1, dtype=np.int64)
+        if len(self.__ids)>0 and len(boxes)>0:
+            iou = self.__iou(self.__boxes, boxes) # (tracks, detections)
+            for _ in range(min(iou.shape)):
+                t, d = np.unravel_index(np.argmax(iou), iou.shape)
+                if iou[t, d] < self.__match_iou:
+                    break
+                ids[d] = self.__ids[t]
+                iou[t, :] = -1.
+                iou[:, d] = -1.
+        for d in np.flatnonzero(ids<0):
+            ids[d] = self.__next_id
+            self.__next_id += 1
+        return ids
+
+    @staticmethod
+    def __iou(a:np.ndarray, b:np.ndarray) -> np.ndarray:
+        lt = np.maximum(a[:, None, :2], b[None, :, :2])
+        rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+        inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+        area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+        area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+        return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+    # own grayscale copy (the image may be a frame buffer slot released after this call, kept as prev_gray)
+    @staticmethod
+    def __gray(image:np.ndarray) -> np.ndarray:
+        return image.copy() if image.ndim==2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
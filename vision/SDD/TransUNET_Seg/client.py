@@ -0,0 +1,74 @@
+import socket
+import numpy as np
+
+# Additional Scripts
+from .protocol import HEADER, MSG_REQUEST, MSG_RESPONSE, MSG_ERROR, ProtocolError, pack_header, unpack_header
+from vision import mask_codec
+
+
+class SegClient:
+    # 추론 서버 클라이언트 (연결 유지, 요청을 연속 전송 후 응답을 순서대로 수신 가능)
+    def __init__(self, host, port, timeout=10., encoding='raw'):
+        # encoding : 응답 mask 인코딩 (raw / bitpack / rle / bbox_rle), 수신 시 디코딩하여 uint8 mask로 반환
+        self.encoding = mask_codec.MASK_ENCODINGS.get(encoding, encoding)
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.header = memoryview(bytearray(HEADER.size))
+        self.next_id = 0
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def send(self, image):
+        # 요청 전송 후 request id 반환 (image : uint8 HxW 또는 HxWxC)
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        request_id = self.next_id
+        self.next_id = (self.next_id + 1) & 0xFFFFFFFF
+        self.sock.sendall(pack_header(MSG_REQUEST, request_id, image, encoding=self.encoding))
+        self.sock.sendall(memoryview(image).cast('B'))
+        return request_id
+
+    def receive(self):
+        # (request id, mask) 반환, 서버 오류는 RuntimeError
+        self.__recv_into(self.header)
+        msg_type, request_id, dtype, shape, payload_len, encoding = unpack_header(self.header)
+        if msg_type == MSG_ERROR:
+            message = bytearray(payload_len)
+            self.__recv_into(memoryview(message))
+            raise RuntimeError(f'Request {request_id} : {message.decode()}')
+        if msg_type != MSG_RESPONSE:
+            raise ProtocolError(f'Unexpected message type {msg_type}')
+
+        if encoding != mask_codec.MASK_RAW:
+            payload = bytearray(payload_len)
+            self.__recv_into(memoryview(payload))
+            return request_id, mask_codec.decode(payload)
+
+        mask = np.empty(shape, dtype=dtype)
+        self.__recv_into(memoryview(mask).cast('B'))
+        return request_id, mask
+
+    def infer(self, image):
+        # 한 장 요청 후 mask(uint8 HxW, 0/255) 반환
+        self.send(image)
+        return self.receive()[1]
+
+    def infer_many(self, images):
+        # 모두 전송 후 응답 수신 (서버에서 같은 batch로 처리될 수 있음)
+        request_ids = [self.send(image) for image in images]
+        results = dict(self.receive() for _ in request_ids)
+        return [results[request_id] for request_id in request_ids]
+
+    def __recv_into(self, view):
+        received = 0
+        while received < len(view):
+            nbytes = self.sock.recv_into(view[received:])
+            if nbytes == 0:
+                raise ConnectionError('Connection closed by server')
+            received += nbytes
@@ -18,3 +18,5 @@ cfg.transunet.mlp_dim = 1024
 cfg.transunet.block_num = 8
 cfg.transunet.patch_dim = 16
 cfg.transunet.class_num = 1
+cfg.transunet.attention = 'auto'            # einsum / sdpa / chunked / auto (vit.set_attention)
+cfg.transunet.attention_chunk_size = 256
@@ -0,0 +1,102 @@
+import os
+import sys
+import argparse
+import torch
+
+# Additional Scripts
+from .train_transunet import TransUNetSeg
+from .runtime import TorchScriptRuntime, OnnxRuntime
+from .vit import set_attention
+from .config import cfg
+from vision.checkpoint import save_slim
+
+
+def export_torchscript(model, example, path):
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example)
+    traced.save(path)
+    print(f'TorchScript saved to {path}')
+
+
+def export_onnx(model, example, path, opset=12, dynamic_batch=True):
+    dynamic_axes = {'image': {0: 'batch'}, 'mask': {0: 'batch'}} if dynamic_batch else None
+    with torch.no_grad():
+        torch.onnx.export(model, example, path,
+                          input_names=['image'], output_names=['mask'],
+                          dynamic_axes=dynamic_axes, opset_version=opset, do_constant_folding=True)
+    print(f'ONNX saved to {path}')
+
+
+def check_parity(reference, runtime, images, atol, name):
+    # 같은 입력에 대해 eager 출력(logit)과 비교, mask(threshold) 불일치 비율도 함께 출력
+    with torch.no_grad():
+        expected = reference(images).cpu()
+        actual = runtime(images.to(runtime.device)).cpu().float()
+
+    max_abs = (expected - actual).abs().max().item()
+    mask_mismatch = ((expected >= 0) != (actual >= 0)).float().mean().item()
+    passed = max_abs <= atol
+    print(f'[{name}] batch {images.shape[0]} : max abs diff {max_abs:.3e}, mask mismatch {mask_mismatch * 100:.4f}% - {"OK" if passed else "FAIL"}')
+    return passed
+
+
+def main(args):
+    device = 'cpu:0'  # export와 parity check는 CPU에서 수행 (CPU 추론 PC와 동일 조건)
+    transunet = TransUNetSeg(device, inference=True)
+    transunet.load_model(args.model_path)
+    model = transunet.model
+
+    dim = cfg.transunet.img_dim
+    example = torch.rand(args.batch_size, cfg.transunet.in_channels, dim, dim)
+    stem = os.path.splitext(args.model_path)[0]
+    out_stem = os.path.join(args.out_dir, os.path.basename(stem)) if args.out_dir else stem
+
+    # dynamic batch 모델은 export 때와 다른 batch 크기로도 검사
+    batches = [torch.rand(args.batch_size, cfg.transunet.in_channels, dim, dim)]
+    if not args.fixed_batch:
+        batches.append(torch.rand(args.batch_size + 1, cfg.transunet.in_channels, dim, dim))
+
+    passed = True
+    if args.format in ('all', 'slim'):
+        # 추론 전용 checkpoint (가중치만, metadata 포함)
+        path = f'{out_stem}.slim.pth'
+        metadata = {'img_dim': dim, 'in_channels': cfg.transunet.in_channels,
+                    'class_num': cfg.transunet.class_num, 'threshold': cfg.inference_threshold}
+        digest = save_slim(path, model.state_dict(), metadata=metadata, half=args.half)
+        print(f'Slim checkpoint saved to {path} (sha256 {digest})')
+
+    if args.format in ('all', 'torchscript'):
+        path = f'{out_stem}.torchscript'
+        export_torchscript(model, example, path)
+        runtime = TorchScriptRuntime(path, device)
+        passed &= all(check_parity(model, runtime, images, args.atol, 'torchscript') for images in batches)
+
+    if args.format in ('all', 'onnx'):
+        # ONNX graph는 attention을 matmul/softmax로 나눠 export (opset 제약 없음, energy 텐서는 chunk 크기만큼)
+        set_attention(args.onnx_attention, cfg.transunet.attention_chunk_size)
+        path = f'{out_stem}.onnx'
+        export_onnx(model, example, path, opset=args.opset, dynamic_batch=not args.fixed_batch)
+        try:
+            runtime = OnnxRuntime(path)
+        except ImportError:
+            print('onnxruntime is not installed, parity check is skipped')
+        else:
+            passed &= all(check_parity(model, runtime, images, args.atol, 'onnxruntime') for images in batches)
+
+    return passed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export TransUNet checkpoint into slim checkpoint, TorchScript/ONNX with numerical parity check')
+    parser.add_argument('--model_path', type=str, required=True)
+    parser.add_argument('--format', type=str, choices=['all', 'slim', 'torchscript', 'onnx'], default='all')
+    parser.add_argument('--half', action='store_true', help='store slim checkpoint weights as fp16')
+    parser.add_argument('--out_dir', type=str, default=None)
+    parser.add_argument('--batch_size', type=int, default=1)
+    parser.add_argument('--fixed_batch', action='store_true', help='export with fixed batch size (no dynamic batch axis)')
+    parser.add_argument('--opset', type=int, default=12)
+    parser.add_argument('--atol', type=float, default=1e-3)
+    parser.add_argument('--onnx_attention', type=str, choices=['einsum', 'chunked', 'sdpa'], default='chunked')
+    args = parser.parse_args()
+
+    sys.exit(0 if main(args) else 1)
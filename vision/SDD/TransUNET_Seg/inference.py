@@ -1,120 +1,171 @@
 import os
 import cv2
+import math
 import torch
+import torch.nn.functional as F
 import numpy as np
 import datetime
 
 # Additional Scripts
-from .train_transunet import TransUNetSeg
-from .utils import thresh_func
+from .runtime import create_runtime
 from .config import cfg
+from util.monitor.metrics import MetricsRegistry
+from vision import mask_codec
 import time
+import threading
 
 
 class SegInference:
-    def __init__(self, model_path, device):
-        self.device = device
-        self.transunet = TransUNetSeg(device)
-        self.transunet.load_model(model_path)
+    def __init__(self, model_path, device, runtime=None, num_threads=0):
+        # runtime : eager / torchscript / onnxruntime (None이면 모델 파일 확장자로 결정)
+        self.runtime = create_runtime(model_path, device, runtime=runtime, num_threads=num_threads)
+        self.device = self.runtime.device
+
+        # 전처리용 float32 입력 텐서 (배치 크기에 따라 재할당, CUDA 사용 시 pinned memory)
+        self.input_buffer = None
+        self.pin_memory = str(self.device).startswith('cuda')
+        # pinned input_buffer -> GPU 복사(non_blocking)가 끝난 시점 (다음 전처리는 이 event를 기다린 후 input_buffer에 기록)
+        self.copy_event = None
+        # input_buffer는 여러 thread(GUI, 추론 worker)에서 사용되므로 전처리/forward 호출을 직렬화
+        self.lock = threading.Lock()
+
+        # slim checkpoint에 저장된 입력 크기/threshold 확인
+        metadata = self.runtime.metadata
+        if metadata.get('img_dim', cfg.transunet.img_dim) != cfg.transunet.img_dim:
+            raise ValueError(f"Model input size {metadata['img_dim']} does not match cfg.transunet.img_dim {cfg.transunet.img_dim}")
+        threshold = metadata.get('threshold', cfg.inference_threshold)
+
+        # sigmoid(x) >= thresh  <=>  x >= logit(thresh)
+        self.thresh_logit = math.log(threshold / (1. - threshold))
+
+        # metrics
+        registry = MetricsRegistry.get_registry()
+        self.metric_preprocess = registry.histogram("sdd_preprocess_seconds")
+        self.metric_forward = registry.histogram("sdd_inference_seconds")
+        self.metric_postprocess = registry.histogram("sdd_postprocess_seconds")
 
         if not os.path.exists('./results'):
             os.mkdir('./results')
 
-    def read_and_preprocess(self, p):
+    def preprocess(self, images):
+        with self.metric_preprocess.time():
+            return self.__preprocess(images)
+
+    def __preprocess(self, images):
+        # uint8 HWC(또는 단일 채널 HW) 이미지를 미리 할당된 float32 NCHW 텐서에 직접 기록 (float64 중간 배열 없음)
+        dim = cfg.transunet.img_dim
+        batch = len(images)
+        if self.copy_event is not None:
+            # 이전 배치의 비동기 복사가 아직 pinned memory를 읽고 있을 수 있음
+            self.copy_event.synchronize()
+            self.copy_event = None
+        if self.input_buffer is None or self.input_buffer.shape[0] < batch:
+            self.input_buffer = torch.empty((batch, cfg.transunet.in_channels, dim, dim), dtype=torch.float32, pin_memory=self.pin_memory)
+
+        img_torch = self.input_buffer[:batch]
+        for idx, img in enumerate(images):
+            resized = cv2.resize(img, (dim, dim))
+            if resized.ndim == 2:
+                # 단일 채널(Mono) 입력은 채널 방향으로 broadcast (3채널 이미지를 만들지 않음)
+                img_torch[idx].copy_(torch.from_numpy(resized))
+            else:
+                img_torch[idx].copy_(torch.from_numpy(resized).permute(2, 0, 1))
+        img_torch.mul_(1. / 255.)
+
+        if not self.pin_memory:
+            return img_torch.to(self.device)
+
+        img_device = img_torch.to(self.device, non_blocking=True)
+        self.copy_event = torch.cuda.Event()
+        self.copy_event.record()
+        return img_device
+
+    def forward(self, img_torch):
+        with torch.no_grad(), self.metric_forward.time():
+            return self.runtime(img_torch)
+
+    def postprocess(self, logits, out_size=None):
+        # 텐서 상에서 resize/threshold 후 uint8 마스크(0/255)로 반환, out_size=(w, h)
+        with torch.no_grad(), self.metric_postprocess.time():
+            if out_size is not None and tuple(out_size) != tuple(logits.shape[-1:-3:-1]):
+                logits = F.interpolate(logits, size=(out_size[1], out_size[0]), mode='bilinear', align_corners=False)
+            masks = (logits[:, 0] >= self.thresh_logit).to(torch.uint8).mul_(255)
+
+        return masks.cpu().numpy()
+
+    def read_image(self, p):
         img = cv2.imread(p)
         img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
         print(p)
-        img_torch = cv2.resize(img, (cfg.transunet.img_dim, cfg.transunet.img_dim))
-        img_torch = img_torch / 255.
-        img_torch = img_torch.transpose((2, 0, 1))
-        img_torch = np.expand_dims(img_torch, axis=0)
-        img_torch = torch.from_numpy(img_torch.astype('float32')).to(self.device)
 
-        return img, img_torch
+        return img
 
-    def save_preds(self, preds):
+    def save_preds(self, preds, encoding=None):
+        # encoding(mask_codec, 예: 'bbox_rle')이 주어지면 PNG 대신 '<name>.mask' 파일로 저장 (mask만 해당)
         folder_path = './results/' #+ str(datetime.datetime.utcnow()).replace(':', '_')
 
         #os.mkdir(folder_path)
         #print(folder_path)
         for name, pred_mask in preds.items():
-            cv2.imwrite(f'{folder_path}/{name}', pred_mask)
+            if encoding is not None and pred_mask.ndim == 2:
+                with open(f'{folder_path}/{name}.mask', 'wb') as f:
+                    f.write(mask_codec.encode(pred_mask, encoding))
+            else:
+                cv2.imwrite(f'{folder_path}/{name}', pred_mask)
         print(f'{folder_path}/{name}')
 
-    def infer(self, path, merged=False, save=True):
+    def infer(self, path, merged=False, save=True, encoding=None):
         path = [path] if isinstance(path, str) else path
 
         preds = {}
         for p in path:
             file_name = p.split('/')[-1]
-            img, img_torch = self.read_and_preprocess(p)
-            with torch.no_grad():
-                pred_mask = self.transunet.model(img_torch)
-                pred_mask = torch.sigmoid(pred_mask)
-                pred_mask = pred_mask.detach().cpu().numpy().transpose((0, 2, 3, 1))
+            img = self.read_image(p)
 
             orig_h, orig_w = img.shape[:2]
-            pred_mask = cv2.resize(pred_mask[0, ...], (orig_w, orig_h))
-            pred_mask = thresh_func(pred_mask, thresh=cfg.inference_threshold)
-            pred_mask *= 255
+            pred_mask = self.infer_batch([img], out_size=(orig_w, orig_h))[0]
 
             if merged:
-                pred_mask = cv2.bitwise_and(img, img, mask=pred_mask.astype('uint8'))
+                pred_mask = cv2.bitwise_and(img, img, mask=pred_mask)
 
             preds[file_name] = pred_mask
 
         if save:
-            self.save_preds(preds)
+            self.save_preds(preds, encoding=encoding)
 
         return preds
         
-    def infer_folder(self, folder_path, merged=False, save=True):
+    def infer_folder(self, folder_path, merged=False, save=True, encoding=None):
     # 폴더 내의 모든 파일을 가져옵니다.
         files = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, f))]
 
-        preds = {}
-        for file_path in files:
-            file_name = os.path.basename(file_path)
-            img, img_torch = self.read_and_preprocess(file_path)
-            with torch.no_grad():
-                pred_mask = self.transunet.model(img_torch)
-                pred_mask = torch.sigmoid(pred_mask)
-                pred_mask = pred_mask.detach().cpu().numpy().transpose((0, 2, 3, 1))
-
-            orig_h, orig_w = img.shape[:2]
-            pred_mask = cv2.resize(pred_mask[0, ...], (orig_w, orig_h))
-            pred_mask = thresh_func(pred_mask, thresh=cfg.inference_threshold)
-            pred_mask *= 255
-
-            if merged:
-                pred_mask = cv2.bitwise_and(img, img, mask=pred_mask.astype('uint8'))
+        return self.infer(files, merged=merged, save=save, encoding=encoding)
 
-            preds[file_name] = pred_mask
-
-        if save:
-            self.save_preds(preds)
+    def infer_image(self, img):
+        with self.lock:
+            # 이미지 전처리
+            img_torch = self.preprocess([img])
 
-        return preds
+            # 추론
+            with torch.no_grad():
+                pred_mask = self.forward(img_torch)
+                pred_mask = torch.sigmoid(pred_mask)
 
-    def infer_image(self, img):
-        # 이미지 전처리
-        img_torch = cv2.resize(img, (cfg.transunet.img_dim, cfg.transunet.img_dim))
-        img_torch = img_torch / 255.
-        img_torch = img_torch.transpose((2, 0, 1))
-        img_torch = np.expand_dims(img_torch, axis=0)
-        img_torch = torch.from_numpy(img_torch.astype('float32')).to(self.device)
-        
-        # 추론
-        with torch.no_grad():
-            start_time = time.perf_counter()
-            pred_mask = self.transunet.model(img_torch)
-            pred_mask = torch.sigmoid(pred_mask)
-            end_time = time.perf_counter()
-            elapsed_time = (end_time - start_time) * 1000  # 밀리초로 변환
-
-            formatted_time = "{:.2f}".format(elapsed_time)
-            #print(f"Inference took {formatted_time} milliseconds")
-            
-            pred_mask = pred_mask.detach().cpu().numpy().transpose((0, 2, 3, 1))
+                pred_mask = pred_mask.detach().cpu().numpy().transpose((0, 2, 3, 1))
         
-        return pred_mask
\ No newline at end of file
+        return pred_mask
+
+    def infer_masks(self, images):
+        # 크기가 다른 이미지도 한 번의 forward로 추론, 이미지별 원래 크기의 uint8 마스크 리스트 반환
+        with self.lock:
+            logits = self.forward(self.preprocess(images))
+        sizes = [(img.shape[1], img.shape[0]) for img in images]
+        if len(set(sizes)) == 1:
+            return list(self.postprocess(logits, sizes[0]))
+        return [self.postprocess(logits[idx:idx + 1], size)[0] for idx, size in enumerate(sizes)]
+
+    def infer_batch(self, images, out_size=None):
+        # N개의 이미지를 하나의 NCHW 텐서로 묶어 한 번의 forward로 추론, uint8 마스크(N, H, W) 반환
+        with self.lock:
+            logits = self.forward(self.preprocess(images))
+        return self.postprocess(logits, out_size)
@@ -0,0 +1,50 @@
+import struct
+import numpy as np
+
+
+# 프레임 = 고정 길이 header + payload (network byte order)
+#  magic(4s) | type(B) | dtype(B) | ndim(B) | encoding(B) | request id(I) | shape(3I, 사용하지 않는 축은 0) | payload 길이(I)
+#  encoding : 요청에서는 원하는 mask 인코딩, 응답에서는 payload의 인코딩 (0이면 dtype/shape 그대로의 배열, vision/mask_codec.py)
+HEADER = struct.Struct('!4sBBBBIIIII')
+MAGIC = b'SDD1'
+
+MSG_REQUEST = 1     # 이미지 (uint8 HxW 또는 HxWxC)
+MSG_RESPONSE = 2    # mask (uint8 HxW, 0/255, 요청 이미지와 같은 크기) 또는 인코딩된 mask
+MSG_ERROR = 3       # utf-8 오류 메시지
+
+DTYPES = {1: np.dtype(np.uint8), 2: np.dtype(np.uint16), 3: np.dtype(np.float32)}
+DTYPE_CODES = {dtype: code for code, dtype in DTYPES.items()}
+
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def pack_header(msg_type, request_id, array=None, payload_len=None, encoding=0):
+    if array is None:
+        return HEADER.pack(MAGIC, msg_type, 0, 0, encoding, request_id, 0, 0, 0, payload_len or 0)
+    if array.dtype not in DTYPE_CODES or not 1 <= array.ndim <= 3:
+        raise ProtocolError(f'Unsupported array {array.dtype} {array.shape}')
+    shape = tuple(array.shape) + (0,) * (3 - array.ndim)
+    return HEADER.pack(MAGIC, msg_type, DTYPE_CODES[array.dtype], array.ndim, encoding, request_id, *shape, array.nbytes)
+
+
+def unpack_header(buffer):
+    # (type, request id, dtype, shape, payload 길이, encoding) 반환, header 검증 실패 시 ProtocolError
+    magic, msg_type, dtype_code, ndim, encoding, request_id, d0, d1, d2, payload_len = HEADER.unpack(buffer)
+    if magic != MAGIC:
+        raise ProtocolError('Invalid frame magic')
+    if payload_len > MAX_PAYLOAD:
+        raise ProtocolError(f'Payload too large : {payload_len}')
+    if ndim == 0:
+        return msg_type, request_id, None, None, payload_len, encoding
+
+    if dtype_code not in DTYPES or ndim > 3:
+        raise ProtocolError(f'Unsupported dtype {dtype_code} or ndim {ndim}')
+    dtype = DTYPES[dtype_code]
+    shape = (d0, d1, d2)[:ndim]
+    if int(np.prod(shape)) * dtype.itemsize != payload_len:
+        raise ProtocolError(f'Payload length {payload_len} does not match {dtype} {shape}')
+    return msg_type, request_id, dtype, shape, payload_len, encoding
@@ -0,0 +1,101 @@
+import os
+import torch
+import numpy as np
+
+# Additional Scripts
+from .train_transunet import TransUNetSeg
+
+
+# 추론 런타임 종류
+RUNTIME_EAGER = 'eager'                 # PyTorch eager (학습 checkpoint *.pth)
+RUNTIME_TORCHSCRIPT = 'torchscript'     # TorchScript (*.torchscript)
+RUNTIME_ONNX = 'onnxruntime'            # ONNX Runtime, CPU execution provider (*.onnx)
+RUNTIMES = (RUNTIME_EAGER, RUNTIME_TORCHSCRIPT, RUNTIME_ONNX)
+
+# 모델 파일 확장자로 런타임 결정
+_RUNTIME_BY_EXT = {'.pth': RUNTIME_EAGER, '.pt': RUNTIME_EAGER,
+                   '.torchscript': RUNTIME_TORCHSCRIPT,
+                   '.onnx': RUNTIME_ONNX}
+
+
+def runtime_from_path(model_path):
+    ext = os.path.splitext(model_path)[1].lower()
+    if ext not in _RUNTIME_BY_EXT:
+        raise ValueError(f'Unknown model file type : {model_path}')
+    return _RUNTIME_BY_EXT[ext]
+
+
+def create_runtime(model_path, device, runtime=None, num_threads=0):
+    # runtime이 None이면 파일 확장자로 결정
+    runtime = runtime or runtime_from_path(model_path)
+    if runtime == RUNTIME_EAGER:
+        return EagerRuntime(model_path, device)
+    if runtime == RUNTIME_TORCHSCRIPT:
+        return TorchScriptRuntime(model_path, device)
+    if runtime == RUNTIME_ONNX:
+        return OnnxRuntime(model_path, num_threads=num_threads)
+    raise ValueError(f'Unsupported runtime : {runtime}')
+
+
+class EagerRuntime:
+    name = RUNTIME_EAGER
+
+    def __init__(self, model_path, device):
+        self.device = device
+        self.transunet = TransUNetSeg(device, inference=True)
+        self.transunet.load_model(model_path)
+        self.metadata = self.transunet.metadata
+
+    def __call__(self, img_torch):
+        return self.transunet.model(img_torch)
+
+
+class TorchScriptRuntime:
+    name = RUNTIME_TORCHSCRIPT
+
+    def __init__(self, model_path, device):
+        self.device = device
+        self.metadata = {}
+        self.model = torch.jit.load(model_path, map_location=device).eval()
+        # freeze + 추론용 graph 최적화 (conv-bn folding 등)
+        if hasattr(torch.jit, 'optimize_for_inference'):
+            self.model = torch.jit.optimize_for_inference(self.model)
+
+    def __call__(self, img_torch):
+        return self.model(img_torch)
+
+
+class OnnxRuntime:
+    name = RUNTIME_ONNX
+
+    def __init__(self, model_path, num_threads=0):
+        import onnxruntime as ort
+
+        # ONNX Runtime은 CPU 텐서(numpy)만 주고 받음
+        self.device = 'cpu'
+        self.metadata = {}
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # batch 축이 고정된 모델이면 batch를 나눠서 실행
+        self.fixed_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+
+    def __call__(self, img_torch):
+        images = img_torch.detach().cpu().numpy()
+        if self.fixed_batch is None or images.shape[0] == self.fixed_batch:
+            return torch.from_numpy(self.session.run(None, {self.input_name: images})[0])
+
+        outputs = []
+        for idx in range(0, images.shape[0], self.fixed_batch):
+            chunk = images[idx:idx + self.fixed_batch]
+            num = chunk.shape[0]
+            if num < self.fixed_batch:
+                chunk = np.concatenate([chunk, np.zeros((self.fixed_batch - num,) + chunk.shape[1:], dtype=chunk.dtype)], axis=0)
+            outputs.append(self.session.run(None, {self.input_name: chunk})[0][:num])
+        return torch.from_numpy(np.concatenate(outputs, axis=0))
@@ -0,0 +1,198 @@
+import time
+import asyncio
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Additional Scripts
+from .protocol import HEADER, MSG_REQUEST, MSG_RESPONSE, MSG_ERROR, ProtocolError, pack_header, unpack_header
+from util.monitor.metrics import MetricsRegistry
+from vision import mask_codec
+
+
+class _Connection(asyncio.BufferedProtocol):
+    # 클라이언트 연결 (keep-alive), header와 payload를 미리 할당한 buffer에 바로 수신 (bytes 이어붙이기 없음)
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.header = memoryview(bytearray(HEADER.size))
+        self.target = self.header   # 현재 수신 중인 buffer
+        self.received = 0
+        self.request = None         # payload 수신 중인 (request id, image, encoding)
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server.on_connection(self, True)
+
+    def connection_lost(self, exc):
+        self.transport = None
+        self.server.on_connection(self, False)
+
+    def get_buffer(self, sizehint):
+        return self.target[self.received:]
+
+    def buffer_updated(self, nbytes):
+        self.received += nbytes
+        if self.received < len(self.target):
+            return
+
+        try:
+            if self.request is None:
+                self.__on_header()
+            else:
+                self.__on_payload()
+        except ProtocolError as e:
+            # frame 경계를 잃었으므로 오류 전송 후 연결 종료
+            self.send_error(0, str(e))
+            self.transport.close()
+
+    def __on_header(self):
+        msg_type, request_id, dtype, shape, payload_len, encoding = unpack_header(self.header)
+        if msg_type != MSG_REQUEST or dtype != np.uint8 or len(shape) not in (2, 3) or payload_len == 0:
+            raise ProtocolError(f'Unsupported request (type {msg_type}, {dtype}, {shape})')
+        if len(shape) == 3 and shape[2] not in (1, 3):
+            raise ProtocolError(f'Unsupported number of channels {shape[2]} (1 or 3)')
+        if encoding not in mask_codec.MASK_ENCODINGS.values():
+            raise ProtocolError(f'Unsupported mask encoding {encoding}')
+
+        # 이미지 크기 그대로 할당하여 payload를 바로 수신
+        image = np.empty(shape, dtype=np.uint8)
+        self.request = (request_id, image, encoding)
+        self.target = memoryview(image).cast('B')
+        self.received = 0
+
+    def __on_payload(self):
+        request_id, image, encoding = self.request
+        self.request = None
+        self.target = self.header
+        self.received = 0
+        self.server.submit(self, request_id, image, encoding)
+
+    def send_response(self, request_id, mask, encoding):
+        # mask : 배열 (encoding 0) 또는 mask_codec으로 인코딩된 bytes
+        if self.transport is not None and not self.transport.is_closing():
+            if encoding == mask_codec.MASK_RAW:
+                self.transport.write(pack_header(MSG_RESPONSE, request_id, mask))
+                self.transport.write(memoryview(np.ascontiguousarray(mask)).cast('B'))
+            else:
+                self.transport.write(pack_header(MSG_RESPONSE, request_id, payload_len=len(mask), encoding=encoding) + mask)
+
+    def send_error(self, request_id, message):
+        if self.transport is not None and not self.transport.is_closing():
+            payload = message.encode()
+            self.transport.write(pack_header(MSG_ERROR, request_id, payload_len=len(payload)) + payload)
+
+
+class InferenceServer:
+    # 여러 클라이언트의 요청을 batch window 동안 모아 한 번의 forward로 추론
+    def __init__(self, model, host, port, batch_window_ms=5., max_batch=8, max_queue=None):
+        self.model = model                  # infer_masks(images) -> masks
+        self.host = host
+        self.port = port
+        self.batch_window_s = batch_window_ms / 1000.
+        self.max_batch = max(1, int(max_batch))
+        self.max_queue = max(self.max_batch, int(max_queue)) if max_queue else 4 * self.max_batch  # 초과 시 수신 중지 (backpressure)
+
+        self.queue = None
+        self.batch_full = None
+        self.connections = set()
+        self.paused = set()                 # 대기열이 가득 차서 수신을 멈춘 연결
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')  # model은 한 thread에서만 실행
+
+        registry = MetricsRegistry.get_registry()
+        self.metric_request = registry.histogram('sdd_server_request_seconds')
+        self.metric_batch = registry.gauge('sdd_server_batch_size')
+        self.metric_connections = registry.gauge('sdd_server_connections')
+        self.metric_bytes = registry.counter('sdd_server_response_bytes_total')
+
+    def on_connection(self, connection, connected):
+        if connected:
+            self.connections.add(connection)
+        else:
+            self.connections.discard(connection)
+            self.paused.discard(connection)
+        self.metric_connections.set(len(self.connections))
+
+    def submit(self, connection, request_id, image, encoding):
+        self.queue.put_nowait((connection, request_id, image, encoding, time.perf_counter()))
+        # batch loop는 이미 첫 요청을 꺼낸 상태이므로 max_batch - 1개가 더 모이면 batch가 가득 참
+        if self.queue.qsize() >= self.max_batch - 1:
+            self.batch_full.set()
+        # 대기열이 가득 차면 이 연결의 수신을 멈춤 (연결마다 최대 1개 요청만 더 들어올 수 있음)
+        if self.queue.qsize() >= self.max_queue and connection.transport is not None:
+            connection.transport.pause_reading()
+            self.paused.add(connection)
+
+    def __resume_reading(self):
+        if self.paused and self.queue.qsize() < self.max_queue:
+            for connection in self.paused:
+                if connection.transport is not None and not connection.transport.is_closing():
+                    connection.transport.resume_reading()
+            self.paused.clear()
+
+    async def serve(self):
+        self.queue = asyncio.Queue()
+        self.batch_full = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: _Connection(self), self.host, self.port, reuse_address=True)
+        print(f'Inference server on {self.host}:{self.port} (batch window {self.batch_window_s * 1000:.1f} ms, max batch {self.max_batch})')
+
+        batcher = asyncio.ensure_future(self.__batch_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.executor.shutdown(wait=True)
+
+    async def __batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+
+            # 첫 요청 이후 batch window 동안 (또는 max batch까지) 요청을 더 모음
+            if self.batch_window_s > 0 and self.queue.qsize() < self.max_batch - 1:
+                self.batch_full.clear()
+                try:
+                    await asyncio.wait_for(self.batch_full.wait(), self.batch_window_s)
+                except asyncio.TimeoutError:
+                    pass
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            self.__resume_reading()
+
+            self.metric_batch.set(len(batch))
+            masks = await loop.run_in_executor(self.executor, self.__infer, batch)
+
+            for (connection, request_id, _, encoding, t_arrival), mask in zip(batch, masks):
+                if isinstance(mask, Exception):
+                    connection.send_error(request_id, f'Inference error : {mask}')
+                    continue
+                connection.send_response(request_id, mask, encoding)
+                self.metric_request.record(time.perf_counter() - t_arrival)
+                self.metric_bytes.inc(mask.nbytes if encoding == mask_codec.MASK_RAW else len(mask))
+
+    def __infer(self, batch):
+        # 추론 thread에서 인코딩까지 수행 (event loop를 막지 않음), 실패한 요청은 mask 대신 Exception
+        try:
+            masks = self.model.infer_masks([image for _, _, image, _, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                return [e]
+            # batch 실패 시 요청별로 다시 추론하여 실패를 원인 요청에만 한정
+            return [self.__infer([request])[0] for request in batch]
+        return [self.__encode(mask, encoding) for (_, _, _, encoding, _), mask in zip(batch, masks)]
+
+    @staticmethod
+    def __encode(mask, encoding):
+        try:
+            return mask if encoding == mask_codec.MASK_RAW else mask_codec.encode(mask, encoding)
+        except Exception as e:
+            return e
+
+
+def run_server(model, host, port, batch_window_ms=5., max_batch=8, max_queue=None):
+    server = InferenceServer(model, host, port, batch_window_ms=batch_window_ms, max_batch=max_batch, max_queue=max_queue)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
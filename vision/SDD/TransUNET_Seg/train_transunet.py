@@ -3,13 +3,18 @@ from torch.optim import SGD
 
 # Additional Scripts
 from .transunet import TransUNet
+from .vit import set_attention
 from .utils import dice_loss
 from .config import cfg
+from vision.checkpoint import load_into
 
 
 class TransUNetSeg:
-    def __init__(self, device):
+    def __init__(self, device, inference=False):
         self.device = device
+        self.inference = inference
+        self.metadata = {}  # slim checkpoint metadata (img_dim, threshold, ...)
+        set_attention(cfg.transunet.attention, cfg.transunet.attention_chunk_size)
         self.model = TransUNet(img_dim=cfg.transunet.img_dim,
                                in_channels=cfg.transunet.in_channels,
                                out_channels=cfg.transunet.out_channels,
@@ -20,13 +25,24 @@ class TransUNetSeg:
                                class_num=cfg.transunet.class_num).to(self.device)
 
         self.criterion = dice_loss
-        self.optimizer = SGD(self.model.parameters(), lr=cfg.learning_rate,
-                             momentum=cfg.momentum, weight_decay=cfg.weight_decay)
+        # 추론 전용일 때는 optimizer를 만들지 않음 (momentum buffer 등 학습 상태를 메모리에 올리지 않음)
+        self.optimizer = None
+        if not inference:
+            self.optimizer = SGD(self.model.parameters(), lr=cfg.learning_rate,
+                                 momentum=cfg.momentum, weight_decay=cfg.weight_decay)
 
     def load_model(self, path):
-        ckpt = torch.load(path)
+        if self.inference:
+            # 학습/slim checkpoint 모두 가중치만 memory-mapped로 읽음 (optimizer state는 읽지 않음)
+            self.metadata = load_into(self.model, path, map_location=self.device)
+            self.model.eval()
+            self.model.requires_grad_(False)
+            return
+
+        ckpt = torch.load(path, map_location=self.device)
         self.model.load_state_dict(ckpt['model_state_dict'])
-        self.optimizer.load_state_dict(ckpt['optimizer_state_dict'])
+        if self.optimizer is not None and 'optimizer_state_dict' in ckpt:
+            self.optimizer.load_state_dict(ckpt['optimizer_state_dict'])
 
         self.model.eval()
 
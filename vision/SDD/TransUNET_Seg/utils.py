@@ -1,6 +1,9 @@
+import cv2
 import torch
 import numpy as np
 
+from vision import mask_codec
+
 
 def thresh_func(mask, thresh=0.5):
     mask[mask >= thresh] = 1
@@ -9,6 +12,36 @@ def thresh_func(mask, thresh=0.5):
     return mask
 
 
+def overlay_mask(image, mask, color=(255, 0, 0), alpha=0.5):
+    # blend color only on the defect pixels of the image (in place)
+    if isinstance(mask, (bytes, bytearray, memoryview)):
+        return overlay_encoded_mask(image, mask, color, alpha)
+
+    if mask.shape[:2] != image.shape[:2]:
+        mask = cv2.resize(mask, (image.shape[1], image.shape[0]), interpolation=cv2.INTER_NEAREST)
+
+    selected = mask > 0
+    if selected.any():
+        pixels = image[selected].astype(np.float32)
+        image[selected] = (pixels * (1. - alpha) + np.asarray(color, dtype=np.float32) * alpha).astype(np.uint8)
+
+    return image
+
+
+def overlay_encoded_mask(image, data, color=(255, 0, 0), alpha=0.5):
+    # encoded mask (vision.mask_codec) : only the region containing defects is decoded and blended
+    method, _, height, width = mask_codec.get_header(data)
+    if (height, width) != image.shape[:2]:
+        return overlay_mask(image, mask_codec.decode(data), color, alpha)
+
+    crop = mask_codec.decode_crop(data)
+    if crop is not None:
+        box, (top, left) = crop
+        overlay_mask(image[top:top + box.shape[0], left:left + box.shape[1]], box, color, alpha)
+
+    return image
+
+
 def dice_loss(pred, target):
     pred = torch.sigmoid(pred)
 
@@ -1,15 +1,75 @@
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import numpy as np
 from einops import rearrange, repeat
 
 
+# attention 구현
+ATTENTION_EINSUM = 'einsum'     # (h, t, t) energy 텐서 전체를 만드는 기존 구현
+ATTENTION_SDPA = 'sdpa'         # F.scaled_dot_product_attention (fused/memory-efficient kernel)
+ATTENTION_CHUNKED = 'chunked'   # query를 나눠서 계산 (energy 텐서는 chunk 크기만큼만 생성)
+ATTENTION_AUTO = 'auto'         # sdpa 사용 가능하면 sdpa, 아니면 chunked
+
+# scaled_dot_product_attention의 scale 인자는 torch 2.1부터 지원
+_HAS_SDPA = hasattr(F, 'scaled_dot_product_attention') and \
+            tuple(int(v) for v in torch.__version__.split('+')[0].split('.')[:2]) >= (2, 1)
+
+_attention_impl = ATTENTION_AUTO
+_attention_chunk_size = 256
+
+
+def set_attention(impl=ATTENTION_AUTO, chunk_size=256):
+    # 이후 forward부터 적용 (parameter에는 영향 없음, 기존 checkpoint 그대로 사용)
+    global _attention_impl, _attention_chunk_size
+    if impl not in (ATTENTION_EINSUM, ATTENTION_SDPA, ATTENTION_CHUNKED, ATTENTION_AUTO):
+        raise ValueError(f'Unsupported attention : {impl}')
+    if impl == ATTENTION_SDPA and not _HAS_SDPA:
+        raise ValueError('scaled_dot_product_attention with scale requires torch>=2.1')
+    _attention_impl = impl
+    _attention_chunk_size = int(chunk_size)
+
+
+def _resolve_attention(impl):
+    if impl == ATTENTION_AUTO:
+        return ATTENTION_SDPA if _HAS_SDPA else ATTENTION_CHUNKED
+    return impl
+
+
+def _einsum_attention(query, key, value, scale, mask):
+    energy = torch.einsum("... i d , ... j d -> ... i j", query, key) * scale
+
+    if mask is not None:
+        energy = energy.masked_fill(mask, -np.inf)
+
+    attention = torch.softmax(energy, dim=-1)
+
+    return torch.einsum("... i j , ... j d -> ... i d", attention, value)
+
+
+def _chunked_attention(query, key, value, scale, mask, chunk_size):
+    # softmax는 key 방향이므로 query 행 단위로 나눠도 결과 동일
+    key_t = key.transpose(-2, -1)
+    outputs = []
+    for start in range(0, query.shape[-2], chunk_size):
+        end = start + chunk_size
+        energy = torch.matmul(query[..., start:end, :], key_t) * scale
+        if mask is not None:
+            energy = energy.masked_fill(mask[..., start:end, :] if mask.shape[-2] > 1 else mask, -np.inf)
+        outputs.append(torch.matmul(torch.softmax(energy, dim=-1), value))
+
+    return torch.cat(outputs, dim=-2)
+
+
 class MultiHeadAttention(nn.Module):
-    def __init__(self, embedding_dim, head_num):
+    def __init__(self, embedding_dim, head_num, impl=None, chunk_size=None):
         super().__init__()
 
         self.head_num = head_num
+        # 기존 구현과 같이 energy에 sqrt(d)를 곱함 (1/sqrt(d)가 아님, 학습된 checkpoint와 동일하게 유지)
         self.dk = (embedding_dim // head_num) ** (1 / 2)
+        self.impl = impl                # None이면 set_attention() 설정을 따름
+        self.chunk_size = chunk_size
 
         self.qkv_layer = nn.Linear(embedding_dim, embedding_dim * 3, bias=False)
         self.out_attention = nn.Linear(embedding_dim, embedding_dim, bias=False)
@@ -18,14 +78,15 @@ class MultiHeadAttention(nn.Module):
         qkv = self.qkv_layer(x)
 
         query, key, value = tuple(rearrange(qkv, 'b t (d k h ) -> k b h t d ', k=3, h=self.head_num))
-        energy = torch.einsum("... i d , ... j d -> ... i j", query, key) * self.dk
-
-        if mask is not None:
-            energy = energy.masked_fill(mask, -np.inf)
-
-        attention = torch.softmax(energy, dim=-1)
 
-        x = torch.einsum("... i j , ... j d -> ... i d", attention, value)
+        impl = _resolve_attention(self.impl or _attention_impl)
+        if impl == ATTENTION_SDPA:
+            # bool attn_mask는 True가 참여하는 위치 (masked_fill의 mask와 반대)
+            x = F.scaled_dot_product_attention(query, key, value, attn_mask=None if mask is None else ~mask, scale=self.dk)
+        elif impl == ATTENTION_CHUNKED:
+            x = _chunked_attention(query, key, value, self.dk, mask, self.chunk_size or _attention_chunk_size)
+        else:
+            x = _einsum_attention(query, key, value, self.dk, mask)
 
         x = rearrange(x, "b h t d -> b t (h d)")
         x = self.out_attention(x)
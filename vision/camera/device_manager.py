@@ -0,0 +1,67 @@
+'''
+Camera Device Manager (concurrent open/configure on a thread pool, persisted device inventory)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import json
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+
+from util.logger.console import ConsoleLogger
+
+
+'''
+Device open and configuration block on device I/O (V4L2 ioctl, GigE control channel),
+so they are run concurrently instead of one camera after another.
+The last known device list is stored in a JSON file to reattach without full enumeration on restart.
+'''
+class DeviceManager:
+    def __init__(self, inventory_path:str=None, max_workers:int=8):
+        self.__console = ConsoleLogger.get_logger()
+        self.__inventory_path = pathlib.Path(inventory_path) if inventory_path else None
+        self.__max_workers = max(1, int(max_workers))
+
+    # run tasks concurrently, return {key:result} (False for the task raised exception)
+    def run_all(self, tasks:dict) -> dict:
+        if len(tasks)==0:
+            return {}
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(self.__max_workers, len(tasks)), thread_name_prefix="device") as pool:
+            futures = {key:pool.submit(task) for key, task in tasks.items()}
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    self.__console.critical(f"Device {key} : {e}")
+                    results[key] = False
+        return results
+
+    # last known devices (list of dict), empty if there is no inventory
+    def load_inventory(self) -> list:
+        if self.__inventory_path is None or not self.__inventory_path.is_file():
+            return []
+        try:
+            with open(self.__inventory_path, "r") as f:
+                return json.load(f).get("devices", [])
+        except Exception as e:
+            self.__console.warning(f"Device inventory cannot be loaded : {e}")
+        return []
+
+    # store devices (list of dict)
+    def save_inventory(self, devices:list):
+        if self.__inventory_path is None:
+            return
+        try:
+            self.__inventory_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.__inventory_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"devices":devices}, f, indent=2)
+            tmp_path.replace(self.__inventory_path)
+        except Exception as e:
+            self.__console.warning(f"Device inventory cannot be saved : {e}")
+
+    # remove stored devices (next discovery runs full enumeration)
+    def clear_inventory(self):
+        if self.__inventory_path is not None and self.__inventory_path.is_file():
+            self.__inventory_path.unlink()
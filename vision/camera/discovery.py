@@ -0,0 +1,38 @@
+'''
+Background Camera Discovery (device stack is loaded and enumerated off the GUI thread)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+try:
+    from PyQt6.QtCore import QThread, pyqtSignal
+except ImportError:
+    from PyQt5.QtCore import QThread, pyqtSignal
+
+from util.logger.console import ConsoleLogger
+from util.monitor.startup import StartupProfiler
+
+
+class DiscoveryWorker(QThread):
+
+    discovered_signal = pyqtSignal(list) # camera information list returned by the discovery function
+
+    def __init__(self, discover):
+        super().__init__()
+
+        self.__console = ConsoleLogger.get_logger()
+        self.__discover = discover # function returning camera information list
+
+    def run(self):
+        try:
+            with StartupProfiler.get_profiler().phase("camera discovery"):
+                cameras = self.__discover()
+        except Exception as e:
+            self.__console.critical(f"Camera discovery error : {e}")
+            cameras = []
+        self.discovered_signal.emit(cameras)
+
+    # close thread
+    def close(self) -> None:
+        self.requestInterruption()
+        self.quit()
+        self.wait()
@@ -0,0 +1,181 @@
+'''
+Preallocated Frame Ring Buffer shared between camera controllers and consumers
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import threading
+import time
+import numpy as np
+from multiprocessing import shared_memory
+
+from util.logger.console import ConsoleLogger
+
+# slot metadata columns
+_META_SEQ = 0         # sequence number of the frame in the slot (0 = empty)
+_META_REFCOUNT = 1    # number of consumers holding the slot (-1 = being written)
+_META_CAMERA_ID = 2   # camera id which wrote the slot
+_META_TIMESTAMP = 3   # timestamp (ns) of the frame
+_META_COLUMNS = 4
+
+# ring counters
+_COUNT_NEXT_SEQ = 0
+_COUNT_WRITTEN = 1
+_COUNT_DROPPED = 2
+_COUNT_HEAD = 3
+_COUNT_COLUMNS = 4
+
+
+'''
+Fixed-slot frame ring buffer
+ - all frames are numpy views over one contiguous buffer (optionally multiprocessing shared memory)
+ - producers reserve a slot, write into its view, then commit it with a sequence number
+ - consumers acquire a slot by (slot, seq), read it without copy, then release it
+ - if every slot is held by consumers, the new frame is dropped and counted
+'''
+class FrameRingBuffer:
+    def __init__(self, num_slots:int, shape:tuple, dtype=np.uint8, shared_name:str=None, create:bool=True, lock=None):
+        self.__console = ConsoleLogger.get_logger()
+
+        self.__num_slots = int(num_slots)
+        self.__shape = tuple(shape)
+        self.__dtype = np.dtype(dtype)
+        self.__lock = lock if lock is not None else threading.Lock() # use multiprocessing.Lock for inter-process access
+        self.__shm = None
+        self.__is_owner = create
+
+        frame_bytes = int(np.prod(self.__shape)) * self.__dtype.itemsize
+        frames_bytes = frame_bytes * self.__num_slots
+        meta_bytes = self.__num_slots * _META_COLUMNS * 8
+        count_bytes = _COUNT_COLUMNS * 8
+
+        if shared_name is not None:
+            if create:
+                self.__shm = shared_memory.SharedMemory(name=shared_name, create=True, size=frames_bytes+meta_bytes+count_bytes)
+            else:
+                self.__shm = shared_memory.SharedMemory(name=shared_name, create=False)
+            buffer = self.__shm.buf
+        else:
+            buffer = bytearray(frames_bytes+meta_bytes+count_bytes)
+
+        # views over the single contiguous buffer
+        self.__frames = np.ndarray((self.__num_slots,)+self.__shape, dtype=self.__dtype, buffer=buffer, offset=0)
+        self.__meta = np.ndarray((self.__num_slots, _META_COLUMNS), dtype=np.int64, buffer=buffer, offset=frames_bytes)
+        self.__count = np.ndarray((_COUNT_COLUMNS,), dtype=np.int64, buffer=buffer, offset=frames_bytes+meta_bytes)
+
+        if create:
+            self.__meta[:] = 0
+            self.__count[:] = 0
+            self.__count[_COUNT_NEXT_SEQ] = 1
+
+    # buffer name (for attaching from other process)
+    def get_name(self) -> str:
+        return self.__shm.name if self.__shm is not None else None
+
+    # number of slots
+    def get_num_slots(self) -> int:
+        return self.__num_slots
+
+    # frame shape of each slot
+    def get_shape(self) -> tuple:
+        return self.__shape
+
+    # reserve a free slot to write (-1 if all slots are held by consumers)
+    def reserve(self) -> int:
+        with self.__lock:
+            head = int(self.__count[_COUNT_HEAD])
+            for offset in range(self.__num_slots):
+                slot = (head + offset) % self.__num_slots
+                if self.__meta[slot, _META_REFCOUNT] == 0:
+                    self.__meta[slot, _META_REFCOUNT] = -1
+                    self.__meta[slot, _META_SEQ] = 0
+                    self.__count[_COUNT_HEAD] = (slot + 1) % self.__num_slots
+                    return slot
+
+            self.__count[_COUNT_DROPPED] += 1
+            return -1
+
+    # writable view of the reserved slot
+    def view(self, slot:int) -> np.ndarray:
+        return self.__frames[slot]
+
+    # publish the written slot, return its sequence number
+    def commit(self, slot:int, camera_id:int=0, timestamp_ns:int=None) -> int:
+        with self.__lock:
+            seq = int(self.__count[_COUNT_NEXT_SEQ])
+            self.__count[_COUNT_NEXT_SEQ] += 1
+            self.__count[_COUNT_WRITTEN] += 1
+            self.__meta[slot, _META_SEQ] = seq
+            self.__meta[slot, _META_CAMERA_ID] = camera_id
+            self.__meta[slot, _META_TIMESTAMP] = timestamp_ns if timestamp_ns is not None else time.monotonic_ns()
+            self.__meta[slot, _META_REFCOUNT] = 0
+            return seq
+
+    # give up the reserved slot without publishing (e.g. grab failed)
+    def abort(self, slot:int) -> None:
+        with self.__lock:
+            self.__meta[slot, _META_SEQ] = 0
+            self.__meta[slot, _META_REFCOUNT] = 0
+
+    # copy an already allocated frame into a free slot, return (slot, seq) or (-1, 0) if dropped
+    def put(self, frame:np.ndarray, camera_id:int=0, timestamp_ns:int=None) -> tuple:
+        slot = self.reserve()
+        if slot < 0:
+            return (-1, 0)
+        np.copyto(self.__frames[slot], frame, casting="no")
+        return (slot, self.commit(slot, camera_id, timestamp_ns))
+
+    # hold the slot for reading, return read-only view (None if the slot was overwritten)
+    def acquire(self, slot:int, seq:int) -> np.ndarray:
+        with self.__lock:
+            if self.__meta[slot, _META_SEQ] != seq or self.__meta[slot, _META_REFCOUNT] < 0:
+                return None
+            self.__meta[slot, _META_REFCOUNT] += 1
+
+        frame = self.__frames[slot].view()
+        frame.flags.writeable = False
+        return frame
+
+    # release the held slot
+    def release(self, slot:int) -> None:
+        with self.__lock:
+            if self.__meta[slot, _META_REFCOUNT] > 0:
+                self.__meta[slot, _META_REFCOUNT] -= 1
+
+    # newest committed slot (of the camera if given), return (slot, seq) or (-1, 0)
+    def latest(self, camera_id:int=None) -> tuple:
+        with self.__lock:
+            seqs = self.__meta[:, _META_SEQ].copy()
+            if camera_id is not None:
+                seqs[self.__meta[:, _META_CAMERA_ID] != camera_id] = 0
+            slot = int(np.argmax(seqs))
+            if seqs[slot] == 0:
+                return (-1, 0)
+            return (slot, int(seqs[slot]))
+
+    # slot metadata (seq, camera_id, timestamp_ns)
+    def get_info(self, slot:int) -> tuple:
+        with self.__lock:
+            return (int(self.__meta[slot, _META_SEQ]), int(self.__meta[slot, _META_CAMERA_ID]), int(self.__meta[slot, _META_TIMESTAMP]))
+
+    # buffer statistics
+    def get_stats(self) -> dict:
+        with self.__lock:
+            return {"slots":self.__num_slots,
+                    "written":int(self.__count[_COUNT_WRITTEN]),
+                    "dropped":int(self.__count[_COUNT_DROPPED]),
+                    "held":int(np.count_nonzero(self.__meta[:, _META_REFCOUNT] > 0))}
+
+    # release the buffer (and unlink shared memory if owned)
+    def close(self) -> None:
+        # drop numpy views before closing the shared memory
+        self.__frames = None
+        self.__meta = None
+        self.__count = None
+        if self.__shm is not None:
+            self.__shm.close()
+            if self.__is_owner:
+                try:
+                    self.__shm.unlink()
+                except FileNotFoundError:
+                    pass
+            self.__shm = None
@@ -0,0 +1,127 @@
+'''
+Synchronized Multi-Camera Frame Set Assembler
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import time
+
+from util.logger.console import ConsoleLogger
+
+# grouping key of frames
+SYNC_BY_TIMESTAMP = "timestamp"   # hardware timestamp within tolerance (PTP synchronized or triggered cameras)
+SYNC_BY_FRAME_ID = "frame_id"     # same frame id (image number of triggered cameras)
+
+
+'''
+Frames captured at the same exposure from multiple cameras
+'''
+class FrameSet:
+    __slots__ = ("set_id", "timestamp_ns", "frame_id", "frames", "timestamps", "created", "complete")
+
+    def __init__(self, set_id:int, timestamp_ns:int, frame_id:int):
+        self.set_id = set_id
+        self.timestamp_ns = timestamp_ns   # reference (first arrived) hardware timestamp
+        self.frame_id = frame_id
+        self.frames = {}                   # frame by camera id
+        self.timestamps = {}               # hardware timestamp (ns) by camera id
+        self.created = time.monotonic_ns() # arrival time of the first frame
+        self.complete = False
+
+    # timestamp difference between the earliest and latest frame
+    def get_spread_ns(self) -> int:
+        return max(self.timestamps.values()) - min(self.timestamps.values())
+
+    def __len__(self):
+        return len(self.frames)
+
+
+class FrameSetAssembler:
+    def __init__(self, camera_ids:list, tolerance_ns:int=5_000_000, sync_by:str=SYNC_BY_TIMESTAMP, max_pending:int=4, emit_incomplete:bool=False):
+        self.__console = ConsoleLogger.get_logger()
+
+        if sync_by not in (SYNC_BY_TIMESTAMP, SYNC_BY_FRAME_ID):
+            raise ValueError(f"Unsupported sync mode : {sync_by}")
+
+        self.__camera_ids = set(camera_ids)
+        self.__tolerance_ns = int(tolerance_ns)
+        self.__sync_by = sync_by
+        self.__max_pending = max(1, int(max_pending))
+        self.__emit_incomplete = emit_incomplete
+
+        self.__pending = []     # pending frame sets (oldest first)
+        self.__next_set_id = 0
+        self.__stats = {"frames":0, "complete":0, "incomplete":0, "duplicated":0, "latency_ns_sum":0, "latency_ns_max":0}
+
+    # add a frame, return list of frame sets ready to emit (completed or expired)
+    def add(self, camera_id:int, frame, timestamp_ns:int, frame_id:int=None) -> list:
+        self.__stats["frames"] += 1
+        ready = []
+
+        frame_set = self.__find(camera_id, timestamp_ns, frame_id)
+        if frame_set is None:
+            frame_set = FrameSet(self.__next_set_id, timestamp_ns, frame_id)
+            self.__next_set_id += 1
+            self.__pending.append(frame_set)
+
+        frame_set.frames[camera_id] = frame
+        frame_set.timestamps[camera_id] = timestamp_ns
+
+        if self.__camera_ids.issubset(frame_set.frames.keys()):
+            # complete set, older pending sets can no longer be completed
+            index = self.__pending.index(frame_set)
+            for expired in self.__pending[:index]:
+                self.__expire(expired, ready)
+            del self.__pending[:index+1]
+
+            frame_set.complete = True
+            latency = time.monotonic_ns() - frame_set.created
+            self.__stats["complete"] += 1
+            self.__stats["latency_ns_sum"] += latency
+            self.__stats["latency_ns_max"] = max(self.__stats["latency_ns_max"], latency)
+            ready.append(frame_set)
+
+        # limit number of pending sets
+        while len(self.__pending) > self.__max_pending:
+            self.__expire(self.__pending.pop(0), ready)
+
+        return ready
+
+    # drop all pending sets
+    def reset(self):
+        self.__pending.clear()
+
+    # emit expired (incomplete) sets or not
+    def set_emit_incomplete(self, emit_incomplete:bool):
+        self.__emit_incomplete = emit_incomplete
+
+    # set camera ids to be assembled
+    def set_camera_ids(self, camera_ids:list):
+        self.__camera_ids = set(camera_ids)
+
+    # assembling statistics
+    def get_stats(self) -> dict:
+        stats = self.__stats.copy()
+        stats["pending"] = len(self.__pending)
+        stats["latency_ms_avg"] = (stats["latency_ns_sum"]/stats["complete"])/1e6 if stats["complete"]>0 else 0.
+        stats["latency_ms_max"] = stats["latency_ns_max"]/1e6
+        return stats
+
+    # pending frame set which the frame belongs to
+    def __find(self, camera_id:int, timestamp_ns:int, frame_id:int) -> FrameSet:
+        for frame_set in self.__pending:
+            if self.__sync_by == SYNC_BY_FRAME_ID and frame_id is not None:
+                matched = (frame_set.frame_id == frame_id)
+            else:
+                matched = abs(timestamp_ns - frame_set.timestamp_ns) <= self.__tolerance_ns
+
+            if matched:
+                if camera_id in frame_set.frames: # same camera again in the window (tolerance too wide or frame repeated)
+                    self.__stats["duplicated"] += 1
+                    continue
+                return frame_set
+        return None
+
+    def __expire(self, frame_set:FrameSet, ready:list):
+        self.__stats["incomplete"] += 1
+        if self.__emit_incomplete:
+            ready.append(frame_set)
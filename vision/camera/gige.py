@@ -17,6 +17,7 @@ from util.logger.video import VideoRecorder
 import platform
 from util.logger.console import ConsoleLogger
 from vision.camera.interface import ICamera
+from vision.camera.pixel import PIXEL_BGR8, NATIVE_PIXEL_FORMATS
 import numpy as np
 from pypylon import genicam
 from pypylon import pylon
@@ -30,10 +31,12 @@ _camera_array_container:pylon.InstantCameraArray = None
 
 # camera device class
 class GigE_Basler(ICamera):
-    def __init__(self, camera_id: int) -> None:
+    def __init__(self, camera_id: int, native:bool=False) -> None:
         super().__init__(camera_id)
         
         self.camera_id = camera_id  # camera ID
+        self.pixel_format = PIXEL_BGR8 # pixel format of grabbed frames
+        self.__native = native # keep camera pixel format (Mono8/Bayer) without conversion
         self.__device:pylon.InstantCamera = None        # single camera device instance
         self.__console = ConsoleLogger.get_logger()
         
@@ -49,6 +52,8 @@ class GigE_Basler(ICamera):
             
             if not self.__device.IsOpen():
                 self.__device.Open()
+                if self.__native and self.__device.PixelFormat.GetValue() in NATIVE_PIXEL_FORMATS:
+                    self.pixel_format = self.__device.PixelFormat.GetValue()
                 self.__device.StartGrabbing(pylon.GrabStrategy_LatestImageOnly, pylon.GrabLoop_ProvidedByUser)
                 #self.__device.StartGrabbing(pylon.GrabStrategy_OneByOne, pylon.GrabLoop_ProvidedByUser)
                 #self.__device.StartGrabbing(pylon.GrabStrategy_UpcomingImage, pylon.GrabLoop_ProvidedByUser)
@@ -72,8 +77,10 @@ class GigE_Basler(ICamera):
         if self.__device.IsGrabbing():
             _grab_result = self.__device.RetrieveResult(5000, pylon.TimeoutHandling_ThrowException)
             if _grab_result.GrabSucceeded():
-                image = self.__converter.Convert(_grab_result)
-                raw_image = image.GetArray()
+                if self.pixel_format == PIXEL_BGR8:
+                    raw_image = self.__converter.Convert(_grab_result).GetArray()
+                else:
+                    raw_image = _grab_result.GetArray()
                 _grab_result.Release()
                 
                 return (True, raw_image)
@@ -90,15 +97,19 @@ class Controller(QThread):
     
     frame_update_signal = pyqtSignal(np.ndarray, float) # to gui and process
     
-    def __init__(self, camera_id:int):
+    def __init__(self, camera_id:int, native:bool=False):
         super().__init__()
         
         self.__console = ConsoleLogger.get_logger()
-        self.__camera = GigE_Basler(camera_id)
+        self.__camera = GigE_Basler(camera_id, native=native)
         
     # getting camera id
     def get_camera_id(self) -> int:
         return self.__camera.camera_id
+
+    # pixel format of grabbed frames
+    def get_pixel_format(self) -> str:
+        return self.__camera.pixel_format
     
     # camera open
     def open(self) -> bool:
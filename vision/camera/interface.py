@@ -25,4 +25,8 @@ class ICamera(ABC):
         pass
     
     def get_camera_id(self) -> int:
-        return self.__camera_id
\ No newline at end of file
+        return self.__camera_id
+    
+    # end of stream (replay sources without loop), camera devices never finish
+    def is_finished(self) -> bool:
+        return False
\ No newline at end of file
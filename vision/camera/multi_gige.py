@@ -14,6 +14,11 @@ except ImportError:
 from datetime import datetime
 from util.logger.video import VideoRecorder
 from util.logger.console import ConsoleLogger
+from vision.camera.frame_buffer import FrameRingBuffer
+from vision.camera.frame_set import FrameSetAssembler, FrameSet, SYNC_BY_TIMESTAMP, SYNC_BY_FRAME_ID
+from vision.camera.pixel import PIXEL_BGR8, PIXEL_RGB8, PIXEL_MONO8, NATIVE_PIXEL_FORMATS
+from vision.camera.device_manager import DeviceManager
+from util.monitor.metrics import MetricsRegistry
 import numpy as np
 from pypylon import genicam
 from pypylon import pylon
@@ -24,49 +29,122 @@ import time
 #(Note) a2A1920-51gmPRO = 1GHZ, 1 Tick = 1ns
 CAMERA_TICK_TIME = 1
 
+# frames per camera without any complete set before timestamp sync falls back to emitting incomplete sets
+SYNC_CHECK_FRAMES = 30
+
 # global variable for camera array
 _camera_array_container:pylon.InstantCameraArray = None
 
+# devices attached to the camera array (serial, ip, user id, model), in camera id order
+_camera_inventory:list = []
+
+
+
+# grab strategies by configuration name
+GRAB_STRATEGY = {"one_by_one":pylon.GrabStrategy_OneByOne,
+                 "latest_image_only":pylon.GrabStrategy_LatestImageOnly,
+                 "latest_images":pylon.GrabStrategy_LatestImages,
+                 "upcoming_image":pylon.GrabStrategy_UpcomingImage}
+
+# pixel output
+PIXEL_OUTPUT_BGR = "bgr"        # every frame is converted into BGR8 by pylon
+PIXEL_OUTPUT_NATIVE = "native"  # frames are delivered in camera pixel format (Mono8/Bayer), consumers convert when they need color
+
+# acquisition modes
+ACQUISITION_CALLBACK = "callback"   # pylon grab loop thread per camera with image event handler
+ACQUISITION_POLLING = "polling"     # single python loop over the camera array
+
+
+# image event handler (called on the pylon grab loop thread of each camera)
+class _ImageEventHandler(pylon.ImageEventHandler):
+    def __init__(self, controller):
+        super().__init__()
+        self.__controller = controller
+
+    def OnImagesSkipped(self, camera, countOfSkippedImages):
+        self.__controller.on_images_skipped(camera.GetCameraContext(), countOfSkippedImages)
+
+    def OnImageGrabbed(self, camera, grabResult):
+        self.__controller.on_image_grabbed(camera.GetCameraContext(), grabResult)
 
 
 # camera controller class
 class Controller(QThread):
-    
+
     frame_update_signal = pyqtSignal(int, np.ndarray, float) # to gui and process
     frame_update_signal_multi = pyqtSignal(int, dict, float)
     frame_write_signal = pyqtSignal(int, np.ndarray, float) # to write image/video
-    
-    def __init__(self):
+    frame_slot_signal_multi = pyqtSignal(dict, float) # {camera_id:(slot, seq)} in the frame buffer
+    frame_set_signal = pyqtSignal(object) # synchronized FrameSet
+
+    def __init__(self, frame_buffer:FrameRingBuffer=None, sync_tolerance_ms:float=5.0, sync_by:str=SYNC_BY_FRAME_ID, emit_incomplete:bool=True,
+                 acquisition:str=ACQUISITION_CALLBACK, grab_strategy:str="latest_images", max_num_buffer:int=10, output_queue_size:int=2, grab_timeout_ms:int=5000,
+                 pixel_output:str=PIXEL_OUTPUT_BGR, device_manager:DeviceManager=None):
         super().__init__()
 
+        self.__console = ConsoleLogger.get_logger()
+        self.__device_manager = device_manager if device_manager is not None else DeviceManager() # cameras are opened concurrently
+
+        if acquisition not in (ACQUISITION_CALLBACK, ACQUISITION_POLLING):
+            raise ValueError(f"Unsupported acquisition mode : {acquisition}")
+        if grab_strategy not in GRAB_STRATEGY:
+            raise ValueError(f"Unsupported grab strategy : {grab_strategy}")
+        if pixel_output not in (PIXEL_OUTPUT_BGR, PIXEL_OUTPUT_NATIVE):
+            raise ValueError(f"Unsupported pixel output : {pixel_output}")
+
+        self.__acquisition = acquisition
+        self.__grab_strategy = grab_strategy
+        self.__max_num_buffer = int(max_num_buffer)
+        self.__output_queue_size = int(output_queue_size)
+        self.__grab_timeout_ms = int(grab_timeout_ms)
+        self.__pixel_output = pixel_output
+        self.__pixel_formats = {} # pixel format of delivered frames by camera id
+
+        self.__frame_buffer = frame_buffer # converted frames are written into this buffer if set
+        self.__pylon_images = {} # reusable conversion target per camera
+        self.__converters = {} # image format converter of converted cameras (each camera is converted on its own grab thread)
+        self.__mismatched = set() # cameras whose frames do not fit the frame buffer (dropped, warned once)
+
+        # group frames of the same exposure by hardware timestamp (or frame id)
+        self.__assembler = FrameSetAssembler(camera_ids=[], tolerance_ns=int(sync_tolerance_ms*1e6), sync_by=sync_by, emit_incomplete=emit_incomplete)
+        self.__assembler_lock = threading.Lock()
+        self.__sync_by = sync_by
+        self.__sync_checked = False # fallback check for timestamp sync without PTP
+        self.__last_timestamp = {} # last hardware timestamp(ns) by camera id
+        self.__acquisition_stats = {} # frames/failed/skipped by camera id
+        self.__event_handler = None
+        self.__is_grabbing = False
+
         self.grab_termination_event = threading.Event() # for termination
         self.grab_thread = threading.Thread(target=self.grab, args =(self.grab_termination_event, ))
 
         self.rec_termination_event = threading.Event()
         self.recorder1_thread = threading.Thread(target=self.record1, args = (self.rec_termination_event, ))
 
-        self.__converter = pylon.ImageFormatConverter()
-        self.__converter.OutputPixelFormat = pylon.PixelType_BGR8packed
-        self.__converter.OutputBitAlignment = pylon.OutputBitAlignment_MsbAligned
-        
-        self.__console = ConsoleLogger.get_logger()
-        
+        # metrics
+        registry = MetricsRegistry.get_registry()
+        self.__metric_convert = registry.histogram("camera_convert_seconds")
+        self.__metric_incomplete = registry.gauge("frameset_incomplete_total")
+        self.__metric_frames = {}
+        self.__metric_failed = {}
+        self.__metric_skipped = {}
+
     # getting camera id
     def get_num_camera(self) -> int:
         return _camera_array_container.GetSize()
-    
+
     # camera open
     def open(self) -> bool:
         try:
             if not _camera_array_container.GetSize()>0:
                 raise Exception(f"No camera present")
             else:
-                self.grab_thread.start() # thread start
+                self.start_grab()
                 return True
         except Exception as e:
             self.__console.critical(f"{e}")
         return False
-    
+
     # camera close
     def close(self) -> None:
 
@@ -76,8 +154,17 @@ class Controller(QThread):
 
         # grab thread termination
         self.grab_termination_event.set()
-        self.grab_thread.join()
+        if self.grab_thread.is_alive():
+            self.grab_thread.join()
+
+        # pylon grab loop threads termination
+        if self.__acquisition == ACQUISITION_CALLBACK and self.__is_grabbing:
+            for camera in _camera_array_container:
+                camera.StopGrabbing()
+                camera.DeregisterImageEventHandler(self.__event_handler)
+        self.__is_grabbing = False
 
+        self.__console.info(f"Acquisition : {self.get_acquisition_stats()}")
         _camera_array_container.Close()
         self.__console.info(f"Multi camera controller is closed")
 
@@ -87,63 +174,254 @@ class Controller(QThread):
             if evt.is_set():
                 break
 
-    # grab image
+    # grab image (polling mode)
     def grab(self, evt):
-        _camera_array_container.StartGrabbing(pylon.GrabStrategy_LatestImages, pylon.GrabLoop_ProvidedByUser)
-        #_camera_array_container.StartGrabbing(pylon.GrabStrategy_OneByOne, pylon.GrabLoop_ProvidedByUser)
-        #_camera_array_container.StartGrabbing(pylon.GrabStrategy_UpcomingImage, pylon.GrabLoop_ProvidedByUser)
-        #_camera_array_container.StartGrabbing(pylon.GrabStrategy_LatestImages, pylon.GrabLoop_ProvidedByUser)
-        multi_camera_fps = {}
-
-        __raw_images = {}
+        _camera_array_container.StartGrabbing(GRAB_STRATEGY[self.__grab_strategy], pylon.GrabLoop_ProvidedByUser)
+        self.__is_grabbing = True
 
         while True:
 
             if self.isInterruptionRequested():
                 break
 
-            t_start = datetime.now()
-            grab_image = _camera_array_container.RetrieveResult(5000, pylon.TimeoutHandling_ThrowException)
-            camera_id = grab_image.GetCameraContext()
-
-            if grab_image.GrabSucceeded():
-                #img = grab_image.GetArray()
-                image = self.__converter.Convert(grab_image)
-                raw_image = image.GetArray()
-
-                __raw_images[camera_id] = raw_image
-
-                if camera_id in multi_camera_fps.keys():
-                    framerate = float(1./(t_start - multi_camera_fps[camera_id]).total_seconds())
-                else:
-                    framerate = 0
-                multi_camera_fps[camera_id] = t_start
-                
-                
-                # send image
-                #self.frame_update_signal.emit(camera_id, raw_image, framerate)
-                if len(__raw_images)==10:
-                    self.frame_update_signal_multi.emit(camera_id, __raw_images.copy(), framerate)
-                    #self.__console.info(f"emit")
-                    __raw_images.clear()
-
-                time.sleep(0.001)
-                if evt.is_set():
-                    break
-
-    # start grabbing thread
+            grab_image = _camera_array_container.RetrieveResult(self.__grab_timeout_ms, pylon.TimeoutHandling_Return)
+            if grab_image.IsValid():
+                self.on_image_grabbed(grab_image.GetCameraContext(), grab_image)
+                grab_image.Release()
+            else:
+                self.__console.warning(f"No image grabbed in {self.__grab_timeout_ms}ms")
+
+            if evt.is_set():
+                break
+
+        _camera_array_container.StopGrabbing()
+
+    # grab image (callback mode, each camera runs its own pylon grab loop thread)
+    def __start_callback_grab(self):
+        self.__event_handler = _ImageEventHandler(self)
+        for camera in _camera_array_container:
+            camera.RegisterImageEventHandler(self.__event_handler, pylon.RegistrationMode_Append, pylon.Cleanup_None)
+            camera.StartGrabbing(GRAB_STRATEGY[self.__grab_strategy], pylon.GrabLoop_ProvidedByInstantCamera)
+        self.__is_grabbing = True
+
+    # open and configure all cameras concurrently (before grabbing)
+    def __open_cameras(self):
+        tasks = {camera_id:(lambda camera=camera: self.__open_camera(camera)) for camera_id, camera in enumerate(_camera_array_container)}
+        results = self.__device_manager.run_all(tasks)
+        failed = [camera_id for camera_id, ret in results.items() if not ret]
+        if len(failed)>0:
+            raise Exception(f"Camera {failed} cannot be opened")
+
+    # open camera and set buffer pool and output queue size
+    def __open_camera(self, camera) -> bool:
+        if not camera.IsOpen():
+            camera.Open()
+        camera.MaxNumBuffer.SetValue(self.__max_num_buffer)
+        if self.__grab_strategy == "latest_images":
+            camera.OutputQueueSize.SetValue(min(self.__output_queue_size, self.__max_num_buffer))
+        return True
+
+    # per-camera state before grabbing
+    def __prepare(self):
+        camera_ids = list(range(_camera_array_container.GetSize()))
+        self.__assembler.set_camera_ids(camera_ids)
+        self.__assembler.reset()
+        self.__sync_checked = False
+        self.__last_timestamp.clear()
+
+        self.__converters.clear()
+        self.__mismatched.clear()
+
+        registry = MetricsRegistry.get_registry()
+        for camera_id in camera_ids:
+            self.__pixel_formats[camera_id] = self.__get_output_pixel_format(camera_id)
+            if self.__frame_buffer is not None:
+                self.__check_frame_buffer(camera_id)
+            if self.__pixel_formats[camera_id] == PIXEL_BGR8:
+                self.__converters[camera_id] = self.__create_converter(pylon.PixelType_BGR8packed)
+            self.__acquisition_stats[camera_id] = {"frames":0, "failed":0, "skipped":0, "mismatched":0}
+            labels = {"camera":str(camera_id)}
+            self.__metric_frames[camera_id] = registry.counter("camera_frames_total", labels)
+            self.__metric_failed[camera_id] = registry.counter("camera_grab_failed_total", labels)
+            self.__metric_skipped[camera_id] = registry.counter("camera_images_skipped_total", labels)
+
+    # grabbed image from any camera (pylon grab loop thread or polling loop)
+    def on_image_grabbed(self, camera_id:int, grab_image):
+        stats = self.__acquisition_stats[camera_id]
+        if not grab_image.GrabSucceeded():
+            stats["failed"] += 1
+            self.__metric_failed[camera_id].inc()
+            return
+
+        timestamp = grab_image.GetTimeStamp()*CAMERA_TICK_TIME # camera tick to ns
+        frame_id = grab_image.GetImageNumber()
+        with self.__metric_convert.time():
+            frame = self.__convert(camera_id, grab_image)
+        stats["frames"] += 1
+        self.__metric_frames[camera_id].inc()
+
+        with self.__assembler_lock:
+            # frame rate from camera tick counter
+            last_timestamp = self.__last_timestamp.get(camera_id, 0)
+            framerate = float(1e9/(timestamp - last_timestamp)) if 0<last_timestamp<timestamp else 0
+            self.__last_timestamp[camera_id] = timestamp
+
+            # send synchronized frame set
+            if frame is not None:
+                for frame_set in self.__assembler.add(camera_id, frame, timestamp, frame_id):
+                    self.__emit_frame_set(camera_id, frame_set, framerate)
+                sync_stats = self.__assembler.get_stats()
+                self.__metric_incomplete.set(sync_stats["incomplete"])
+                self.__check_sync(sync_stats)
+
+    # free running camera clocks (PTP disabled) never match in timestamp mode, incomplete sets are emitted instead of none
+    def __check_sync(self, sync_stats:dict):
+        if self.__sync_checked or self.__sync_by != SYNC_BY_TIMESTAMP:
+            return
+        if sync_stats["complete"]>0:
+            self.__sync_checked = True
+        elif sync_stats["frames"] >= SYNC_CHECK_FRAMES*max(1, len(self.__acquisition_stats)):
+            self.__sync_checked = True
+            self.__assembler.set_emit_incomplete(True)
+            self.__console.warning(f"No frame set completed in {sync_stats['frames']} frames by timestamp (camera clocks may not be PTP synchronized), incomplete sets are emitted")
+
+    # images skipped by the grab strategy (consumer was too slow)
+    def on_images_skipped(self, camera_id:int, count:int):
+        self.__acquisition_stats[camera_id]["skipped"] += count
+        self.__metric_skipped[camera_id].inc(count)
+
+    # pixel format of frames delivered from the camera
+    def get_pixel_format(self, camera_id:int) -> str:
+        return self.__pixel_formats.get(camera_id, PIXEL_BGR8)
+
+    def __get_output_pixel_format(self, camera_id:int) -> str:
+        if self.__pixel_output == PIXEL_OUTPUT_BGR:
+            return PIXEL_BGR8
+        pixel_format = _camera_array_container[camera_id].PixelFormat.GetValue()
+        if pixel_format not in NATIVE_PIXEL_FORMATS: # packed or high bit-depth formats are converted
+            self.__console.warning(f"Camera {camera_id} pixel format {pixel_format} is converted into {PIXEL_BGR8}")
+            return PIXEL_BGR8
+        return pixel_format
+
+    # match the delivered frame to the frame buffer once before grabbing (native frames of a single channel buffer,
+    # BGR fallback into a single channel buffer is converted into Mono8 instead, a size mismatch is dropped)
+    def __check_frame_buffer(self, camera_id:int):
+        camera = _camera_array_container[camera_id]
+        pixel_format = self.__pixel_formats[camera_id]
+        channels = 3 if pixel_format in (PIXEL_BGR8, PIXEL_RGB8) else 1
+        buffer_shape = self.__frame_buffer.get_shape()
+        buffer_channels = buffer_shape[2] if len(buffer_shape)==3 else 1
+
+        if channels != buffer_channels:
+            if buffer_channels == 1:
+                self.__console.warning(f"Camera {camera_id} pixel format {pixel_format} does not fit the single channel frame buffer, converted into {PIXEL_MONO8}")
+                self.__pixel_formats[camera_id] = PIXEL_MONO8
+                self.__converters[camera_id] = self.__create_converter(pylon.PixelType_Mono8)
+            else:
+                self.__console.warning(f"Camera {camera_id} pixel format {pixel_format} does not fit the color frame buffer, converted into {PIXEL_BGR8}")
+                self.__pixel_formats[camera_id] = PIXEL_BGR8
+
+        size = (int(camera.Height.GetValue()), int(camera.Width.GetValue()))
+        if size != tuple(buffer_shape[:2]):
+            self.__mismatched.add(camera_id)
+            self.__console.warning(f"Camera {camera_id} frame size {size} does not match the frame buffer {tuple(buffer_shape[:2])}, frames are dropped")
+
+    # convert grabbed result into BGR image (or frame buffer slot), native pixel formats are not converted
+    def __convert(self, camera_id:int, grab_image):
+        if camera_id in self.__mismatched:
+            self.__acquisition_stats[camera_id]["mismatched"] += 1
+            return None
+
+        converter = self.__converters.get(camera_id)
+        if converter is None:
+            return self.__copy_native(camera_id, grab_image)
+
+        if self.__frame_buffer is not None:
+            # convert into the reused pylon image, then copy once into a frame buffer slot
+            if camera_id not in self.__pylon_images:
+                self.__pylon_images[camera_id] = pylon.PylonImage()
+            converter.Convert(self.__pylon_images[camera_id], grab_image)
+            with self.__pylon_images[camera_id].GetArrayZeroCopy() as converted:
+                return self.__put_frame(camera_id, converted)
+
+        image = converter.Convert(grab_image)
+        return image.GetArray()
+
+    # copy grabbed buffer in camera pixel format (no conversion)
+    def __copy_native(self, camera_id:int, grab_image):
+        if self.__frame_buffer is not None:
+            with grab_image.GetArrayZeroCopy() as raw:
+                return self.__put_frame(camera_id, raw)
+        return grab_image.GetArray()
+
+    # copy frame into a frame buffer slot (a frame changed in size afterward is dropped and warned once)
+    def __put_frame(self, camera_id:int, frame:np.ndarray):
+        if frame.shape != self.__frame_buffer.get_shape():
+            self.__mismatched.add(camera_id)
+            self.__acquisition_stats[camera_id]["mismatched"] += 1
+            self.__console.warning(f"Camera {camera_id} frame shape {frame.shape} does not match the frame buffer, frames are dropped")
+            return None
+        slot, seq = self.__frame_buffer.put(frame, camera_id)
+        return (slot, seq) if slot >= 0 else None
+
+    @staticmethod
+    def __create_converter(output_pixel_type):
+        converter = pylon.ImageFormatConverter()
+        converter.OutputPixelFormat = output_pixel_type
+        converter.OutputBitAlignment = pylon.OutputBitAlignment_MsbAligned
+        return converter
+
+    # emit frame set to gui and process
+    def __emit_frame_set(self, camera_id:int, frame_set:FrameSet, framerate:float):
+        self.frame_set_signal.emit(frame_set)
+        if self.__frame_buffer is not None:
+            self.frame_slot_signal_multi.emit(frame_set.frames, framerate)
+        else:
+            self.frame_update_signal_multi.emit(camera_id, frame_set.frames, framerate)
+
+    # frame set assembling statistics
+    def get_sync_stats(self) -> dict:
+        with self.__assembler_lock:
+            return self.__assembler.get_stats()
+
+    # acquisition statistics per camera (frames, failed, skipped by grab strategy, mismatched frame buffer, stream buffer underrun)
+    def get_acquisition_stats(self) -> dict:
+        result = {}
+        for camera_id, stats in self.__acquisition_stats.items():
+            result[camera_id] = stats.copy()
+            result[camera_id]["underrun"] = self.__get_stream_statistic(camera_id, "Statistic_Buffer_Underrun_Count")
+        return result
+
+    # stream grabber statistic of the camera (None if the transport layer does not provide it)
+    def __get_stream_statistic(self, camera_id:int, name:str) -> int:
+        try:
+            node = _camera_array_container[camera_id].GetStreamGrabberNodeMap().GetNode(name)
+            return int(node.GetValue()) if node is not None else None
+        except Exception:
+            return None
+
+    # start grabbing
     def start_grab(self):
-        self.grab_thread.start()
-            
+        self.__open_cameras()
+        self.__prepare()
+
+        if self.__acquisition == ACQUISITION_CALLBACK:
+            self.__start_callback_grab()
+        else:
+            self.grab_thread.start()
+        self.__console.info(f"Start grabbing ({self.__acquisition}, {self.__grab_strategy}, buffers:{self.__max_num_buffer})")
+
     # return camera id
     def __str__(self):
         return str(self.__camera.camera_id)
 
-        
+
 '''
 Camera Finder to discover GigE Cameras (Basler)
+ - with inventory (last known devices), cameras are reattached by serial and IP without enumeration
+ - falls back to full enumeration if any of the known devices cannot be created
 '''   
-def gige_camera_discovery() -> list:
+def gige_camera_discovery(inventory:list=None) -> list:
     
     _caminfo_array:list = []
     
@@ -156,44 +434,81 @@ def gige_camera_discovery() -> list:
     try:
         # get the transport layer factory
         _tlf = pylon.TlFactory.GetInstance()
+
+        if inventory:
+            try:
+                return _attach_devices(_tlf, [_device_info_from_inventory(device) for device in inventory])
+            except Exception as e:
+                print(f"Known devices cannot be reattached ({e}), enumerating all devices")
         
         # get all attached devices
         _devices = _tlf.EnumerateDevices()
 
-
         if len(_devices)==0:
             raise Exception(f"No camera present")
         
-        # create camera array container
-        _camera_array_container = pylon.InstantCameraArray(len(_devices))
-        
-        # create and attach all device
-        for idx, cam in enumerate(_camera_array_container):
-            cam.Attach(_tlf.CreateDevice(_devices[idx]))
-
-            # cam.Open()
-            # cam.AcqusitionFrameRate.SetValue(10)
-            # cam.AcquisitionFrameRateEnable.SetValue('On')
-            # cam.TriggerMode.SetValue("On")
-            # cam.TriggerDelay.SetValue(0)
-            # cam.TriggerSelector.SetValue('FrameStart')
-            # cam.TriggerSource.SetValue('Line2')
-            # cam.TriggerActivation.SetValue('RisingEdge')
-            # cam.Close()
-
-            _model_name = cam.GetDeviceInfo().GetModelName()
-            uid = cam.GetDeviceInfo().GetUserDefinedName()
-            _ip_addr = _devices[idx].GetIpAddress()
-            
-            # _devices[idx].GetHeartbeatTimeout.SetValue(5000) # set timeout
-            print(f"found GigE Camera Device (User ID:{uid}) {_model_name}({_ip_addr})")
-            
-            _caminfo_array.append((uid, _model_name, _ip_addr))
+        _caminfo_array = _attach_devices(_tlf, _devices)
         
     except Exception as e:
         print(f"Exception : {e}")
+        _camera_array_container = pylon.InstantCameraArray(0) # no camera (previous array is not reused)
+        
+    return _caminfo_array
+
+# devices attached by the last discovery (to be stored as inventory)
+def get_gige_inventory() -> list:
+    return [device.copy() for device in _camera_inventory]
+
+# create camera array container and attach all devices (published only if every device is attached)
+def _attach_devices(tlf, devices) -> list:
+    global _camera_array_container, _camera_inventory
+    
+    _caminfo_array:list = []
+    _inventory:list = []
+    _camera_array = pylon.InstantCameraArray(len(devices))
+    
+    # create and attach all device
+    try:
+        for idx, cam in enumerate(_camera_array):
+            cam.Attach(tlf.CreateDevice(devices[idx]))
+    except Exception:
+        _camera_array.DestroyDevice() # devices attached before the failure
+        raise
+    
+    for cam in _camera_array:
+        # cam.Open()
+        # cam.AcqusitionFrameRate.SetValue(10)
+        # cam.AcquisitionFrameRateEnable.SetValue('On')
+        # cam.TriggerMode.SetValue("On")
+        # cam.TriggerDelay.SetValue(0)
+        # cam.TriggerSelector.SetValue('FrameStart')
+        # cam.TriggerSource.SetValue('Line2')
+        # cam.TriggerActivation.SetValue('RisingEdge')
+        # cam.Close()
+
+        _info = cam.GetDeviceInfo()
+        _model_name = _info.GetModelName()
+        uid = _info.GetUserDefinedName()
+        _ip_addr = _info.GetIpAddress()
+        
+        # _devices[idx].GetHeartbeatTimeout.SetValue(5000) # set timeout
+        print(f"found GigE Camera Device (User ID:{uid}) {_model_name}({_ip_addr})")
         
+        _caminfo_array.append((uid, _model_name, _ip_addr))
+        _inventory.append({"serial":_info.GetSerialNumber(), "ip":_ip_addr, "user_id":uid, "model":_model_name, "device_class":_info.GetDeviceClass()})
+    
+    _camera_array_container = _camera_array
+    _camera_inventory = _inventory
     return _caminfo_array
+
+# device info to create the known device directly
+def _device_info_from_inventory(device:dict):
+    info = pylon.DeviceInfo()
+    info.SetDeviceClass(device.get("device_class", "BaslerGigE"))
+    info.SetSerialNumber(str(device["serial"]))
+    if device.get("ip"):
+        info.SetIpAddress(device["ip"])
+    return info
     
 '''
 Camera container termination
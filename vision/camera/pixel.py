@@ -0,0 +1,58 @@
+'''
+Camera Pixel Format Conversion (native Mono/Bayer frames are converted lazily, only for color consumers)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import cv2
+import numpy as np
+
+# pixel format names (GenICam PFNC)
+PIXEL_BGR8 = "BGR8"
+PIXEL_RGB8 = "RGB8"
+PIXEL_MONO8 = "Mono8"
+
+# cv2 conversion code by pixel format (to BGR, to RGB)
+_COLOR_CONVERSION = {
+    PIXEL_MONO8:(cv2.COLOR_GRAY2BGR, cv2.COLOR_GRAY2RGB),
+    PIXEL_RGB8:(cv2.COLOR_RGB2BGR, None),
+    "BayerRG8":(cv2.COLOR_BayerRGGB2BGR, cv2.COLOR_BayerRGGB2RGB),
+    "BayerBG8":(cv2.COLOR_BayerBGGR2BGR, cv2.COLOR_BayerBGGR2RGB),
+    "BayerGR8":(cv2.COLOR_BayerGRBG2BGR, cv2.COLOR_BayerGRBG2RGB),
+    "BayerGB8":(cv2.COLOR_BayerGBRG2BGR, cv2.COLOR_BayerGBRG2RGB),
+}
+
+# pixel formats which can be delivered without conversion (single byte per pixel)
+NATIVE_PIXEL_FORMATS = (PIXEL_BGR8, PIXEL_RGB8, PIXEL_MONO8, "BayerRG8", "BayerBG8", "BayerGR8", "BayerGB8")
+
+
+def is_mono(pixel_format:str) -> bool:
+    return pixel_format == PIXEL_MONO8
+
+def is_bayer(pixel_format:str) -> bool:
+    return pixel_format.startswith("Bayer")
+
+# number of channels of the frame in the pixel format
+def get_channels(pixel_format:str) -> int:
+    return 3 if pixel_format in (PIXEL_BGR8, PIXEL_RGB8) else 1
+
+
+# convert frame into BGR image (BGR8 frame is returned as it is)
+def to_bgr(frame:np.ndarray, pixel_format:str) -> np.ndarray:
+    if pixel_format == PIXEL_BGR8:
+        return frame
+    return cv2.cvtColor(frame, _COLOR_CONVERSION[pixel_format][0])
+
+# convert frame into RGB image (RGB8 frame is returned as it is)
+def to_rgb(frame:np.ndarray, pixel_format:str) -> np.ndarray:
+    if pixel_format == PIXEL_RGB8:
+        return frame
+    if pixel_format == PIXEL_BGR8:
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return cv2.cvtColor(frame, _COLOR_CONVERSION[pixel_format][1])
+
+# convert frame into display-size RGB image (mono frames are resized before expanding to 3 channels)
+def to_rgb_resized(frame:np.ndarray, pixel_format:str, size:tuple) -> np.ndarray:
+    if is_mono(pixel_format):
+        return cv2.cvtColor(cv2.resize(frame, dsize=size, interpolation=cv2.INTER_AREA), cv2.COLOR_GRAY2RGB)
+    return cv2.resize(to_rgb(frame, pixel_format), dsize=size, interpolation=cv2.INTER_AREA)
+
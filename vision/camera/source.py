@@ -0,0 +1,286 @@
+'''
+Frame Sources for replay/benchmark without camera device (image directory, video file, synthetic, pylon emulation)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import os
+import time
+import pathlib
+import cv2
+import numpy as np
+from typing import Union
+
+from util.logger.console import ConsoleLogger
+from vision.camera.interface import ICamera
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+
+# frame pacing to target fps (fps<=0 means as fast as possible)
+class FramePacer:
+    def __init__(self, fps:float):
+        self.__interval = 1./fps if fps>0 else 0.
+        self.__deadline = None
+
+    def wait(self):
+        if self.__interval<=0:
+            return
+        now = time.perf_counter()
+        if self.__deadline is None or now-self.__deadline>self.__interval: # start (or too late, do not burst)
+            self.__deadline = now
+        elif self.__deadline>now:
+            time.sleep(self.__deadline-now)
+        self.__deadline += self.__interval
+
+
+# common behaviour of frame sources (same methods as UVC device)
+class FrameSource(ICamera):
+    def __init__(self, camera_id:int, fps:float=30.) -> None:
+        super().__init__(camera_id)
+
+        self.camera_id = camera_id
+        self.fps = fps
+        self.width = 0
+        self.height = 0
+        self._console = ConsoleLogger.get_logger()
+        self._pacer = FramePacer(fps)
+        self._is_opened = False
+
+    def close(self) -> None:
+        self._is_opened = False
+
+    def is_opened(self) -> bool:
+        return self._is_opened
+
+    def get_properties(self):
+        return (self.fps, self.width, self.height)
+
+    # capture image into the given (preallocated) array
+    def grab_into(self, image:np.ndarray) -> bool:
+        ret, frame = self.grab()
+        if not ret or frame.shape != image.shape:
+            return False
+        np.copyto(image, frame)
+        return True
+
+    # drop a frame
+    def skip(self) -> bool:
+        ret, _ = self.grab()
+        return ret
+
+
+# replay images in a directory
+class ImageFolderSource(FrameSource):
+    def __init__(self, camera_id:int, path:Union[pathlib.Path, str], fps:float=30., loop:bool=True, preload:bool=True) -> None:
+        super().__init__(camera_id, fps)
+
+        self.__path = pathlib.Path(path)
+        self.__loop = loop
+        self.__preload = preload # decode all images on open (decoding cost excluded from pipeline)
+        self.__files = []
+        self.__images = []
+        self.__index = 0
+
+    def open(self) -> bool:
+        self.__files = sorted([f for f in self.__path.iterdir() if f.suffix.lower() in IMAGE_EXTENSIONS]) if self.__path.is_dir() else []
+        if len(self.__files)==0:
+            self._console.critical(f"No image in {self.__path.as_posix()}")
+            return False
+
+        if self.__preload:
+            self.__images = []
+            for f in list(self.__files):
+                image = cv2.imread(f.as_posix())
+                if image is None: # unreadable files are excluded from replay
+                    self._console.warning(f"Cannot read image {f.as_posix()}, skipped")
+                    self.__files.remove(f)
+                    continue
+                self.__images.append(image)
+            if len(self.__images)==0:
+                self._console.critical(f"No readable image in {self.__path.as_posix()}")
+                return False
+        first = self.__images[0] if self.__preload else cv2.imread(self.__files[0].as_posix())
+        if first is None:
+            self._console.critical(f"Cannot read image {self.__files[0].as_posix()}")
+            return False
+        self.height, self.width = first.shape[:2]
+        self.__index = 0
+        self._is_opened = True
+        return True
+
+    def grab(self):
+        if self.__index>=len(self.__files):
+            if not self.__loop:
+                return (False, None)
+            self.__index = 0
+
+        self._pacer.wait()
+        if self.__preload:
+            frame = self.__images[self.__index].copy()
+        else:
+            frame = cv2.imread(self.__files[self.__index].as_posix())
+        self.__index += 1
+        return (frame is not None, frame)
+
+    def is_finished(self) -> bool:
+        return not self.__loop and self.__index>=len(self.__files)
+
+
+# replay video file
+class VideoFileSource(FrameSource):
+    def __init__(self, camera_id:int, path:Union[pathlib.Path, str], fps:float=0, loop:bool=True) -> None:
+        super().__init__(camera_id, fps)
+
+        self.__path = pathlib.Path(path)
+        self.__loop = loop
+        self.__capture = None
+        self.__is_finished = False
+
+    def open(self) -> bool:
+        self.__capture = cv2.VideoCapture(self.__path.as_posix())
+        if not self.__capture.isOpened():
+            self._console.critical(f"Cannot open video {self.__path.as_posix()}")
+            return False
+
+        if self.fps<=0: # follow the video frame rate
+            self.fps = self.__capture.get(cv2.CAP_PROP_FPS)
+            self._pacer = FramePacer(self.fps)
+        self.width = int(self.__capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.__capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.__is_finished = False
+        self._is_opened = True
+        return True
+
+    def close(self) -> None:
+        if self.__capture:
+            self.__capture.release()
+        super().close()
+
+    def grab(self):
+        self._pacer.wait()
+        ret, frame = self.__capture.read()
+        if not ret and self.__loop:
+            self.__capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.__capture.read()
+        self.__is_finished = not ret and not self.__loop
+        return (ret, frame)
+
+    def is_finished(self) -> bool:
+        return self.__is_finished
+
+
+# synthetic frames at target fps/resolution
+class SyntheticSource(FrameSource):
+    def __init__(self, camera_id:int, width:int=1920, height:int=1080, fps:float=30., channels:int=3, n_patterns:int=8, copy:bool=True) -> None:
+        super().__init__(camera_id, fps)
+
+        self.width = width
+        self.height = height
+        self.__channels = channels
+        self.__n_patterns = max(1, n_patterns)
+        self.__copy = copy # return new array per frame like camera driver does
+        self.__patterns = []
+        self.__index = 0
+
+    def open(self) -> bool:
+        # moving bar over gradient with camera id (generated once)
+        gradient = np.tile(np.linspace(0, 255, self.width, dtype=np.uint8), (self.height, 1))
+        bar_width = max(1, self.width//self.__n_patterns)
+        self.__patterns = []
+        for idx in range(self.__n_patterns):
+            plane = gradient.copy()
+            plane[:, idx*bar_width:(idx+1)*bar_width] = 255 - plane[:, idx*bar_width:(idx+1)*bar_width]
+            pattern = np.dstack([plane]*self.__channels) if self.__channels>1 else plane
+            cv2.putText(pattern, f"Synthetic #{self.camera_id}", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (0,)*self.__channels, 3, cv2.LINE_AA)
+            self.__patterns.append(pattern)
+
+        self.__index = 0
+        self._is_opened = True
+        return True
+
+    def grab(self):
+        self._pacer.wait()
+        frame = self.__patterns[self.__index % self.__n_patterns]
+        self.__index += 1
+        return (True, frame.copy() if self.__copy else frame)
+
+
+# basler pylon camera emulator (no device needed)
+class PylonEmulationSource(FrameSource):
+    def __init__(self, camera_id:int, n_emulated:int=1, fps:float=30.) -> None:
+        super().__init__(camera_id, fps)
+
+        enable_pylon_emulation(max(n_emulated, camera_id+1))
+        self.__camera = None
+        self.__converter = None
+
+    def open(self) -> bool:
+        from pypylon import pylon
+
+        try:
+            devices = pylon.TlFactory.GetInstance().EnumerateDevices()
+            self.__camera = pylon.InstantCamera(pylon.TlFactory.GetInstance().CreateDevice(devices[self.camera_id]))
+            self.__camera.Open()
+            self.__camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
+            self.width = self.__camera.Width.GetValue()
+            self.height = self.__camera.Height.GetValue()
+
+            self.__converter = pylon.ImageFormatConverter()
+            self.__converter.OutputPixelFormat = pylon.PixelType_BGR8packed
+            self.__converter.OutputBitAlignment = pylon.OutputBitAlignment_MsbAligned
+        except Exception as e:
+            self._console.critical(f"Pylon emulation error : {e}")
+            return False
+
+        self._is_opened = True
+        return True
+
+    def close(self) -> None:
+        if self.__camera:
+            self.__camera.StopGrabbing()
+            self.__camera.Close()
+        super().close()
+
+    def grab(self):
+        from pypylon import pylon
+
+        self._pacer.wait()
+        grab_result = self.__camera.RetrieveResult(5000, pylon.TimeoutHandling_ThrowException)
+        if grab_result.GrabSucceeded():
+            frame = self.__converter.Convert(grab_result).GetArray()
+            grab_result.Release()
+            return (True, frame)
+        grab_result.Release()
+        return (False, None)
+
+
+'''
+Enable pylon camera emulation (must be called before pypylon transport layer is created)
+'''
+def enable_pylon_emulation(n_cameras:int):
+    os.environ["PYLON_CAMEMU"] = str(int(n_cameras))
+
+
+'''
+Create frame source from configuration (None for real device)
+ex) {"type":"synthetic", "width":1920, "height":1080, "fps":30}
+    {"type":"images", "path":"./dataset", "fps":10}
+    {"type":"video", "path":"./video_log/camera_0.avi"}
+    {"type":"pylon_emulation", "n_cameras":4}
+'''
+def create_source(camera_id:int, spec:dict) -> FrameSource:
+    source_type = spec.get("type", "device")
+    fps = float(spec.get("fps", 30.))
+
+    if source_type == "device":
+        return None
+    elif source_type == "synthetic":
+        return SyntheticSource(camera_id, width=int(spec.get("width", 1920)), height=int(spec.get("height", 1080)), fps=fps, channels=int(spec.get("channels", 3)))
+    elif source_type == "images":
+        return ImageFolderSource(camera_id, spec["path"], fps=fps, loop=bool(spec.get("loop", True)))
+    elif source_type == "video":
+        return VideoFileSource(camera_id, spec["path"], fps=float(spec.get("fps", 0)), loop=bool(spec.get("loop", True)))
+    elif source_type == "pylon_emulation":
+        return PylonEmulationSource(camera_id, n_emulated=int(spec.get("n_cameras", 1)), fps=fps)
+    else:
+        raise ValueError(f"Unsupported frame source : {source_type}")
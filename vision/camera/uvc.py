@@ -11,6 +11,8 @@ from util.logger.video import VideoRecorder
 import platform
 from util.logger.console import ConsoleLogger
 from vision.camera.interface import ICamera
+from vision.camera.frame_buffer import FrameRingBuffer
+from util.monitor.metrics import MetricsRegistry
 import numpy as np
 
 
@@ -53,6 +55,19 @@ class UVC(ICamera):
     def grab(self):
         return self.__grabber.read() # grab
     
+    # capture image into the given (preallocated) array
+    def grab_into(self, image:np.ndarray) -> bool:
+        ret, frame = self.__grabber.read(image)
+        if ret and frame.ctypes.data != image.ctypes.data: # opencv reallocates if the shape does not match
+            if frame.shape != image.shape:
+                return False
+            np.copyto(image, frame)
+        return ret
+    
+    # drop a frame without decoding
+    def skip(self) -> bool:
+        return self.__grabber.grab()
+    
     # check device open
     def is_opened(self) -> bool:
         return self.__grabber.isOpened()
@@ -68,12 +83,21 @@ class UVC(ICamera):
 class Controller(QThread):
 
     frame_update_signal = pyqtSignal(np.ndarray, float) # to gui and process
+    frame_slot_signal = pyqtSignal(int, int, float) # (slot, seq, fps) in the frame buffer
 
-    def __init__(self, camera_id:int):
+    def __init__(self, camera_id:int, frame_buffer:FrameRingBuffer=None, source:ICamera=None):
         super().__init__()
         
         self.__console = ConsoleLogger.get_logger()   # console logger
-        self.__uvc_camera = UVC(camera_id)    # UVC camera device
+        self.__uvc_camera = source if source is not None else UVC(camera_id)    # UVC camera device (or frame source for replay)
+        self.__frame_buffer = frame_buffer  # grabbed frames are written into this buffer if set
+        
+        # metrics
+        registry = MetricsRegistry.get_registry()
+        labels = {"camera":str(camera_id)}
+        self.__metric_grab = registry.histogram("camera_grab_seconds", labels)
+        self.__metric_frames = registry.counter("camera_frames_total", labels)
+        self.__metric_dropped = registry.counter("camera_frames_dropped_total", labels)
     
     # get camera id from own camera device    
     def get_camera_id(self) -> int:
@@ -118,18 +142,61 @@ class Controller(QThread):
     def grab(self):
         return self.__uvc_camera.grab()
     
+    # set frame buffer (before begin)
+    def set_frame_buffer(self, frame_buffer:FrameRingBuffer):
+        self.__frame_buffer = frame_buffer
+    
     # image grab with thread
     def run(self):
+        if self.__frame_buffer is not None:
+            self.__run_with_buffer()
+            return
+        
         while True:
-            if self.isInterruptionRequested():
+            if self.isInterruptionRequested() or self.__is_finished():
                 break
             
             t_start = datetime.now()
-            ret, frame = self.__uvc_camera.grab()
+            with self.__metric_grab.time():
+                ret, frame = self.__uvc_camera.grab()
 
             if ret:                
                 t_end = datetime.now()
                 framerate = float(1./(t_end - t_start).total_seconds())
+                self.__metric_frames.inc()
 
                 self.frame_update_signal.emit(frame, framerate)
     
+    # end of stream of the replay source, the grab thread stops instead of retrying
+    def __is_finished(self) -> bool:
+        if self.__uvc_camera.is_finished():
+            self.__console.info(f"camera {self.__uvc_camera.camera_id} source reached the end of stream")
+            return True
+        return False
+    
+    # image grab into the preallocated frame buffer (no allocation per frame)
+    def __run_with_buffer(self):
+        camera_id = self.__uvc_camera.camera_id
+        while True:
+            if self.isInterruptionRequested() or self.__is_finished():
+                break
+            
+            t_start = datetime.now()
+            slot = self.__frame_buffer.reserve()
+            if slot < 0: # all slots are held by consumers, drop this frame
+                self.__uvc_camera.skip()
+                self.__metric_dropped.inc()
+                continue
+            
+            with self.__metric_grab.time():
+                ret = self.__uvc_camera.grab_into(self.__frame_buffer.view(slot))
+            if ret:
+                seq = self.__frame_buffer.commit(slot, camera_id)
+                self.__metric_frames.inc()
+                t_end = datetime.now()
+                framerate = float(1./(t_end - t_start).total_seconds())
+                
+                self.frame_slot_signal.emit(slot, seq, framerate)
+            else:
+                self.__frame_buffer.abort(slot)
+    
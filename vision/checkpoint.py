@@ -0,0 +1,102 @@
+'''
+Inference-only (Slim) Model Checkpoint (weights only, optional fp16, content hash and metadata, memory-mapped loading)
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import hashlib
+import argparse
+import torch
+
+SLIM_FORMAT = "slim-v1"
+
+
+'''
+Slim checkpoint layout (torch zip file)
+ - format : SLIM_FORMAT
+ - state_dict : model weights only (no optimizer state)
+ - metadata : dict (ex. img_dim, in_channels, threshold, dtype)
+ - sha256 : hash of the state dict content (see state_dict_hash)
+Tensors are loaded memory-mapped, so only the pages copied into the model become resident.
+'''
+
+# hash of state dict content (key, dtype, shape, bytes in key order), fp32/fp16 tensors through numpy (torch 1.7 compatible)
+def state_dict_hash(state_dict:dict) -> str:
+    sha = hashlib.sha256()
+    for key in sorted(state_dict.keys()):
+        tensor = state_dict[key].detach().cpu().contiguous()
+        sha.update(key.encode())
+        sha.update(str(tensor.dtype).encode())
+        sha.update(str(tuple(tensor.shape)).encode())
+        sha.update(tensor.numpy().tobytes())
+    return sha.hexdigest()
+
+# save weights only checkpoint (floating point tensors are stored as fp16 if half), return hash
+def save_slim(path:str, state_dict:dict, metadata:dict=None, half:bool=False) -> str:
+    weights = {}
+    for key, tensor in state_dict.items():
+        tensor = tensor.detach().cpu()
+        weights[key] = tensor.half() if half and tensor.is_floating_point() else tensor.clone()
+
+    metadata = dict(metadata or {})
+    metadata["dtype"] = "float16" if half else "float32"
+    digest = state_dict_hash(weights)
+    torch.save({"format":SLIM_FORMAT, "state_dict":weights, "metadata":metadata, "sha256":digest}, path)
+    return digest
+
+# load model weights from slim or training checkpoint, return (state_dict, metadata)
+def load_checkpoint(path:str, map_location="cpu", verify:bool=False) -> tuple:
+    ckpt = _load(path, map_location)
+
+    if isinstance(ckpt, dict) and ckpt.get("format") == SLIM_FORMAT:
+        if verify and state_dict_hash(ckpt["state_dict"]) != ckpt["sha256"]:
+            raise ValueError(f"Checkpoint hash mismatch : {path}")
+        return (ckpt["state_dict"], ckpt["metadata"])
+
+    # training checkpoint (EpochCallback) or plain state dict
+    if isinstance(ckpt, dict) and "model_state_dict" in ckpt:
+        return (ckpt["model_state_dict"], {})
+    return (ckpt, {})
+
+# load weights into the model (stored fp16 weights are cast into the model parameter dtype)
+def load_into(model:torch.nn.Module, path:str, map_location="cpu", verify:bool=False) -> dict:
+    state_dict, metadata = load_checkpoint(path, map_location=map_location, verify=verify)
+    model.load_state_dict(state_dict)
+    return metadata
+
+# convert training checkpoint into slim checkpoint, return hash
+def convert(src:str, dst:str, metadata:dict=None, half:bool=False) -> str:
+    state_dict, _ = load_checkpoint(src)
+    return save_slim(dst, state_dict, metadata=metadata, half=half)
+
+def _load(path:str, map_location):
+    try:
+        return torch.load(path, map_location=map_location, mmap=True, weights_only=True)
+    except TypeError: # torch<2.1 (no mmap argument)
+        return _load_unmapped(path, map_location)
+    except RuntimeError: # legacy (non zip) file cannot be memory-mapped
+        return _load_unmapped(path, map_location)
+
+def _load_unmapped(path:str, map_location):
+    try:
+        return torch.load(path, map_location=map_location, weights_only=True)
+    except TypeError: # torch<1.13 (no weights_only argument)
+        return torch.load(path, map_location=map_location)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert training checkpoint into slim inference checkpoint")
+    parser.add_argument('--src', type=str, required=True, help="training checkpoint (EpochCallback) or state dict")
+    parser.add_argument('--dst', type=str, required=True, help="slim checkpoint path")
+    parser.add_argument('--half', action='store_true', help="store floating point weights as fp16")
+    parser.add_argument('--meta', type=str, nargs='*', default=[], help="metadata key=value (ex. img_dim=640 threshold=0.2)")
+    args = parser.parse_args()
+
+    metadata = {}
+    for item in args.meta:
+        key, value = item.split("=", 1)
+        try:
+            metadata[key] = int(value) if value.isdigit() else float(value)
+        except ValueError:
+            metadata[key] = value
+
+    print(f"{args.dst} (sha256 {convert(args.src, args.dst, metadata=metadata, half=args.half)})")
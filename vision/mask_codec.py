@@ -0,0 +1,114 @@
+'''
+Binary Mask Codec (bit-packing, run-length encoding, bounding box crop + RLE) with numpy vectorized encode/decode
+@author Byunghun Hwang<bh.hwang@iae.re.kr>
+'''
+
+import struct
+import numpy as np
+
+# encoding methods
+MASK_RAW = 0        # uint8 plane (1 byte per pixel)
+MASK_BITPACK = 1    # 1 bit per pixel
+MASK_RLE = 2        # alternating run lengths (background first) over the row-major plane
+MASK_BBOX_RLE = 3   # bounding box of defect pixels + RLE of the crop (empty mask has no payload)
+
+MASK_ENCODINGS = {"raw":MASK_RAW, "bitpack":MASK_BITPACK, "rle":MASK_RLE, "bbox_rle":MASK_BBOX_RLE}
+
+# method | run length bytes (2 or 4) | height | width
+_HEADER = struct.Struct("!BBII")
+# top | left | height | width of the bounding box
+_BBOX = struct.Struct("!IIII")
+
+
+'''
+Encoded mask is self-describing (header carries method and size), every pixel > 0 is regarded as defect.
+Decoded mask is uint8 0/255 in the original size.
+'''
+
+# encode mask into bytes with the method (MASK_* or its name)
+def encode(mask:np.ndarray, method=MASK_BBOX_RLE) -> bytes:
+    method = MASK_ENCODINGS.get(method, method)
+    height, width = mask.shape[:2]
+    binary = mask > 0
+
+    if method == MASK_RAW:
+        return _HEADER.pack(method, 0, height, width) + (binary.astype(np.uint8)*255).tobytes()
+    if method == MASK_BITPACK:
+        return _HEADER.pack(method, 0, height, width) + np.packbits(binary, axis=None).tobytes()
+    if method == MASK_RLE:
+        runs, run_bytes = _encode_runs(binary.ravel())
+        return _HEADER.pack(method, run_bytes, height, width) + runs.tobytes()
+    if method == MASK_BBOX_RLE:
+        bbox = get_bbox(binary)
+        if bbox is None:
+            return _HEADER.pack(method, 0, height, width)
+        top, left, box_h, box_w = bbox
+        runs, run_bytes = _encode_runs(binary[top:top+box_h, left:left+box_w].ravel())
+        return _HEADER.pack(method, run_bytes, height, width) + _BBOX.pack(*bbox) + runs.tobytes()
+    raise ValueError(f"Unsupported mask encoding : {method}")
+
+# decode bytes into uint8 mask (0/255)
+def decode(data) -> np.ndarray:
+    method, _, height, width = _HEADER.unpack_from(data)
+    crop = decode_crop(data)
+    if method != MASK_BBOX_RLE:
+        return crop[0]
+
+    mask = np.zeros((height, width), dtype=np.uint8)
+    if crop is not None:
+        box, (top, left) = crop
+        mask[top:top+box.shape[0], left:left+box.shape[1]] = box
+    return mask
+
+# decode only the region containing defects, return (mask, (top, left)) or None for empty mask
+def decode_crop(data):
+    data = memoryview(data)
+    method, run_bytes, height, width = _HEADER.unpack_from(data)
+    payload = data[_HEADER.size:]
+
+    if method == MASK_RAW:
+        return (np.frombuffer(payload, dtype=np.uint8, count=height*width).reshape(height, width).copy(), (0, 0))
+    if method == MASK_BITPACK:
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=height*width)
+        return (bits.reshape(height, width)*np.uint8(255), (0, 0))
+    if method == MASK_RLE:
+        return (_decode_runs(payload, run_bytes, height*width).reshape(height, width), (0, 0))
+    if method == MASK_BBOX_RLE:
+        if len(payload) == 0:
+            return None
+        top, left, box_h, box_w = _BBOX.unpack_from(payload)
+        box = _decode_runs(payload[_BBOX.size:], run_bytes, box_h*box_w).reshape(box_h, box_w)
+        return (box, (top, left))
+    raise ValueError(f"Unsupported mask encoding : {method}")
+
+# (method, run length bytes, height, width) of encoded mask
+def get_header(data) -> tuple:
+    return _HEADER.unpack_from(data)
+
+# (top, left, height, width) of pixels > 0, None if there is no such pixel
+def get_bbox(mask:np.ndarray):
+    rows = np.flatnonzero(mask.any(axis=1))
+    if len(rows) == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return (int(rows[0]), int(cols[0]), int(rows[-1]-rows[0]+1), int(cols[-1]-cols[0]+1))
+
+# run lengths of alternating values starting from background, in the smallest integer type
+def _encode_runs(flat:np.ndarray) -> tuple:
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    bounds = np.concatenate(([0], changes, [flat.size]))
+    runs = np.diff(bounds)
+    if flat.size > 0 and flat[0]: # first run is defect, prepend empty background run
+        runs = np.concatenate(([0], runs))
+    if runs.size == 0 or runs.max() <= 0xFFFF:
+        return (runs.astype(">u2"), 2)
+    return (runs.astype(">u4"), 4)
+
+def _decode_runs(payload, run_bytes:int, size:int) -> np.ndarray:
+    runs = np.frombuffer(payload, dtype=">u2" if run_bytes == 2 else ">u4")
+    values = np.zeros(len(runs), dtype=np.uint8)
+    values[1::2] = 255
+    decoded = np.repeat(values, runs.astype(np.int64))
+    if decoded.size != size:
+        raise ValueError(f"Decoded size {decoded.size} does not match {size}")
+    return decoded